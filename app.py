@@ -10,17 +10,28 @@ from pathlib import Path
 from dotenv import load_dotenv
 from browser_use import Agent, Browser, ChatBrowserUse
 from browser_use.agent.views import AgentHistoryList
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+import base64
 import json
 import yaml
 import shutil
 from datetime import datetime
 import time
-import imagehash
-from PIL import Image
-import io
 import logging
 
+from src.browser.login import wait_for_login_completion
+from src.browser.overlay import suppress_overlays
+from src.browser.probe import AUTH_URL_PATTERNS, PageProbe, ReadinessThresholds
+from src.browser.stability import StabilityConfig, wait_for_stable
+from src.capture import EncodingConfig, FrameProcessor, ScreenshotEncoder
+from src.dataset.blob_store import workflow_screenshot_paths
+from src.dataset.catalog import Catalog
+from src.dataset.derivatives import DERIVATIVE_WIDTHS, DerivativeCache, render_derivative
+from src.dataset.guide_cache import GuideCache, task_slug
+from src.dataset.steps import STEP_SCHEMA_VERSION, step_from_history, write_metadata
+from src.metrics import RunTimer
+from src.parsing import ParseCache, RuleBasedParser
+
 # Reduce Browser Use logging verbosity
 logging.getLogger('browser_use').setLevel(logging.WARNING)
 logging.getLogger('openai').setLevel(logging.WARNING)
@@ -84,8 +95,36 @@ def extract_search_query_from_task(task: Optional[str], app_name: Optional[str]
     return query.strip('" ').strip()
 
 
+# Parsed questions are shared by every caller in the process and persisted,
+# so the server's parse and generate_guide's parse cost one LLM call total
+parse_cache = ParseCache(
+    cache_file="config/parse_cache.json",
+    max_entries=int(os.getenv("NAVIGATOR_PARSE_CACHE_SIZE", "1000")),
+    ttl_seconds=float(os.getenv("NAVIGATOR_PARSE_CACHE_TTL", str(7 * 24 * 3600)))
+)
+
+
+# Local parser for questions about apps we already know (apps.yaml / url_cache.json)
+rule_parser = RuleBasedParser("config/apps.yaml", "config/url_cache.json")
+RULE_PARSE_MIN_CONFIDENCE = float(os.getenv("NAVIGATOR_RULE_PARSE_MIN_CONFIDENCE", "0.8"))
+
+
 async def parse_question(question: str) -> dict:
     """Parse natural language question to extract app, task, URL, and auth requirements."""
+    # Fast path: resolve known apps locally and skip the LLM round trip
+    try:
+        parsed = rule_parser.parse(question)
+    except Exception as e:
+        print(f"⚠ Rule-based parse failed: {e}")
+        parsed = None
+    if parsed and parsed.get('task') and parsed['confidence'] >= RULE_PARSE_MIN_CONFIDENCE:
+        return parsed
+    
+    return await parse_cache.get_or_parse(question, _parse_question_llm)
+
+
+async def _parse_question_llm(question: str) -> dict:
+    """Ask GPT-4o to parse a question (uncached)."""
     load_dotenv()
     
     # Use OpenAI directly for parsing (simpler than Browser Use LLM)
@@ -143,6 +182,79 @@ Return ONLY the JSON object."""
     return parsed
 
 
+# Screenshot decoding/hashing runs in a worker pool shared by all jobs,
+# so full-page frames never block the event loop
+frame_processor = FrameProcessor(
+    max_workers=int(os.getenv("NAVIGATOR_FRAME_WORKERS", "0")) or None
+)
+
+# Saved screenshots are re-encoded (WebP by default, NAVIGATOR_IMAGE_* env vars)
+# in their own pool so several steps encode in parallel
+screenshot_encoder = ScreenshotEncoder(
+    config=EncodingConfig.from_env(),
+    max_workers=int(os.getenv("NAVIGATOR_FRAME_WORKERS", "0")) or None
+)
+
+# Resized screenshots for the web viewer (rendered in the encoder's pool)
+derivative_cache = DerivativeCache(
+    cache_dir="dataset/_derivatives",
+    max_bytes=int(float(os.getenv("NAVIGATOR_DERIVATIVE_CACHE_MB", "256")) * 1024 * 1024),
+    executor=lambda: screenshot_encoder.executor
+)
+# SQLite index of workflows/steps/screenshots, kept in sync as guides are saved
+catalog = Catalog("dataset")
+
+PREGENERATE_DERIVATIVES = os.getenv("NAVIGATOR_PREGENERATE_DERIVATIVES", "true").lower() in ("1", "true", "yes")
+# Width of the inline thumbnails sent with live step events
+LIVE_THUMBNAIL_WIDTH = int(os.getenv("NAVIGATOR_LIVE_THUMBNAIL_WIDTH", str(DERIVATIVE_WIDTHS['thumb'])))
+
+
+def write_bytes(path: Path, data: bytes):
+    """Write a file (used via asyncio.to_thread to keep disk I/O off the loop)."""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+# How long to wait for pages to settle before capturing (NAVIGATOR_STABLE_* env vars)
+stability_config = StabilityConfig.from_env()
+
+
+# Previously generated guides are reused until they are older than this
+guide_cache = GuideCache(
+    base_dir="dataset",
+    ttl_seconds=float(os.getenv("NAVIGATOR_GUIDE_TTL", str(7 * 24 * 3600)))
+)
+
+
+async def live_thumbnail(screenshot_bytes: bytes) -> str:
+    """Render a captured frame as a small WebP data URI (in the encoder's pool)."""
+    loop = asyncio.get_running_loop()
+    thumbnail = await loop.run_in_executor(
+        screenshot_encoder.executor, render_derivative, screenshot_bytes, LIVE_THUMBNAIL_WIDTH
+    )
+    if thumbnail is None:
+        # Already narrower than a thumbnail: send the frame itself
+        return "data:image/png;base64," + base64.b64encode(screenshot_bytes).decode("ascii")
+    return "data:image/webp;base64," + base64.b64encode(thumbnail).decode("ascii")
+
+
+def describe_agent_step(model_output) -> str:
+    """Short description of what the agent is doing in a step, for live progress."""
+    goal = getattr(model_output, 'next_goal', None)
+    if goal is None:
+        goal = getattr(getattr(model_output, 'current_state', None), 'next_goal', None)
+    if goal:
+        return " ".join(str(goal).split())[:200]
+    
+    names = []
+    for action in getattr(model_output, 'action', None) or []:
+        try:
+            names += [name for name, params in action.model_dump(exclude_unset=True).items() if params is not None]
+        except Exception:
+            continue
+    return ", ".join(names) or str(model_output)[:200]
+
+
 def get_app_url(app_name: str) -> str:
     """Get the URL for an app from config."""
     config_file = Path("config/apps.yaml")
@@ -164,21 +276,59 @@ def get_app_url(app_name: str) -> str:
     return defaults.get(app_name, f"https://{app_name}.com")
 
 
-def save_to_dataset(app_name: str, task: str, history: AgentHistoryList, screenshots_dir: Path):
-    """Save Browser Use results to dataset folder."""
-    from src.dataset.builder import DatasetBuilder
+def save_to_dataset(
+    app_name: str,
+    task: str,
+    history: AgentHistoryList,
+    screenshots_dir: Path,
+    timer: Optional[RunTimer] = None
+):
+    """
+    Save Browser Use results to dataset folder.
+    
+    Args:
+        app_name: App the guide is for
+        task: Task description
+        history: The agent's run history
+        screenshots_dir: Directory holding the captured step_*.png frames
+        timer: The run's timer; its spans so far are stored in metadata.json
+    """
+    timer = timer or RunTimer()
+    from src.dataset.blob_store import BlobStore
     from src.dataset.docs_generator import DocsGenerator
     
     # Create dataset structure
-    builder = DatasetBuilder()
-    task_name = task.replace(' ', '_').lower()
+    task_name = task_slug(task)
     
     dataset_path = Path("dataset") / app_name / task_name
-    screenshots_path = dataset_path / "screenshots"
-    screenshots_path.mkdir(parents=True, exist_ok=True)
+    dataset_path.mkdir(parents=True, exist_ok=True)
+    # Drop per-task screenshots left by older runs; screenshots now live in the blob store
+    legacy_screenshots_path = dataset_path / "screenshots"
+    if legacy_screenshots_path.exists():
+        shutil.rmtree(legacy_screenshots_path)
+    
+    # Screenshots are stored once by content hash, shared across steps, re-runs and tasks
+    blob_store = BlobStore("dataset")
+    
+    def store_screenshots(sources: List[Path]):
+        # Re-encode all frames in parallel, then store them in step order
+        raw_images = [source.read_bytes() for source in sources]
+        encoded_images = screenshot_encoder.encode_many(raw_images)
+        refs = []
+        for encoded in encoded_images:
+            ref = blob_store.put_bytes(encoded)
+            screenshot_files.append(blob_store.link_from(dataset_path, ref))
+            screenshot_hashes.append(ref.sha256)
+            refs.append(ref)
+        total_raw = sum(len(raw) for raw in raw_images)
+        total_encoded = sum(len(encoded) for encoded in encoded_images)
+        if total_raw:
+            print(f"   🗜️  Encoded {len(sources)} screenshots: {total_raw / 1e6:.2f} MB -> {total_encoded / 1e6:.2f} MB")
+        return refs
     
     # First, try to get screenshots from Browser Use's own storage
     screenshot_files = []
+    screenshot_hashes = []
     browser_use_screenshots = []
     
     # Extract screenshot paths from history
@@ -216,32 +366,27 @@ def save_to_dataset(app_name: str, task: str, history: AgentHistoryList, screens
         
         print(f"📸 Filtered to {len(filtered_screenshots)} task screenshots (removed {len(browser_use_screenshots) - len(filtered_screenshots)} login screenshots)")
         
-        for i, screenshot_path in enumerate(filtered_screenshots, start=1):
-            new_filename = f"{i:02d}_step_{i}.png"
-            new_path = screenshots_path / new_filename
-            shutil.copy2(screenshot_path, new_path)
-            screenshot_files.append(str(new_path.relative_to(dataset_path)))
-            print(f"   ✓ Copied {screenshot_path.name} -> {new_filename}")
+        with timer.span("save.encode"):
+            refs = store_screenshots(filtered_screenshots)
+        for screenshot_path, ref in zip(filtered_screenshots, refs):
+            status = "Stored" if ref.created else "Deduplicated"
+            print(f"   ✓ {status} {screenshot_path.name} -> {ref.sha256[:12]}")
     
     # Also check our custom screenshots directory (fallback)
     elif screenshots_dir and screenshots_dir.exists():
-        for i, screenshot_file in enumerate(sorted(screenshots_dir.glob("*.png")), start=1):
-            new_filename = f"{i:02d}_{screenshot_file.stem}.png"
-            new_path = screenshots_path / new_filename
-            shutil.copy2(screenshot_file, new_path)
-            screenshot_files.append(str(new_path.relative_to(dataset_path)))
+        with timer.span("save.encode"):
+            store_screenshots(sorted(screenshots_dir.glob("step_*.*")))
     
-    # Create metadata from history
+    # Create compact, typed step records from history
     captured_states = []
     for i, item in enumerate(history.history, start=1):
-        state = {
-            "step": i,
-            "screenshot": screenshot_files[i-1] if i <= len(screenshot_files) else "",
-            "description": str(item.state),
-            "action_taken": str(item.result.extracted_content if hasattr(item.result, 'extracted_content') else item.result),
-            "reasoning": ""
-        }
-        captured_states.append(state)
+        record = step_from_history(
+            i,
+            item,
+            screenshot=screenshot_files[i-1] if i <= len(screenshot_files) else "",
+            screenshot_sha256=screenshot_hashes[i-1] if i <= len(screenshot_hashes) else None
+        )
+        captured_states.append(record.to_json())
     
     # Save metadata
     metadata = {
@@ -251,59 +396,40 @@ def save_to_dataset(app_name: str, task: str, history: AgentHistoryList, screens
         "timestamp": datetime.now().isoformat(),
         "num_states": len(captured_states),
         "states": captured_states,
-        "framework": "browser-use"
+        "framework": "browser-use",
+        "schema_version": STEP_SCHEMA_VERSION,
+        # Everything up to this point; the job result carries the complete set
+        "timings": timer.to_json()
     }
     
-    metadata_path = dataset_path / "metadata.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    with timer.span("save.metadata"):
+        write_metadata(dataset_path / "metadata.json", metadata)
+        catalog.upsert_workflow(dataset_path, metadata)
     
-    # Generate documentation
-    docs_gen = DocsGenerator()
-    docs_gen.generate_workflow_markdown(str(dataset_path), metadata)
+    # Generate documentation (incremental: only this workflow and the README summary are rebuilt)
+    with timer.span("docs"):
+        docs_gen = DocsGenerator()
+        docs_gen.generate_all_docs()
     
     return str(dataset_path)
 
 
+def get_browser_page(browser):
+    """Return the active page of a Browser Use browser or a Playwright context, or None."""
+    if getattr(browser, 'pages', None):
+        return browser.pages[0]
+    for attr in ('_context', 'context', 'browser_context'):
+        context = getattr(browser, attr, None)
+        if context is not None and getattr(context, 'pages', None):
+            return context.pages[0]
+    return None
+
+
 async def detect_login_page(page) -> bool:
     """Detect if current page is a login page."""
     try:
-        # Get page content
-        content = await page.content()
-        url = page.url.lower()
-        title = await page.title()
-        title_lower = title.lower()
-        
-        # Check URL patterns
-        login_url_patterns = ['login', 'signin', 'sign-in', 'auth', 'authenticate', 'sso']
-        if any(pattern in url for pattern in login_url_patterns):
-            return True
-        
-        # Check title
-        login_title_patterns = ['log in', 'sign in', 'login', 'signin', 'authenticate']
-        if any(pattern in title_lower for pattern in login_title_patterns):
-            return True
-        
-        # Check for common login form elements
-        login_selectors = [
-            'input[type="password"]',
-            'input[name*="password"]',
-            'input[name*="email"]',
-            'input[placeholder*="password" i]',
-            'input[placeholder*="email" i]',
-            'button:has-text("Log in")',
-            'button:has-text("Sign in")',
-        ]
-        
-        for selector in login_selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    return True
-            except:
-                continue
-        
-        return False
+        probe = await PageProbe().run(page)
+        return probe.is_login
     except Exception as e:
         return False
 
@@ -317,47 +443,26 @@ async def wait_for_manual_login(browser, max_wait_time: int = 180):
     print("   The system will automatically detect when you're logged in")
     print(f"   (waiting up to {max_wait_time} seconds)\n")
     
-    start_time = time.time()
-    check_interval = 3  # Check every 3 seconds
-    
     try:
         # Access page through browser context (handle both public and private attrs)
-        page = None
-        if hasattr(browser, '_context') and browser._context and browser._context.pages:
-            page = browser._context.pages[0]
-        elif hasattr(browser, 'context') and browser.context and browser.context.pages:
-            page = browser.context.pages[0]
+        page = get_browser_page(browser)
         
         if not page:
             print("⚠ Could not access browser page")
             return False
         
-        initial_url = page.url
-        last_status_time = start_time
+        # Resumes as soon as the login form disappears, the page navigates
+        # away from it, or auth cookies show up - no fixed polling interval
+        logged_in = await wait_for_login_completion(
+            page,
+            max_wait_time=max_wait_time,
+            on_waiting=lambda elapsed: print(f"   ⏳ Still waiting... ({elapsed}s elapsed)")
+        )
         
-        while (time.time() - start_time) < max_wait_time:
-            await asyncio.sleep(check_interval)
-            
-            current_url = page.url
-            is_still_login = await detect_login_page(page)
-            
-            # Show periodic status
-            elapsed = int(time.time() - start_time)
-            if elapsed - (last_status_time - start_time) >= 15:  # Every 15 seconds
-                print(f"   ⏳ Still waiting... ({elapsed}s elapsed)")
-                last_status_time = time.time()
-            
-            # Check if user has navigated away from login
-            if current_url != initial_url and not is_still_login:
-                print("\n✓ Login detected! Continuing with navigation...\n")
-                await asyncio.sleep(2)  # Give page time to fully load
-                return True
-            
-            # Also check if login page disappeared (for SPAs)
-            if initial_url == current_url and not is_still_login:
-                print("\n✓ Login page changed! Continuing with navigation...\n")
-                await asyncio.sleep(2)
-                return True
+        if logged_in:
+            print("\n✓ Login detected! Continuing with navigation...\n")
+            await wait_for_stable(page, stability_config)  # Let the post-login page settle
+            return True
         
         # Timeout
         print(f"\n⏱ Timeout after {max_wait_time}s. Continuing anyway...")
@@ -368,16 +473,39 @@ async def wait_for_manual_login(browser, max_wait_time: int = 180):
         return False
 
 
-async def generate_guide(question: str):
-    """Generate UI guide using Browser Use framework."""
+async def generate_guide(
+    question: str,
+    browser_pool=None,
+    force_refresh: bool = False,
+    on_step: Optional[Callable[[Dict[str, Any]], None]] = None,
+    llm=None
+):
+    """
+    Generate UI guide using Browser Use framework.
+    
+    Args:
+        question: Natural language question, e.g. "How do I create a project in Linear?"
+        browser_pool: Optional BrowserPool; when given, the run uses a warm pooled
+            browser with an isolated context instead of launching its own Chromium
+        force_refresh: Re-run the agent even if a fresh guide for this task exists
+        on_step: Called with each captured step as soon as its screenshot is taken
+            (step, action, url, title and an inline thumbnail), so a UI can build
+            the guide while the agent is still running
+        llm: Browser Use chat model driving the agent (defaults to OpenAI from
+            OPENAI_API_KEY); the benchmarks pass a stub here
+    """
     print("\n" + "="*40)
     print("Agentic UI Guide Generator")
     print("="*40)
     print(f"\nQuestion: {question}\n")
     
+    # Spans for every stage of this run (returned with the result, exported on /metrics)
+    timer = RunTimer()
+    
     # Parse question (now includes URL discovery!)
     print("🤔 Understanding your question...")
-    parsed = await parse_question(question)
+    with timer.span("parse"):
+        parsed = await parse_question(question)
     
     app_name = parsed.get('app')
     task = parsed.get('task')
@@ -392,14 +520,18 @@ async def generate_guide(question: str):
     else:
         print(f"Note: This app typically doesn't require login\n")
     
+    # Reuse an existing guide for the same app/task if it is still fresh
+    if not force_refresh:
+        cached = guide_cache.lookup(app_name, task)
+        if cached:
+            print(f"⚡ Reusing existing guide: {cached['dataset_path']}/workflow.md")
+            print("   (pass --refresh to regenerate it)\n")
+            return {**cached, "timings": timer.to_json()}
+    
     # Create temp directory for screenshots
     screenshots_dir = Path(f"temp_browser_use_screenshots_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
     screenshots_dir.mkdir(exist_ok=True)
     
-    # Create persistent user data directory for browser sessions
-    user_data_dir = Path("browser_profile")
-    user_data_dir.mkdir(exist_ok=True)
-    
     # Create enhanced task description
     enhanced_task = f"""Navigate to {app_url} and {task}.
 
@@ -416,15 +548,20 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
     print(f"Generating guide: How to {task} in {app_name.title()}")
     print("="*70 + "\n")
     
-    # Initialize Browser Use components with persistent user data directory
-    # This allows the browser to save and reuse login sessions
-    browser = Browser(
-        headless=False,
-        user_data_dir=str(user_data_dir.absolute()),
+    browser_options = dict(
         highlight_elements=False,  # Disable overlays - they clutter screenshots
         dom_highlight_elements=False,  # Disable DOM element indexing boxes
         paint_order_filtering=False,  # Disable visual filtering
     )
+    browser = None
+    lease = None
+    # Where captures read the page from: the lease's Playwright context when
+    # pooled, otherwise Browser Use's own browser
+    page_source = None
+    if browser_pool is not None:
+        session_location = str(browser_pool.session_path(app_name))
+    else:
+        session_location = "./browser_profile/"
     
     # Browser Use will automatically use OPENAI_API_KEY from .env
     # Passing llm=None makes it use OpenAI GPT-4o by default
@@ -442,23 +579,49 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
         print("   The browser will open and navigate to the login page.")
         print("   After navigation, you'll be prompted to log in.\n")
     
+    # Readiness thresholds come from the app's `readiness` block in apps.yaml
+    page_probe = PageProbe(ReadinessThresholds.for_app(app_name))
+    
     # Callback to capture screenshots only on significant UI changes
     screenshot_counter = [0]  # Use list to modify in closure
     last_screenshot_hash = [None]  # Track last screenshot to detect changes
     significant_screenshots = []  # Store paths of significant screenshots
     agent_start_time = [None]  # Track when agent starts to skip early screenshots
+    live_events = set()  # Thumbnails being rendered for on_step
+    
+    async def emit_step(step_number: int, screenshot_bytes: bytes, action_text: str, url: str, title: str):
+        try:
+            thumbnail = await live_thumbnail(screenshot_bytes)
+            on_step({
+                "step": step_number,
+                "action": action_text,
+                "url": url,
+                "title": title,
+                "thumbnail": thumbnail
+            })
+        except Exception as e:
+            print(f"   ⚠ Could not stream step {step_number}: {e}")
+    
+    async def stream_step(step_number: int, screenshot_bytes: bytes, action_text: str, page):
+        """Send a captured step to on_step without holding up the agent."""
+        if on_step is None:
+            return
+        # Read now, while the page still shows this frame; the agent moves on during the thumbnail
+        try:
+            url, title = page.url, await page.title()
+        except Exception as e:
+            print(f"   ⚠ Could not stream step {step_number}: {e}")
+            return
+        event = asyncio.create_task(emit_step(step_number, screenshot_bytes, action_text, url, title))
+        live_events.add(event)
+        event.add_done_callback(live_events.discard)
 
     async def ensure_search_results_visible():
         """If this is a search task and no results are shown, auto-submit the search query."""
         if not task or "search" not in task.lower():
             return False
         
-        current_page = None
-        if hasattr(browser, '_context') and browser._context and browser._context.pages:
-            current_page = browser._context.pages[0]
-        elif hasattr(browser, 'context') and browser.context and browser.context.pages:
-            current_page = browser.context.pages[0]
-        
+        current_page = get_browser_page(page_source)
         if not current_page:
             return False
         
@@ -488,8 +651,7 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
                     await element.click()
                     await element.fill(query)
                     await element.press('Enter')
-                    await current_page.wait_for_load_state('networkidle', timeout=6000)
-                    await asyncio.sleep(2.0)
+                    await wait_for_stable(current_page, stability_config)
                     return True
             except Exception:
                 continue
@@ -510,159 +672,85 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
                 return
             
             # Access the page using Browser Use's browser session
-            current_page = None
-            session = None
-            
-            # Get browser session
-            if hasattr(browser, '_context'):
-                session = browser._context
-            elif hasattr(browser, 'context'):
-                session = browser.context
-            
-            if session and hasattr(session, 'pages') and session.pages:
-                current_page = session.pages[0]
-            
+            current_page = get_browser_page(page_source)
             if not current_page:
                 return
             
-            # Wait for UI to stabilize after actions
-            # 1. Wait for network activity to settle
-            try:
-                await current_page.wait_for_load_state('networkidle', timeout=3000)
-            except:
-                pass  # Continue even if timeout
+            # Wait for UI to stabilize after actions: returns as soon as DOM
+            # mutations, layout shifts and recent requests have gone quiet
+            with timer.span("capture.stabilize", step):
+                await wait_for_stable(current_page, stability_config)
             
-            # 2. Wait for animations to complete
-            await asyncio.sleep(1.5)
+            # Hide Browser Use overlays and highlighting. The suppression is
+            # installed once per page and only inspects DOM changes since the
+            # last capture, so this stays cheap on large SPAs
+            with timer.span("capture.cleanup", step):
+                try:
+                    hidden = await suppress_overlays(current_page)
+                    if hidden:
+                        # Wait for the DOM update to be painted after hiding overlays
+                        await wait_for_stable(current_page, stability_config, quiet_ms=50)
+                except:
+                    pass  # Continue even if cleanup fails
             
-            # 3. Aggressively remove ALL Browser Use overlays and highlighting
-            try:
-                await current_page.evaluate("""
-                    () => {
-                        // Remove all elements with extremely high z-index (overlays)
-                        const allElements = document.querySelectorAll('*');
-                        allElements.forEach(el => {
-                            const zIndex = window.getComputedStyle(el).zIndex;
-                            if (zIndex && parseInt(zIndex) > 999999) {
-                                el.remove();
-                            }
-                        });
-                        
-                        // Remove elements with Browser Use signatures
-                        const browserUseEls = document.querySelectorAll(
-                            '[data-browser-use], [data-browser-use-index], [id^="browser-use"], ' +
-                            '[class*="browser-use"], [data-highlight], [data-index], ' +
-                            'svg[style*="pointer-events: none"]'
-                        );
-                        browserUseEls.forEach(el => el.remove());
-                        
-                        // Remove all absolutely positioned divs at the top level with high z-index
-                        const topDivs = Array.from(document.body.children).filter(el => {
-                            if (el.tagName === 'DIV') {
-                                const style = window.getComputedStyle(el);
-                                return style.position === 'absolute' || style.position === 'fixed';
-                            }
-                            return false;
-                        });
-                        topDivs.forEach(div => {
-                            const style = window.getComputedStyle(div);
-                            const zIndex = parseInt(style.zIndex);
-                            if (zIndex > 1000) {
-                                div.remove();
-                            }
-                        });
-                    }
-                """)
-                # Wait for DOM to update after removing overlays
-                await asyncio.sleep(0.5)
-            except:
-                pass  # Continue even if cleanup fails
+            # Inspect login state, content readiness and skeletons in one round trip
+            with timer.span("capture.probe", step):
+                try:
+                    probe = await page_probe.run(current_page)
+                except Exception:
+                    probe = None  # If the probe fails, only the URL check below applies
             
             # LOGIN DETECTION: Check if this is a login/auth page and handle it
-            if requires_auth and not login_detected[0]:
-                is_login = await detect_login_page(current_page)
-                if is_login:
-                    login_detected[0] = True
-                    pre_login_message_shown[0] = True
-                    
-                    print("\n" + "="*70)
-                    print("🔐 LOGIN PAGE DETECTED - PAUSING AGENT")
-                    print("="*70)
-                    print("👤 Please log in manually in the browser window")
-                    print("   DO NOT CLOSE THE BROWSER")
-                    print("   The system will resume automatically once logged in")
-                    print(f"   (You have up to 5 minutes)")
-                    print("="*70 + "\n")
-                    
-                    # Wait for manual login - this pauses everything
-                    login_success = await wait_for_manual_login(browser, max_wait_time=300)
-                    
-                    if login_success:
-                        print("\n✓ Login successful! Resuming task execution...\n")
-                    else:
-                        print("\n⚠️  Login timeout or not confirmed. Attempting to continue anyway...\n")
-                    
-                    # Don't capture login page screenshots - return early
-                    return
+            if requires_auth and not login_detected[0] and probe and probe.is_login:
+                login_detected[0] = True
+                pre_login_message_shown[0] = True
+                
+                print("\n" + "="*70)
+                print("🔐 LOGIN PAGE DETECTED - PAUSING AGENT")
+                print("="*70)
+                print("👤 Please log in manually in the browser window")
+                print("   DO NOT CLOSE THE BROWSER")
+                print("   The system will resume automatically once logged in")
+                print(f"   (You have up to 5 minutes)")
+                print("="*70 + "\n")
+                
+                # Wait for manual login - this pauses everything
+                with timer.span("login.wait", step):
+                    login_success = await wait_for_manual_login(page_source, max_wait_time=300)
+                
+                if login_success:
+                    print("\n✓ Login successful! Resuming task execution...\n")
+                else:
+                    print("\n⚠️  Login timeout or not confirmed. Attempting to continue anyway...\n")
+                
+                # Don't capture login page screenshots - return early
+                return
             
             # SKIP screenshot capture if we're still on a login/auth page
-            current_url = current_page.url.lower()
-            if any(pattern in current_url for pattern in ['login', 'signin', 'sign-in', 'auth', 'accounts.google', 'sso']):
+            if probe:
+                on_auth_page = probe.is_auth_url
+            else:
+                on_auth_page = any(pattern in current_page.url.lower() for pattern in AUTH_URL_PATTERNS)
+            if on_auth_page:
                 # Skip login pages - don't capture these in the guide
                 return
             
             # SKIP screenshot if page is still loading (gray placeholders, no content)
-            try:
-                # Check if page has actual visible content
-                has_content = await current_page.evaluate("""
-                    () => {
-                        // Check multiple indicators that page has real content
-                        const images = document.querySelectorAll('img[src]:not([src=""])');
-                        const videos = document.querySelectorAll('video');
-                        const links = document.querySelectorAll('a[href]');
-                        const buttons = document.querySelectorAll('button');
-                        const textContent = document.body.innerText.trim();
-                        
-                        // Count actually loaded media
-                        let loadedMedia = 0;
-                        images.forEach(img => {
-                            // Check if image is loaded and visible
-                            if (img.complete && img.naturalHeight > 50) {
-                                loadedMedia++;
-                            }
-                        });
-                        videos.forEach(v => {
-                            if (v.readyState >= 2) loadedMedia++;  // HAVE_CURRENT_DATA or better
-                        });
-                        
-                        // Page must have: loaded media, links/buttons, and text
-                        return loadedMedia >= 5 && links.length > 20 && 
-                               buttons.length > 5 && textContent.length > 1000;
-                    }
-                """)
-                
-                if not has_content:
-                    # Page is still loading, skip this screenshot
-                    print(f"   ⏭️  Skipping screenshot - page still loading")
-                    return
-                
-                # Skip if skeleton loading components are still visible
-                skeleton_present = await current_page.evaluate("""
-                    () => !!document.querySelector(
-                        '.skeleton, [class*="skeleton"], ytd-rich-grid-skeleton, ' +
-                        '#masthead-skeleton, [placeholder][aria-hidden="true"]'
-                    )
-                """)
-                if skeleton_present:
-                    print("   ⏭️  Skipping screenshot - skeleton placeholders detected")
-                    return
-            except:
-                pass  # If check fails, continue with screenshot
+            if probe and not probe.content_ready:
+                # Page is still loading, skip this screenshot
+                print(f"   ⏭️  Skipping screenshot - page still loading")
+                return
+            
+            # Skip if skeleton loading components are still visible
+            if probe and probe.skeleton:
+                print("   ⏭️  Skipping screenshot - skeleton placeholders detected")
+                return
             
             # Take screenshot in memory to check if state changed
-            screenshot_bytes = await current_page.screenshot(full_page=True)
-            current_image = Image.open(io.BytesIO(screenshot_bytes))
-            current_hash = imagehash.average_hash(current_image)
+            with timer.span("capture.screenshot", step):
+                screenshot_bytes = await current_page.screenshot(full_page=True)
+            with timer.span("capture.hash", step):
+                current_hash = await frame_processor.average_hash(screenshot_bytes)
             
             # Check if this is a significant change
             is_significant = False
@@ -681,9 +769,9 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
                 screenshot_counter[0] += 1
                 screenshot_path = screenshots_dir / f"step_{screenshot_counter[0]:02d}.png"
                 
-                # Save the screenshot
-                with open(screenshot_path, 'wb') as f:
-                    f.write(screenshot_bytes)
+                # Save the screenshot (full-resolution bytes are only kept for saved frames)
+                with timer.span("capture.write", step):
+                    await asyncio.to_thread(write_bytes, screenshot_path, screenshot_bytes)
                 
                 significant_screenshots.append(screenshot_path)
                 last_screenshot_hash[0] = current_hash
@@ -696,6 +784,7 @@ The goal is to SHOW how to do this task, not necessarily execute every sub-step.
                     action_desc = str(action)
                 
                 print(f"📸 Captured state change {screenshot_counter[0]}: {action_desc[:60]}...")
+                await stream_step(screenshot_counter[0], screenshot_bytes, describe_agent_step(action), current_page)
             
         except Exception as e:
             print(f"⚠ Could not process screenshot: {e}")
@@ -741,76 +830,110 @@ CRITICAL FOR SEARCH TASKS:
 
 The goal is to DEMONSTRATE the workflow efficiently, not to complete every minor detail."""
     
-    # For auth sites: Open browser first, then pause for manual login
-    if requires_auth:
-        print("\n" + "="*70)
-        print("🔐 IMPORTANT: THIS SITE REQUIRES MANUAL LOGIN")
-        print("="*70)
-        print("Opening browser now...")
-        print("="*70 + "\n")
+    try:
+        if browser_pool is not None:
+            # Take a warm browser from the pool with a fresh context seeded from
+            # this app's saved session, so concurrent runs never share state.
+            # Browser Use attaches over CDP and drives the lease's tab
+            with timer.span("browser.start"):
+                lease = await browser_pool.acquire(app_name)
+            browser = Browser(cdp_url=lease.cdp_url, keep_alive=True, **browser_options)
+            page_source = lease.context
+        else:
+            # Initialize Browser Use components with persistent user data directory
+            # This allows the browser to save and reuse login sessions
+            user_data_dir = Path("browser_profile")
+            user_data_dir.mkdir(exist_ok=True)
+            browser = Browser(
+                headless=False,
+                user_data_dir=str(user_data_dir.absolute()),
+                **browser_options
+            )
+            page_source = browser
         
-        # Start the browser and navigate to the URL
-        await browser.start()
-        print(f"🌐 Navigating to {app_url}...")
-        await browser.navigate_to(app_url)
-        await asyncio.sleep(3)  # Let page load
+        # For auth sites: Open browser first, then pause for manual login
+        if requires_auth:
+            print("\n" + "="*70)
+            print("🔐 IMPORTANT: THIS SITE REQUIRES MANUAL LOGIN")
+            print("="*70)
+            print("Opening browser now...")
+            print("="*70 + "\n")
+            
+            # Start the browser and navigate to the URL
+            with timer.span("browser.start"):
+                await browser.start()
+            print(f"🌐 Navigating to {app_url}...")
+            with timer.span("browser.navigate"):
+                await browser.navigate_to(app_url)
+                login_page = get_browser_page(page_source)
+                if login_page:
+                    await wait_for_stable(login_page, stability_config)
+            
+            print("\n" + "="*70)
+            print("✅ Browser is now open!")
+            print("\nOn FIRST RUN:")
+            print(f"  1. Log in to {app_url} in the Chromium browser window above")
+            print("  2. Complete the login process (including 2FA if needed)")
+            print("  3. Come back here and press ENTER to start the agent")
+            print("\nOn SUBSEQUENT RUNS:")
+            print("  - Your login session will be automatically saved")
+            print("  - Just press ENTER to continue (no need to log in again)")
+            print(f"\n💡 Tip: The login session is saved in {session_location}")
+            print("   Delete it if you want to clear saved sessions.")
+            print("="*70 + "\n")
+            
+            # Block until user is ready
+            with timer.span("login.wait"):
+                await asyncio.get_event_loop().run_in_executor(None, input, "Press ENTER when you're logged in and ready to continue...")
+            print("\n✓ Starting agent...\n")
         
-        print("\n" + "="*70)
-        print("✅ Browser is now open!")
-        print("\nOn FIRST RUN:")
-        print(f"  1. Log in to {app_url} in the Chromium browser window above")
-        print("  2. Complete the login process (including 2FA if needed)")
-        print("  3. Come back here and press ENTER to start the agent")
-        print("\nOn SUBSEQUENT RUNS:")
-        print("  - Your login session will be automatically saved")
-        print("  - Just press ENTER to continue (no need to log in again)")
-        print("\n💡 Tip: The browser profile is saved in ./browser_profile/")
-        print("   Delete this folder if you want to clear saved sessions.")
-        print("="*70 + "\n")
+        # Step counter for clean logging
+        step_counter = [0]
+        # End of the previous step callback: the agent's own time per step
+        # (LLM call and actions) is what elapses between callbacks
+        last_callback_end = [None]
         
-        # Block until user is ready
-        await asyncio.get_event_loop().run_in_executor(None, input, "Press ENTER when you're logged in and ready to continue...")
-        print("\n✓ Starting agent...\n")
-        await asyncio.sleep(1)
-    
-    # Step counter for clean logging
-    step_counter = [0]
-    
-    # Create a cleaner step callback for user-friendly output
-    async def clean_step_logger(state, action, step):
-        """Log only essential step information in a clean format."""
-        step_counter[0] = step
+        # Create a cleaner step callback for user-friendly output
+        async def clean_step_logger(state, action, step):
+            """Log only essential step information in a clean format."""
+            step_counter[0] = step
+            now = time.perf_counter()
+            if last_callback_end[0] is not None:
+                timer.record("agent.step", last_callback_end[0], now - last_callback_end[0], step)
+            
+            # Extract action type and target
+            action_str = str(action)
+            if 'click' in action_str.lower():
+                print(f"  Step {step}: 🖱️  Clicking element...")
+            elif 'input' in action_str.lower() or 'type' in action_str.lower():
+                print(f"  Step {step}: ⌨️  Typing text...")
+            elif 'navigate' in action_str.lower():
+                print(f"  Step {step}: 🌐 Navigating...")
+            elif 'wait' in action_str.lower():
+                print(f"  Step {step}: ⏳ Waiting...")
+            elif 'done' in action_str.lower():
+                print(f"  Step {step}: ✅ Task completed!")
+            else:
+                print(f"  Step {step}: 🔧 {action_str[:50]}...")
+            
+            # Call the screenshot callback
+            with timer.span("capture", step):
+                await save_step_callback(state, action, step)
+            last_callback_end[0] = time.perf_counter()
         
-        # Extract action type and target
-        action_str = str(action)
-        if 'click' in action_str.lower():
-            print(f"  Step {step}: 🖱️  Clicking element...")
-        elif 'input' in action_str.lower() or 'type' in action_str.lower():
-            print(f"  Step {step}: ⌨️  Typing text...")
-        elif 'navigate' in action_str.lower():
-            print(f"  Step {step}: 🌐 Navigating...")
-        elif 'wait' in action_str.lower():
-            print(f"  Step {step}: ⏳ Waiting...")
-        elif 'done' in action_str.lower():
-            print(f"  Step {step}: ✅ Task completed!")
-        else:
-            print(f"  Step {step}: 🔧 {action_str[:50]}...")
+        # Create agent with callback
+        agent = Agent(
+            task=modified_task,
+            llm=llm,  # None: Browser Use's default OpenAI model from OPENAI_API_KEY
+            browser=browser,
+            register_new_step_callback=clean_step_logger,
+        )
         
-        # Call the screenshot callback
-        await save_step_callback(state, action, step)
-    
-    # Create agent with callback
-    agent = Agent(
-        task=modified_task,
-        llm=None,  # Will use OpenAI from OPENAI_API_KEY env var
-        browser=browser,
-        register_new_step_callback=clean_step_logger,
-    )
-    
-    try:
         # Run the agent
         print("‣‣ Agent working on task:\n")
-        history = await agent.run()
+        last_callback_end[0] = time.perf_counter()
+        with timer.span("agent.run"):
+            history = await agent.run()
         print()
         
         # For search tasks, ensure results are actually visible (auto-submit if needed)
@@ -821,54 +944,62 @@ The goal is to DEMONSTRATE the workflow efficiently, not to complete every minor
         
         # Capture MULTIPLE final screenshots to ensure we get the completed state
         print("\n📸 Capturing final state screenshots...")
+        final_capture_start = time.perf_counter()
         try:
-            if hasattr(browser, '_context') and browser._context and browser._context.pages:
-                current_page = browser._context.pages[0]
+            current_page = get_browser_page(page_source)
+            if current_page:
                 
                 # Wait for any final animations/loading to complete
-                await asyncio.sleep(2.0)
-                
-                # Try to wait for network idle
-                try:
-                    await current_page.wait_for_load_state('networkidle', timeout=3000)
-                except:
-                    pass
+                await wait_for_stable(current_page, stability_config)
                 
                 # Capture first final screenshot
                 screenshot_bytes = await current_page.screenshot(full_page=True)
-                current_image = Image.open(io.BytesIO(screenshot_bytes))
-                current_hash = imagehash.average_hash(current_image)
+                current_hash = await frame_processor.average_hash(screenshot_bytes)
                 
                 # Check if final state is different from last captured
                 if last_screenshot_hash[0] is None or (current_hash - last_screenshot_hash[0]) > 5:
                     screenshot_counter[0] += 1
                     screenshot_path = screenshots_dir / f"step_{screenshot_counter[0]:02d}.png"
-                    with open(screenshot_path, 'wb') as f:
-                        f.write(screenshot_bytes)
+                    await asyncio.to_thread(write_bytes, screenshot_path, screenshot_bytes)
                     print(f"   ✓ Captured final state {screenshot_counter[0]}")
+                    await stream_step(screenshot_counter[0], screenshot_bytes, "Final state", current_page)
                     last_screenshot_hash[0] = current_hash
                 
-                # Wait a bit more and capture another final screenshot
+                # Capture another final screenshot once the page settles again
                 # (in case search results or final content is still loading)
-                await asyncio.sleep(3.0)
+                await wait_for_stable(current_page, stability_config)
+                del screenshot_bytes
                 screenshot_bytes_2 = await current_page.screenshot(full_page=True)
-                current_image_2 = Image.open(io.BytesIO(screenshot_bytes_2))
-                current_hash_2 = imagehash.average_hash(current_image_2)
+                current_hash_2 = await frame_processor.average_hash(screenshot_bytes_2)
                 
                 # Check if this second screenshot is different
                 if (current_hash_2 - current_hash) > 5:
                     screenshot_counter[0] += 1
                     screenshot_path_2 = screenshots_dir / f"step_{screenshot_counter[0]:02d}.png"
-                    with open(screenshot_path_2, 'wb') as f:
-                        f.write(screenshot_bytes_2)
+                    await asyncio.to_thread(write_bytes, screenshot_path_2, screenshot_bytes_2)
                     print(f"   ✓ Captured additional final state {screenshot_counter[0]}")
+                    await stream_step(screenshot_counter[0], screenshot_bytes_2, "Final state", current_page)
                     
         except Exception as e:
             print(f"   ⚠ Could not capture final state: {e}")
+        timer.record("capture.final", final_capture_start, time.perf_counter() - final_capture_start)
+        
+        # Let live step events go out before the guide is announced
+        if live_events:
+            await asyncio.gather(*live_events, return_exceptions=True)
         
         # Save to dataset
         print("\n📁 Saving to dataset...")
-        dataset_path = save_to_dataset(app_name, task, history, screenshots_dir)
+        # Off the loop: encoding and blob writes must not stall other jobs' agents
+        with timer.span("save"):
+            dataset_path = await asyncio.to_thread(save_to_dataset, app_name, task, history, screenshots_dir, timer)
+        
+        if PREGENERATE_DERIVATIVES:
+            try:
+                with timer.span("derivatives"):
+                    await derivative_cache.pregenerate(workflow_screenshot_paths(Path(dataset_path)))
+            except Exception as e:
+                print(f"   ⚠ Could not pre-generate previews: {e}")
         
         print("\n" + "="*70)
         print("✓ GUIDE GENERATED SUCCESSFULLY!")
@@ -876,28 +1007,44 @@ The goal is to DEMONSTRATE the workflow efficiently, not to complete every minor
         print(f"\nTask: {task}")
         print(f"App: {app_name}")
         print(f"\nLocation: {dataset_path}/")
-        print(f"Screenshots: {dataset_path}/screenshots/")
+        print("Screenshots: dataset/_blobs/")
         print(f"Guide: {dataset_path}/workflow.md")
         print(f"Metadata: {dataset_path}/metadata.json")
         print(f"\nTotal steps captured: {len(history.history)}")
         print("="*70 + "\n")
         
+        timings = timer.to_json()
+        print(f"⏱️  {timings['total_ms'] / 1000:.1f}s total: " + ", ".join(
+            f"{name} {stage['total_ms'] / 1000:.1f}s"
+            for name, stage in timings['stages'].items() if '.' not in name
+        ))
+        
         # Return success info
         return {
             "success": True,
             "dataset_path": dataset_path,
             "app_name": app_name,
             "task": task,
-            "num_steps": len(history.history)
+            "num_steps": len(history.history),
+            "timings": timings
         }
         
     except Exception as e:
         print(f"\n✗ Error: {e}")
         import traceback
         traceback.print_exc()
-        return {"success": False, "error": str(e)}
+        return {"success": False, "error": str(e), "timings": timer.to_json()}
     
     finally:
+        # Hand the pooled browser back (this also saves the app's session)
+        if lease is not None:
+            if browser is not None:
+                try:
+                    await browser.stop()  # Disconnects only; the pool owns the process
+                except Exception as e:
+                    print(f"⚠ Could not detach from pooled browser: {e}")
+            await browser_pool.release(lease)
+        
         # Cleanup temp screenshots
         try:
             if screenshots_dir.exists():
@@ -908,8 +1055,11 @@ The goal is to DEMONSTRATE the workflow efficiently, not to complete every minor
 
 async def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python app.py \"Your question here\"")
+    args = [arg for arg in sys.argv[1:] if arg != "--refresh"]
+    force_refresh = "--refresh" in sys.argv[1:]
+    
+    if not args:
+        print("Usage: python app.py \"Your question here\" [--refresh]")
         print("\nExamples:")
         print('  python app.py "How do I create a project in Linear?"')
         print('  python app.py "How do I filter a database in Notion?"')
@@ -924,10 +1074,10 @@ async def main():
         print("Please create a .env file with: OPENAI_API_KEY=sk-...")
         sys.exit(1)
     
-    question = sys.argv[1]
+    question = args[0]
     
     try:
-        await generate_guide(question)
+        await generate_guide(question, force_refresh=force_refresh)
     except KeyboardInterrupt:
         print("\n\n⚠ Interrupted by user")
         sys.exit(1)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of generate_guide, fully offline.
+
+Serves the fixture apps in benchmarks/fixtures on localhost, answers every
+LLM request from benchmarks/stub_llm.py, and runs the scenarios from
+benchmarks/scenarios.yaml through the real pipeline (browser, capture,
+encoding, dataset, docs) in a throwaway workspace. Reports end-to-end and
+per-stage p50/p95, screenshots and bytes written, and stores the results
+as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/generate_guide.py [--suite smoke|full] [--scenario NAME ...]
+        [--runs 3] [--warmup 1] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+from stub_llm import StubLLM
+
+
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server() -> ThreadingHTTPServer:
+    """Serve benchmarks/fixtures on a free localhost port."""
+    handler = functools.partial(_QuietHandler, directory=str(FIXTURES_DIR))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="fixtures").start()
+    return server
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "mean": round(statistics.fmean(values), 1),
+        "min": round(min(values), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def bytes_written_since(directory: Path, since_ns: int) -> int:
+    """Total size of files under directory created or modified since since_ns."""
+    total = 0
+    for path in directory.rglob("*"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file() and stat.st_mtime_ns >= since_ns:
+            total += stat.st_size
+    return total
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def prepare_workspace(workspace: Path, scenarios: Dict[str, Dict[str, Any]], base_url: str):
+    """
+    Lay out a throwaway working directory: the repo's apps.yaml plus the
+    fixture apps, so questions resolve locally and nothing touches the real dataset.
+    """
+    config_dir = workspace / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    with open(REPO_ROOT / "config" / "apps.yaml", 'r') as f:
+        apps = yaml.safe_load(f) or {}
+    for scenario in scenarios.values():
+        entry = {
+            "name": scenario["name"],
+            "base_url": f"{base_url}/{scenario['entry']}",
+            "requires_auth": scenario.get("requires_auth", False),
+        }
+        if scenario.get("login"):
+            entry["login_url"] = f"{base_url}/{scenario['login']}"
+        apps[scenario["app"]] = entry
+    with open(config_dir / "apps.yaml", 'w') as f:
+        yaml.safe_dump(apps, f, sort_keys=False)
+
+
+def expand(value: Any, variables: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for key, replacement in variables.items():
+            value = value.replace("{" + key + "}", replacement)
+        return value
+    if isinstance(value, dict):
+        return {key: expand(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand(item, variables) for item in value]
+    return value
+
+
+async def run_scenario(app_module, pool, llm, stub: StubLLM, name: str, scenario: Dict[str, Any],
+                       base_url: str, runs: int, warmup: int, log_file) -> Dict[str, Any]:
+    """Run one scenario warmup + runs times and aggregate the measured runs."""
+    from src.dataset.blob_store import workflow_screenshot_paths
+
+    entry_url = f"{base_url}/{scenario['entry']}"
+    script = expand(scenario["script"], {"entry_url": entry_url})
+    parse_result = {
+        "app": scenario["app"],
+        "task": scenario["question"],
+        "url": entry_url,
+        "requires_auth": scenario.get("requires_auth", False),
+    }
+
+    samples = []
+    failures = []
+    for index in range(warmup + runs):
+        measured = index >= warmup
+        stub.load(script, parse_result)
+        started_ns = time.time_ns()
+        started = time.perf_counter()
+        with redirect_stdout(log_file):
+            result = await app_module.generate_guide(
+                scenario["question"], browser_pool=pool, force_refresh=True, llm=llm
+            )
+        e2e_ms = (time.perf_counter() - started) * 1000
+        label = f"{name} #{index + 1}{'' if measured else ' (warmup)'}"
+
+        if not result or not result.get("success"):
+            error = (result or {}).get("error", "no result")
+            print(f"   ✗ {label}: {error}")
+            if measured:
+                failures.append(error)
+            continue
+
+        dataset_path = Path(result["dataset_path"])
+        stages = {
+            stage: values["total_ms"]
+            for stage, values in (result.get("timings") or {}).get("stages", {}).items()
+        }
+        sample = {
+            "e2e_ms": e2e_ms,
+            "stages": stages,
+            "screenshots": len(workflow_screenshot_paths(dataset_path)),
+            "frames_captured": ((result.get("timings") or {}).get("stages", {}).get("capture.write") or {}).get("count", 0),
+            "agent_steps": result.get("num_steps", 0),
+            "bytes_written": bytes_written_since(Path("dataset"), started_ns),
+            "llm_requests": stub.requests,
+        }
+        print(f"   ✓ {label}: {e2e_ms / 1000:.2f}s, {sample['screenshots']} screenshots, "
+              f"{sample['bytes_written'] / 1024:.0f} KB written")
+        if measured:
+            samples.append(sample)
+
+    stage_names = sorted({stage for sample in samples for stage in sample["stages"]})
+    return {
+        "question": scenario["question"],
+        "runs": len(samples),
+        "failures": failures,
+        "e2e_ms": distribution([s["e2e_ms"] for s in samples]),
+        "stages_ms": {
+            stage: distribution([s["stages"].get(stage, 0.0) for s in samples])
+            for stage in stage_names
+        },
+        "screenshots": distribution([s["screenshots"] for s in samples]),
+        "frames_captured": distribution([s["frames_captured"] for s in samples]),
+        "agent_steps": distribution([s["agent_steps"] for s in samples]),
+        "bytes_written": distribution([s["bytes_written"] for s in samples]),
+        "llm_requests": distribution([s["llm_requests"] for s in samples]),
+    }
+
+
+async def run(args, scenarios: Dict[str, Dict[str, Any]], names: List[str]) -> Dict[str, Any]:
+    fixtures = start_fixture_server()
+    base_url = f"http://127.0.0.1:{fixtures.server_address[1]}"
+    stub = StubLLM()
+    stub.start()
+
+    # Nothing may reach OpenAI: both the question parser and the agent talk to the stub
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+    workspace = Path(args.workspace or tempfile.mkdtemp(prefix="navigator-bench-"))
+    prepare_workspace(workspace, scenarios, base_url)
+    log_path = workspace / "generate_guide.log"
+    original_cwd = os.getcwd()
+    original_stdin = sys.stdin
+    os.chdir(workspace)
+    # Login scenarios wait for ENTER before the agent starts; press it right away
+    sys.stdin = io.StringIO("\n" * 1000)
+
+    pool = None
+    try:
+        # app.py resolves config/ and dataset/ against the working directory at import
+        import app as app_module
+        from browser_use import ChatOpenAI
+        from src.browser import BrowserPool
+
+        llm = ChatOpenAI(model="stub-llm", base_url=stub.base_url, api_key="stub-key")
+        pool = BrowserPool(size=1, headless=not args.headed, sessions_dir=str(workspace / "browser_sessions"))
+        await pool.start()
+
+        results = {}
+        with open(log_path, 'w') as log_file:
+            for name in names:
+                print(f"\n▶ {name}")
+                results[name] = await run_scenario(
+                    app_module, pool, llm, stub, name, scenarios[name],
+                    base_url, args.runs, args.warmup, log_file
+                )
+        return results
+    finally:
+        if pool is not None:
+            await pool.stop()
+        sys.stdin = original_stdin
+        os.chdir(original_cwd)
+        stub.stop()
+        fixtures.shutdown()
+        if args.workspace:
+            print(f"\nWorkspace kept at {workspace} (log: {log_path})")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print("\n" + "=" * 78)
+    print(f"{'scenario':<14}{'e2e p50':>10}{'e2e p95':>10}{'shots':>8}{'KB written':>12}{'vs baseline':>14}")
+    print("-" * 78)
+    for name, result in report["scenarios"].items():
+        e2e = result["e2e_ms"]
+        if not e2e:
+            print(f"{name:<14}{'failed':>10}")
+            continue
+        delta = ""
+        previous = ((baseline or {}).get("scenarios", {}).get(name) or {}).get("e2e_ms")
+        if previous:
+            delta = f"{(e2e['p50'] - previous['p50']) / previous['p50'] * 100:+.1f}%"
+        print(f"{name:<14}{e2e['p50'] / 1000:>9.2f}s{e2e['p95'] / 1000:>9.2f}s"
+              f"{result['screenshots']['p50']:>8.0f}{result['bytes_written']['p50'] / 1024:>12.0f}{delta:>14}")
+
+    print("\nPer-stage p50 (ms)")
+    for name, result in report["scenarios"].items():
+        previous = ((baseline or {}).get("scenarios", {}).get(name) or {}).get("stages_ms", {})
+        stages = sorted(result["stages_ms"].items(), key=lambda item: -item[1]["p50"])
+        print(f"  {name}:")
+        for stage, values in stages:
+            line = f"    {stage:<22}{values['p50']:>10.1f}{values['p95']:>10.1f} (p95)"
+            if stage in previous and previous[stage].get("p50"):
+                line += f"   {values['p50'] - previous[stage]['p50']:+.1f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios-file", default=str(BENCH_DIR / "scenarios.yaml"), help="Scenario definitions")
+    parser.add_argument("--suite", default="smoke", help="Suite of scenarios to run (see scenarios.yaml)")
+    parser.add_argument("--scenario", action="append", help="Run only this scenario (repeatable, overrides --suite)")
+    parser.add_argument("--runs", type=int, default=3, help="Measured runs per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per scenario first")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--workspace", help="Keep the working directory (dataset, logs) here")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+
+    with open(args.scenarios_file, 'r') as f:
+        config = yaml.safe_load(f)
+    scenarios = config["scenarios"]
+    names = args.scenario or config["suites"][args.suite]
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    revision = git_revision()
+    started = datetime.now()
+    results = asyncio.run(run(args, scenarios, names))
+
+    report = {
+        "version": 1,
+        "timestamp": started.isoformat(timespec="seconds"),
+        **revision,
+        "suite": None if args.scenario else args.suite,
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "scenarios": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{started.strftime('%Y%m%d_%H%M%S')}_{(revision['commit'] or 'nogit')[:10]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
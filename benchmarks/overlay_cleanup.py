@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-capture overlay cleanup cost on a large synthetic DOM.
+
+Compares the old cleanup (getComputedStyle on every element before each
+capture) with the install-once suppression from src/browser/overlay.py.
+
+Usage:
+    python benchmarks/overlay_cleanup.py [--nodes 50000] [--captures 20]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.browser.overlay import install_overlay_suppression, suppress_overlays
+
+
+# The cleanup that used to run in save_step_callback before every capture
+LEGACY_CLEANUP = """
+() => {
+    const allElements = document.querySelectorAll('*');
+    allElements.forEach(el => {
+        const zIndex = window.getComputedStyle(el).zIndex;
+        if (zIndex && parseInt(zIndex) > 999999) {
+            el.remove();
+        }
+    });
+    const browserUseEls = document.querySelectorAll(
+        '[data-browser-use], [data-browser-use-index], [id^="browser-use"], ' +
+        '[class*="browser-use"], [data-highlight], [data-index], ' +
+        'svg[style*="pointer-events: none"]'
+    );
+    browserUseEls.forEach(el => el.remove());
+    const topDivs = Array.from(document.body.children).filter(el => {
+        if (el.tagName === 'DIV') {
+            const style = window.getComputedStyle(el);
+            return style.position === 'absolute' || style.position === 'fixed';
+        }
+        return false;
+    });
+    topDivs.forEach(div => {
+        const style = window.getComputedStyle(div);
+        if (parseInt(style.zIndex) > 1000) div.remove();
+    });
+}
+"""
+
+# Builds `count` nested nodes, roughly shaped like an SPA feed
+BUILD_DOM = """
+(count) => {
+    const root = document.createElement('main');
+    let made = 0;
+    while (made < count) {
+        const card = document.createElement('section');
+        card.className = 'card';
+        for (let i = 0; i < 9 && made < count; i++, made++) {
+            const child = document.createElement(i % 3 ? 'span' : 'div');
+            child.textContent = 'item ' + made;
+            child.style.padding = '2px';
+            card.appendChild(child);
+        }
+        root.appendChild(card);
+        made++;
+    }
+    document.body.appendChild(root);
+}
+"""
+
+# Simulates the app/agent changing a little between two captures
+MUTATE = """
+() => {
+    const overlay = document.createElement('div');
+    overlay.style.cssText = 'position:fixed;top:0;left:0;z-index:2147483647';
+    document.body.appendChild(overlay);
+    const cards = document.querySelectorAll('section.card');
+    cards[Math.floor(Math.random() * cards.length)].appendChild(document.createElement('p'));
+}
+"""
+
+
+async def time_captures(page, cleanup, captures: int) -> list:
+    """Time `captures` cleanup calls, each preceded by a small DOM change."""
+    timings = []
+    for _ in range(captures):
+        await page.evaluate(MUTATE)
+        start = time.perf_counter()
+        await cleanup()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run(nodes: int, captures: int, executable_path: str = None):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(executable_path=executable_path)
+
+        results = {}
+        for name in ("legacy", "install-once"):
+            page = await browser.new_page()
+            await page.set_content("<html><head></head><body></body></html>")
+            await page.evaluate(BUILD_DOM, nodes)
+
+            if name == "legacy":
+                cleanup = lambda: page.evaluate(LEGACY_CLEANUP)
+            else:
+                start = time.perf_counter()
+                await install_overlay_suppression(page)
+                install_ms = (time.perf_counter() - start) * 1000
+                cleanup = lambda: suppress_overlays(page)
+
+            results[name] = await time_captures(page, cleanup, captures)
+            await page.close()
+
+        await browser.close()
+
+    print(f"\nOverlay cleanup per capture ({nodes:,} nodes, {captures} captures)")
+    print("-" * 60)
+    for name, timings in results.items():
+        print(
+            f"{name:>14}: median {statistics.median(timings):8.2f} ms"
+            f"   p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms"
+        )
+    print(f"{'install':>14}: {install_ms:8.2f} ms (once per page)")
+    speedup = statistics.median(results["legacy"]) / max(statistics.median(results["install-once"]), 1e-6)
+    print(f"\nSpeedup: {speedup:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=50000, help="Number of synthetic DOM nodes")
+    parser.add_argument("--captures", type=int, default=20, help="Number of simulated captures")
+    parser.add_argument("--executable-path", help="Chromium binary (defaults to Playwright's)")
+    args = parser.parse_args()
+    asyncio.run(run(args.nodes, args.captures, args.executable_path))
+
+
+if __name__ == "__main__":
+    main()
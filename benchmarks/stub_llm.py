@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for the OpenAI chat completions API.
+
+Serves /v1/chat/completions on localhost and answers from a script instead
+of a model, so guide generation can be benchmarked offline and
+reproducibly:
+
+- question-parsing prompts get the scenario's app/task/url as JSON
+- Browser Use agent steps get the next scripted action; element
+  placeholders ({"element": "Search"}) are resolved against the browser
+  state in the prompt
+- any other structured-output request (e.g. Browser Use's judge) gets a
+  minimal instance of the JSON schema it asks for
+
+Usage (standalone, with a script file of actions):
+    python benchmarks/stub_llm.py --port 8765 --script actions.json
+"""
+import argparse
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+# Lines of Browser Use's serialized DOM start with the element index, e.g. "[12]<button ...>"
+_ELEMENT_INDEX = re.compile(r'^\s*\*?\[(\d+)\]')
+# Steps a scripted click/input waits (scrolling down) for its element to show up
+MAX_ELEMENT_RETRIES = 3
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def find_element_index(browser_state: str, text: str) -> Optional[int]:
+    """
+    Index of the first interactive element mentioning text.
+
+    Text may sit on the element's own line (attributes) or on the lines
+    that follow it up to the next indexed element (its content).
+    """
+    needle = text.lower()
+    current = None
+    for line in browser_state.splitlines():
+        match = _ELEMENT_INDEX.match(line)
+        if match:
+            current = int(match.group(1))
+        if current is not None and needle in line.lower():
+            return current
+    return None
+
+
+def _resolve(value: Any, browser_state: str) -> Any:
+    """Replace {"element": text} placeholders with element indexes."""
+    if isinstance(value, dict):
+        if set(value) == {"element"}:
+            index = find_element_index(browser_state, value["element"])
+            if index is None:
+                raise LookupError(value["element"])
+            return index
+        return {key: _resolve(item, browser_state) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, browser_state) for item in value]
+    return value
+
+
+def schema_instance(schema: Dict[str, Any], definitions: Optional[Dict[str, Any]] = None) -> Any:
+    """Smallest value that validates against a (pydantic-generated) JSON schema."""
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return schema_instance(definitions[schema["$ref"].split("/")[-1]], definitions)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            return schema_instance(schema[combinator][0], definitions)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: schema_instance(prop, definitions)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    return {"string": "", "boolean": True, "integer": 0, "number": 0, "array": [], "null": None}.get(kind, "")
+
+
+class StubLLM:
+    """Scripted chat completions server (runs in a background thread)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+        self.script: List[Dict[str, Any]] = []
+        self.parse_result: Dict[str, Any] = {}
+        self.cursor = 0
+        self.retries = 0
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def load(self, script: List[Dict[str, Any]], parse_result: Optional[Dict[str, Any]] = None):
+        """Start a new run: play this script from the beginning."""
+        with self._lock:
+            self.script = copy.deepcopy(script)
+            self.parse_result = parse_result or {}
+            self.cursor = 0
+            self.retries = 0
+            self.requests = 0
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    reply = stub.complete(body)
+                    status = 200
+                except Exception as e:
+                    reply = {"error": {"message": f"stub LLM: {e}", "type": "stub_error"}}
+                    status = 500
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="stub-llm").start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _next_action(self, browser_state: str) -> Dict[str, Any]:
+        with self._lock:
+            while self.cursor < len(self.script):
+                action = self.script[self.cursor]
+                try:
+                    resolved = _resolve(action, browser_state)
+                except LookupError as e:
+                    if self.retries < MAX_ELEMENT_RETRIES:
+                        # Not on screen yet: scroll and try the same step again next time
+                        self.retries += 1
+                        return {"scroll": {"down": True, "pages": 1}}
+                    print(f"   stub LLM: no element matching {e} - skipping scripted step {self.cursor + 1}")
+                    self.cursor += 1
+                    self.retries = 0
+                    continue
+                self.cursor += 1
+                self.retries = 0
+                return resolved
+            return {"done": {"text": "Script finished", "success": True}}
+
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one chat completions request."""
+        self.requests += 1
+        messages = body.get("messages", [])
+        prompt = "\n".join(_message_text(m) for m in messages)
+        response_format = body.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {}).get("schema")
+
+        if "Extract the application name" in prompt:
+            content = json.dumps(self.parse_result)
+        elif schema is not None and "action" not in schema.get("properties", {}):
+            content = json.dumps(schema_instance(schema))
+        else:
+            # The state is in the latest user message, but Browser Use may append nudges after it
+            texts = [_message_text(m) for m in messages]
+            browser_state = next((t for t in reversed(texts) if "<browser_state>" in t), texts[-1] if texts else "")
+            action = self._next_action(browser_state)
+            name = next(iter(action))
+            content = json.dumps({
+                "thinking": f"Scripted step {self.cursor}",
+                "evaluation_previous_goal": "Scripted run, no evaluation",
+                "memory": f"Step {self.cursor} of {len(self.script)}",
+                "next_goal": f"Run {name}",
+                "action": [action],
+            })
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+                "completion_tokens_details": {"reasoning_tokens": 0},
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--script", help="JSON file with the list of actions to play back")
+    args = parser.parse_args()
+
+    stub = StubLLM(port=args.port)
+    if args.script:
+        with open(args.script, 'r') as f:
+            stub.load(json.load(f))
+    stub.start()
+    print(f"🤖 Stub LLM listening on {stub.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
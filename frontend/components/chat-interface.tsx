@@ -19,6 +19,14 @@ interface Message {
   showWorkflow?: boolean
 }
 
+interface LiveStep {
+  step: number
+  action: string
+  url?: string
+  title?: string
+  thumbnail: string
+}
+
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
 
 export function ChatInterface() {
@@ -28,9 +36,28 @@ export function ChatInterface() {
   const [messages, setMessages] = useState<Message[]>([])
   const [isLoading, setIsLoading] = useState(false)
   const [statusMessage, setStatusMessage] = useState("")
+  // Steps streamed while the agent is still running
+  const [liveSteps, setLiveSteps] = useState<LiveStep[]>([])
   const wsRef = useRef<WebSocket | null>(null)
   const { toast } = useToast()
   const hasAddedWorkflow = useRef(false)
+  // Job whose events this client is subscribed to
+  const jobIdRef = useRef<string | null>(null)
+  // Highest event seq received for that job, sent on reconnect to replay only what was missed
+  const lastSeenRef = useRef(0)
+
+  const subscribeToJob = (jobId: string) => {
+    const previous = jobIdRef.current
+    jobIdRef.current = jobId
+    lastSeenRef.current = 0
+    const ws = wsRef.current
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      if (previous && previous !== jobId) {
+        ws.send(JSON.stringify({ type: "unsubscribe", job_id: previous }))
+      }
+      ws.send(JSON.stringify({ type: "subscribe", job_id: jobId }))
+    }
+  }
 
   // WebSocket connection for real-time updates
   useEffect(() => {
@@ -39,15 +66,27 @@ export function ChatInterface() {
       
       ws.onopen = () => {
         console.log("WebSocket connected")
+        // Subscriptions don't survive a reconnect; the server answers with the job's current state
+        if (jobIdRef.current) {
+          ws.send(JSON.stringify({ type: "subscribe", job_id: jobIdRef.current, last_seen: lastSeenRef.current }))
+        }
       }
       
       ws.onmessage = (event) => {
         const data = JSON.parse(event.data)
+        if (data.job_id && data.job_id !== jobIdRef.current) return
+        if (typeof data.seq === "number") {
+          if (data.seq <= lastSeenRef.current) return
+          lastSeenRef.current = data.seq
+        }
         
         if (data.type === "status") {
           setStatusMessage(data.message)
+        } else if (data.type === "step") {
+          setLiveSteps(prev => [...prev.filter(s => s.step !== data.step), data].sort((a, b) => a.step - b.step))
         } else if (data.type === "complete") {
           setStatusMessage("")
+          setLiveSteps([])
           setIsLoading(false)
           
           // Only add workflow once (prevent duplicates from multiple WebSocket messages)
@@ -128,6 +167,7 @@ export function ChatInterface() {
     
     // Reset workflow flag for new query
     hasAddedWorkflow.current = false
+    setLiveSteps([])
     
     const userMessage: Message = {
       id: Date.now().toString(),
@@ -159,6 +199,7 @@ export function ChatInterface() {
       }
       
       const data = await response.json()
+      subscribeToJob(data.job_id)
       
       // Success is handled by WebSocket, don't add duplicate message here
       // Just mark the user message as complete
@@ -365,6 +406,27 @@ export function ChatInterface() {
                 {statusMessage}
               </motion.div>
             )}
+            {liveSteps.length > 0 && (
+              <div className="grid grid-cols-2 md:grid-cols-4 gap-3">
+                {liveSteps.map((step) => (
+                  <motion.div
+                    key={step.step}
+                    className="rounded-lg overflow-hidden bg-slate-900/70 border border-slate-700/50"
+                    initial={{ opacity: 0, y: 10 }}
+                    animate={{ opacity: 1, y: 0 }}
+                  >
+                    <img
+                      src={step.thumbnail}
+                      alt={step.action}
+                      className="w-full h-32 object-cover object-top"
+                    />
+                    <div className="p-2 text-xs text-white/80">
+                      <span className="text-orange-400 font-medium">{step.step}.</span> {step.action}
+                    </div>
+                  </motion.div>
+                ))}
+              </div>
+            )}
           </div>
         </div>
       )}
@@ -94,16 +94,23 @@ export function WorkflowViewer({ appName, taskName }: WorkflowViewerProps) {
               img: ({ node, ...props }) => {
                 // Construct full path: basePath + relative screenshot path
                 const imagePath = `${basePath}/${props.src}`
+                const imageUrl = `${API_URL}/api/files/${imagePath}`
+                // Show a chat-width preview; the full-resolution capture opens on click
                 return (
-                  <img
-                    {...props}
-                    className="rounded-lg border border-zinc-700 my-4 w-full"
-                    src={`${API_URL}/api/files/${imagePath}`}
-                    alt={props.alt || "Step screenshot"}
-                    onError={(e) => {
-                      console.error("Failed to load image:", imagePath)
-                    }}
-                  />
+                  <a href={`${imageUrl}?size=full`} target="_blank" rel="noopener noreferrer">
+                    <img
+                      {...props}
+                      className="rounded-lg border border-zinc-700 my-4 w-full"
+                      src={`${imageUrl}?size=preview`}
+                      srcSet={`${imageUrl}?size=thumb 320w, ${imageUrl}?size=preview 960w`}
+                      sizes="(max-width: 640px) 320px, 960px"
+                      loading="lazy"
+                      alt={props.alt || "Step screenshot"}
+                      onError={(e) => {
+                        console.error("Failed to load image:", imagePath)
+                      }}
+                    />
+                  </a>
                 )
               },
               h1: ({ node, ...props }) => (
@@ -7,24 +7,60 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import json
+import mimetypes
+import time
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
 
 # Import the main function from app.py
 sys.path.insert(0, str(Path(__file__).parent))
-from app import generate_guide, parse_question
+from app import (
+    generate_guide, parse_question, parse_cache, guide_cache,
+    frame_processor, screenshot_encoder, derivative_cache, catalog
+)
+from src.browser import BrowserPool
+from src.capture import IMAGE_MIME_TYPES
+from src.dataset.blob_store import workflow_screenshot_paths
+from src.dataset.derivatives import DERIVATIVE_WIDTHS
+from src.dataset.export import export_filename, iter_zip_stream, select_task_dirs
+from src.dataset.pdf_export import PdfExporter
+from src.dataset.guide_cache import task_slug
+from src.jobs import Job, JobQueue, JobStatus, QueueFullError
+from src.metrics import metrics
+from src.serving import Client, ConnectionManager, HttpCache, is_content_addressed
 
 # Load environment variables
 load_dotenv()
 
+# Number of guides generated concurrently (each one drives its own browser)
+NUM_WORKERS = int(os.getenv("NAVIGATOR_WORKERS", "1"))
+# Maximum number of jobs waiting for a worker before /api/query rejects new ones
+MAX_QUEUED_JOBS = int(os.getenv("NAVIGATOR_MAX_QUEUED_JOBS", "100"))
+# Warm browser pool: one browser per worker by default, 0 disables pooling
+BROWSER_POOL_SIZE = int(os.getenv("NAVIGATOR_BROWSER_POOL_SIZE", str(NUM_WORKERS)))
+# Recycle a pooled browser after this many jobs or once it uses this much memory
+BROWSER_MAX_JOBS = int(os.getenv("NAVIGATOR_BROWSER_MAX_JOBS", "20"))
+BROWSER_MAX_RSS_MB = float(os.getenv("NAVIGATOR_BROWSER_MAX_RSS_MB", "1500"))
+BROWSER_HEADLESS = os.getenv("NAVIGATOR_HEADLESS", "false").lower() in ("1", "true", "yes")
+# Events buffered per WebSocket client, and how long one send may take, before it's dropped as too slow
+WS_QUEUE_SIZE = int(os.getenv("NAVIGATOR_WS_QUEUE_SIZE", "64"))
+WS_SEND_TIMEOUT = float(os.getenv("NAVIGATOR_WS_SEND_TIMEOUT", "5"))
+# Events kept per job so reconnecting clients can catch up from their last seen seq
+WS_REPLAY_EVENTS = int(os.getenv("NAVIGATOR_WS_REPLAY_EVENTS", "256"))
+WS_REPLAY_MB = float(os.getenv("NAVIGATOR_WS_REPLAY_MB", "4"))
+
+# FileResponse picks Content-Type from the extension; make sure WebP/AVIF screenshots
+# get the right one even where the platform's mime.types lacks them
+for _extension, _mime_type in IMAGE_MIME_TYPES.items():
+    mimetypes.add_type(_mime_type, f".{_extension}")
+
 # Initialize FastAPI app
 app = FastAPI(title="Agentic UI Navigator API")
 
@@ -41,10 +77,25 @@ app.add_middleware(
 class QueryRequest(BaseModel):
     """Request model for query endpoint."""
     question: str
+    force_refresh: bool = False
+
+
+class JobResponse(BaseModel):
+    """Response model for a submitted or polled job."""
+    job_id: str
+    status: str
+    stage: str
+    message: str
+    question: str
+    queue_position: int = 0
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
-    """Response model for query endpoint."""
+    """Response model for a finished guide generation job."""
     status: str
     message: str
     task_name: Optional[str] = None
@@ -52,39 +103,28 @@ class QueryResponse(BaseModel):
     output_dir: Optional[str] = None
     screenshots: Optional[list] = None
     workflow_file: Optional[str] = None
+    cached: bool = False
+    # Per-stage spans of the run ({"total_ms", "stages", "spans"})
+    timings: Optional[dict] = None
+
+
+# Job-scoped WebSocket channels: clients only receive events of jobs they subscribed to
+manager = ConnectionManager(
+    max_queue=WS_QUEUE_SIZE,
+    send_timeout=WS_SEND_TIMEOUT,
+    replay_events=WS_REPLAY_EVENTS,
+    replay_bytes=int(WS_REPLAY_MB * 1024 * 1024),
+    max_logs=500
+)
 
+# Validators, 304s and precompressed bodies for /api/files and /api/workflow
+http_cache = HttpCache()
 
-# Store active WebSocket connections
-active_connections: list[WebSocket] = []
-
-
-class ConnectionManager:
-    """Manage WebSocket connections for real-time updates."""
-    
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-    
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-    
-    async def send_message(self, message: dict, websocket: WebSocket):
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            print(f"Error sending message: {e}")
-            self.disconnect(websocket)
-    
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections.copy():
-            await self.send_message(message, connection)
-
-
-manager = ConnectionManager()
+# Guide PDFs, rendered off the event loop and cached by content hash
+pdf_exporter = PdfExporter(
+    cache_dir="dataset/_exports",
+    max_workers=int(os.getenv("NAVIGATOR_PDF_WORKERS", "0")) or None
+)
 
 
 @app.get("/")
@@ -99,147 +139,360 @@ async def health_check():
     openai_key_set = bool(os.getenv("OPENAI_API_KEY"))
     return {
         "status": "healthy",
-        "openai_key_configured": openai_key_set
+        "openai_key_configured": openai_key_set,
+        "parse_cache": parse_cache.stats(),
+        "guide_cache": guide_cache.stats(),
+        "derivative_cache": derivative_cache.stats(),
+        "http_cache": http_cache.stats(),
+        "websockets": manager.stats()
     }
 
 
-@app.post("/api/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
     """
-    Process a user query and generate a guide.
-    This is a long-running operation that may take several minutes.
+    Prometheus metrics: per-stage duration histograms plus job queue and
+    WebSocket gauges.
     """
-    if not request.question or not request.question.strip():
-        raise HTTPException(status_code=400, detail="Question cannot be empty")
-    
-    # Check for OpenAI API key
-    if not os.getenv("OPENAI_API_KEY"):
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file"
-        )
-    
+    queue_stats = job_queue.stats()
+    ws_stats = manager.stats()
+    body = metrics.render({
+        "navigator_jobs": (
+            "Jobs currently tracked, by status",
+            {(("status", status),): count for status, count in queue_stats["jobs"].items()}
+        ),
+        "navigator_websocket_connections": ("Open WebSocket connections", {(): ws_stats["connections"]}),
+        "navigator_websocket_queued_events": ("Events waiting in WebSocket outboxes", {(): ws_stats["queued"]}),
+    })
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+def complete_message(result: dict) -> dict:
+    """WebSocket event announcing a finished guide."""
+    cached = bool(result.get("cached"))
+    return {
+        "type": "complete",
+        "message": "Found an existing guide!" if cached else "Guide generated successfully!",
+        "cached": cached,
+        "task_name": result.get("task_name"),
+        "app_name": result.get("app_name"),
+        "output_dir": result.get("output_dir"),
+        "screenshots": result.get("screenshots"),
+        "workflow_file": result.get("workflow_file")
+    }
+
+
+async def run_guide_job(job: Job) -> dict:
+    """
+    Generate a guide for a queued job.
+    Runs on a JobQueue worker; progress is reported over the WebSocket.
+    """
+    if job.started_at is not None:
+        metrics.observe_stage("queue.wait", (job.started_at - job.created_at).total_seconds())
+    started = time.perf_counter()
     try:
-        # Broadcast initial status
-        await manager.broadcast({
+        return await _run_guide_job(job)
+    finally:
+        metrics.observe_stage("job", time.perf_counter() - started)
+
+
+async def _run_guide_job(job: Job) -> dict:
+    async def report(stage: str, message: str, **extra):
+        job.stage = stage
+        job.message = message
+        # Only the latest status matters to a client that's behind
+        manager.publish(job.id, {
             "type": "status",
-            "message": "Processing your query...",
-            "stage": "parsing"
-        })
+            "message": message,
+            "stage": stage,
+            **extra
+        }, coalesce_key="status")
+
+    try:
+        await report("parsing", "Processing your query...")
         
         # Parse the question first to get metadata
-        parsed = await parse_question(request.question)
+        parsed = await parse_question(job.question)
         app_name = parsed.get("app_name", "unknown")
         task_name = parsed.get("task_name", "task")
         
-        await manager.broadcast({
-            "type": "status",
-            "message": f"Starting task: {task_name} on {app_name}",
-            "stage": "starting",
-            "app_name": app_name,
-            "task_name": task_name
-        })
+        await report(
+            "starting",
+            f"Starting task: {task_name} on {app_name}",
+            app_name=app_name,
+            task_name=task_name
+        )
         
         # Generate the guide (this calls the main functionality)
-        result = await generate_guide(request.question)
+        result = await generate_guide(
+            job.question,
+            browser_pool=browser_pool,
+            force_refresh=job.options.get("force_refresh", False),
+            # Stream each captured screenshot so the UI can build the guide live
+            on_step=lambda step: manager.publish(job.id, {"type": "step", **step})
+        )
         
-        # Build response
-        if result and result.get("success"):
-            # Get actual app_name and task from result (more reliable)
-            actual_app_name = result.get("app_name", app_name)
-            actual_task = result.get("task", task_name)
-            
-            # Use the dataset path from the result
-            dataset_path = result.get("dataset_path")
-            if dataset_path:
-                # Ensure it's a Path object and relative to cwd
-                task_dir = Path(dataset_path)
-                if not task_dir.is_absolute():
-                    task_dir = Path.cwd() / task_dir
-            else:
-                # Fallback: construct path
-                dataset_dir = Path("dataset")
-                app_dir = dataset_dir / actual_app_name.lower()
-                task_dir = Path.cwd() / app_dir / actual_task.lower().replace(" ", "_")
-            
-            screenshots = []
-            if task_dir.exists():
-                screenshot_dir = task_dir / "screenshots"
-                if screenshot_dir.exists():
-                    screenshots = sorted([
-                        str(f.relative_to(Path.cwd()))
-                        for f in screenshot_dir.glob("*.png")
-                    ])
-            
-            workflow_file = None
-            workflow_path = task_dir / "workflow.md"
-            if workflow_path.exists():
-                workflow_file = str(workflow_path.relative_to(Path.cwd()))
-            
-            await manager.broadcast({
-                "type": "complete",
-                "message": "Guide generated successfully!",
-                "task_name": actual_task,
-                "app_name": actual_app_name,
-                "output_dir": str(task_dir.relative_to(Path.cwd())),
-                "screenshots": screenshots,
-                "workflow_file": workflow_file
-            })
-            
-            return QueryResponse(
-                status="success",
-                message="Guide generated successfully",
-                task_name=actual_task,
-                app_name=actual_app_name,
-                output_dir=str(task_dir.relative_to(Path.cwd())),
-                screenshots=screenshots,
-                workflow_file=workflow_file
-            )
-        else:
+        if not result or not result.get("success"):
             error_detail = "Failed to generate guide"
             if result and result.get("error"):
                 error_detail = result.get("error")
-            
-            await manager.broadcast({
-                "type": "error",
-                "message": error_detail
-            })
-            
-            raise HTTPException(status_code=500, detail=error_detail)
+            raise RuntimeError(error_detail)
+        
+        # Get actual app_name and task from result (more reliable)
+        actual_app_name = result.get("app_name", app_name)
+        actual_task = result.get("task", task_name)
+        
+        # Use the dataset path from the result
+        dataset_path = result.get("dataset_path")
+        if dataset_path:
+            # Ensure it's a Path object and relative to cwd
+            task_dir = Path(dataset_path)
+            if not task_dir.is_absolute():
+                task_dir = Path.cwd() / task_dir
+        else:
+            # Fallback: construct path
+            dataset_dir = Path("dataset")
+            app_dir = dataset_dir / actual_app_name.lower()
+            task_dir = Path.cwd() / app_dir / task_slug(actual_task)
+        
+        screenshots = [
+            str(path.relative_to(Path.cwd()))
+            for path in workflow_screenshot_paths(task_dir.resolve())
+        ]
+        
+        workflow_file = None
+        workflow_path = task_dir / "workflow.md"
+        if workflow_path.exists():
+            workflow_file = str(workflow_path.relative_to(Path.cwd()))
+        
+        cached = bool(result.get("cached"))
+        response = QueryResponse(
+            status="success",
+            message="Reused existing guide" if cached else "Guide generated successfully",
+            # The task directory name, which is what /api/workflow expects
+            task_name=task_dir.name,
+            app_name=actual_app_name,
+            output_dir=str(task_dir.relative_to(Path.cwd())),
+            screenshots=screenshots,
+            workflow_file=workflow_file,
+            cached=cached,
+            timings=result.get("timings")
+        )
+        
+        job.stage = "complete"
+        result = response.model_dump()
+        manager.publish(job.id, complete_message(result))
+        
+        return result
             
     except Exception as e:
-        error_msg = str(e)
-        await manager.broadcast({
+        job.stage = "error"
+        manager.publish(job.id, {
             "type": "error",
-            "message": f"Error: {error_msg}"
+            "message": f"Error: {e}"
         })
-        
-        raise HTTPException(status_code=500, detail=error_msg)
+        raise
+
+
+browser_pool = BrowserPool(
+    size=BROWSER_POOL_SIZE,
+    max_jobs_per_browser=BROWSER_MAX_JOBS,
+    max_rss_mb=BROWSER_MAX_RSS_MB,
+    headless=BROWSER_HEADLESS
+) if BROWSER_POOL_SIZE > 0 else None
+
+job_queue = JobQueue(
+    run_guide_job,
+    num_workers=NUM_WORKERS,
+    max_queue_size=MAX_QUEUED_JOBS
+)
+
+
+def job_response(job: Job) -> JobResponse:
+    """Build the API representation of a job."""
+    return JobResponse(queue_position=job_queue.position(job), **job.to_dict())
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Launch the warm browser pool and start the guide-generation workers."""
+    if browser_pool is not None:
+        await browser_pool.start()
+    job_queue.start()
+    # Pick up guides added or removed while the server was down
+    asyncio.create_task(sync_catalog())
+
+
+async def sync_catalog():
+    try:
+        stats = await asyncio.to_thread(catalog.rebuild)
+        print(f"📚 Catalog synced: {stats['updated']} updated, {stats['removed']} removed")
+    except Exception as e:
+        print(f"⚠️  Catalog sync failed: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    """Stop the guide-generation workers, close pooled browsers and worker pools."""
+    await job_queue.stop()
+    await manager.close_all()
+    if browser_pool is not None:
+        await browser_pool.stop()
+    frame_processor.shutdown()
+    screenshot_encoder.shutdown()
+    pdf_exporter.shutdown()
+
+
+@app.post("/api/query", response_model=JobResponse, status_code=202)
+async def process_query(request: QueryRequest):
+    """
+    Queue a user query for guide generation.
+    Returns immediately with a job ID; poll /api/jobs/{job_id} or listen on
+    the WebSocket for progress.
+    """
+    if not request.question or not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    # Check for OpenAI API key
+    if not os.getenv("OPENAI_API_KEY"):
+        raise HTTPException(
+            status_code=500,
+            detail="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file"
+        )
+    
+    try:
+        job = job_queue.submit(request.question, {"force_refresh": request.force_refresh})
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return job_response(job)
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """
+    List recent jobs, newest first, optionally filtered by status.
+    """
+    jobs = job_queue.list_jobs(status=status, limit=limit)
+    return {
+        "jobs": [job_response(job) for job in jobs],
+        "stats": job_queue.stats(),
+        "browser_pool": browser_pool.stats() if browser_pool is not None else None
+    }
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Get the status of a job.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
+
+
+@app.get("/api/jobs/{job_id}/result", response_model=QueryResponse)
+async def get_job_result(job_id: str):
+    """
+    Get the generated guide for a finished job.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error or "Failed to generate guide")
+    
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    
+    return job.result
+
+
+def job_snapshot(job: Job) -> dict:
+    """A job's current state as a WebSocket event, sent when a client subscribes."""
+    if job.status == JobStatus.COMPLETED and job.result:
+        return {"job_id": job.id, **complete_message(job.result)}
+    if job.status == JobStatus.FAILED:
+        return {"type": "error", "job_id": job.id, "message": f"Error: {job.error}"}
+    return {
+        "type": "status",
+        "job_id": job.id,
+        "message": job.message,
+        "stage": job.stage,
+        "queue_position": job_queue.position(job)
+    }
+
+
+def subscribe_client(client: Client, job_id: str, last_seen: int = 0):
+    """Subscribe a client to a job and replay what it missed since last_seen."""
+    job = job_queue.get(job_id)
+    if job is None:
+        manager.send(client, {"type": "unknown_job", "job_id": job_id})
+        return
+    manager.subscribe(client, job_id, last_seen, snapshot=lambda: job_snapshot(job))
+
+
+def parse_last_seen(value) -> int:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time updates during guide generation.
+    
+    Clients receive events only for the jobs they subscribe to, either with
+    ?job_id=...&last_seen=... on connect or by sending
+    {"type": "subscribe", "job_id": ..., "last_seen": ...} (and
+    {"type": "unsubscribe", ...}). Job events carry a per-job "seq"; on
+    (re)subscribing, the buffered events after last_seen are replayed. If
+    those are no longer buffered, the job's current state is sent first.
     """
-    await manager.connect(websocket)
+    client = await manager.connect(websocket)
+    last_seen = parse_last_seen(websocket.query_params.get("last_seen"))
+    for job_id in websocket.query_params.getlist("job_id"):
+        subscribe_client(client, job_id, last_seen)
     try:
         while True:
-            # Keep connection alive and receive any client messages
             data = await websocket.receive_text()
-            # Echo back for testing
-            await websocket.send_json({"type": "echo", "message": data})
+            try:
+                message = json.loads(data)
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                manager.send(client, {"type": "invalid", "message": "Expected a JSON object"})
+                continue
+            
+            kind = message.get("type")
+            job_id = message.get("job_id")
+            if kind == "subscribe" and isinstance(job_id, str):
+                subscribe_client(client, job_id, parse_last_seen(message.get("last_seen")))
+            elif kind == "unsubscribe" and isinstance(job_id, str):
+                manager.unsubscribe(client, job_id)
+            elif kind == "ping":
+                manager.send(client, {"type": "pong"})
+            else:
+                manager.send(client, {"type": "invalid", "message": f"Unsupported message: {kind}"})
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(websocket)
+    finally:
+        manager.disconnect(client)
 
 
 @app.get("/api/files/{file_path:path}")
-async def get_file(file_path: str):
+async def get_file(request: Request, file_path: str, size: Optional[str] = None):
     """
     Serve generated files (screenshots, workflow markdown, etc.)
+    
+    Images accept ?size=thumb|preview|full; smaller sizes are served from
+    the derivative cache (WebP, width-bounded).
     """
     # Always treat as relative to current working directory
     full_path = Path.cwd() / file_path
@@ -256,148 +509,150 @@ async def get_file(file_path: str):
     except ValueError:
         raise HTTPException(status_code=403, detail=f"Access denied to path outside project directory")
     
-    return FileResponse(full_path)
+    # Blob URLs name their content, so whatever size is served for them never changes
+    immutable = is_content_addressed(full_path)
+    
+    if size is not None:
+        if size not in DERIVATIVE_WIDTHS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown size '{size}', expected one of: {', '.join(DERIVATIVE_WIDTHS)}"
+            )
+        if full_path.suffix.lower().lstrip(".") in IMAGE_MIME_TYPES:
+            try:
+                full_path = await derivative_cache.get(full_path, size)
+            except Exception as e:
+                # Unreadable image: fall back to serving the original
+                print(f"⚠️  Could not render {size} derivative of {file_path}: {e}")
+    
+    return await http_cache.file_response(request, full_path, immutable=immutable)
+
+
+@app.get("/api/workflows")
+async def list_workflows(
+    app_name: Optional[str] = Query(None, alias="app"),
+    task: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Page through saved guides (newest first) from the catalog.
+    Filter by app, task name/query substring, or generation date (ISO timestamps).
+    """
+    return await asyncio.to_thread(
+        catalog.list_workflows, app_name, task, since, until, limit, offset
+    )
+
+
+@app.get("/api/search")
+async def search_workflows(
+    q: str = Query(..., min_length=1, max_length=200),
+    app_name: Optional[str] = Query(None, alias="app"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Ranked full-text search over saved guides: task queries, clicked element
+    labels, typed text and page titles. Use it to find an existing guide
+    before starting a new agent run.
+    """
+    return await asyncio.to_thread(catalog.search, q, app_name, limit)
+
+
+@app.get("/api/workflows/summary")
+async def workflows_summary():
+    """Per-app workflow and step counts from the catalog."""
+    return await asyncio.to_thread(catalog.summary, False)
 
 
 @app.get("/api/workflow/{app_name}/{task_name}")
-async def get_workflow(app_name: str, task_name: str):
+async def get_workflow(request: Request, app_name: str, task_name: str):
     """
     Get the workflow markdown content for a specific task.
     """
-    workflow_path = Path("dataset") / app_name.lower() / task_name.lower().replace(" ", "_") / "workflow.md"
+    workflow_path = Path("dataset") / app_name.lower() / task_slug(task_name) / "workflow.md"
     
     if not workflow_path.exists():
         raise HTTPException(status_code=404, detail="Workflow not found")
     
+    def render(data: bytes) -> bytes:
+        return json.dumps({"content": data.decode('utf-8'), "path": str(workflow_path)}).encode('utf-8')
+    
     try:
-        with open(workflow_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return {"content": content, "path": str(workflow_path)}
+        # Served with validators and cached (compressed) until workflow.md changes
+        return await http_cache.rendered_response(
+            request, workflow_path, render, variant="json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/download/workflow/{app_name}/{task_name}")
-async def download_workflow_pdf(app_name: str, task_name: str):
+async def download_workflow_pdf(request: Request, app_name: str, task_name: str):
     """
     Download the workflow as a PDF file with embedded images.
+    PDFs are rendered in a worker pool and cached until the guide changes.
     """
-    import markdown
-    from weasyprint import HTML, CSS
-    import tempfile
-    
-    workflow_path = Path("dataset") / app_name.lower() / task_name.lower().replace(" ", "_") / "workflow.md"
+    workflow_path = Path("dataset") / app_name.lower() / task_slug(task_name) / "workflow.md"
     
     if not workflow_path.exists():
         raise HTTPException(status_code=404, detail="Workflow not found")
     
     try:
-        # Read markdown content
-        with open(workflow_path, 'r', encoding='utf-8') as f:
-            md_content = f.read()
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(md_content, extensions=['extra', 'codehilite'])
-        
-        # Get base directory for images
-        base_dir = workflow_path.parent
-        
-        # Replace relative image paths with absolute paths
-        import re
-        def replace_image_path(match):
-            rel_path = match.group(1)
-            abs_path = (base_dir / rel_path).resolve()
-            return f'<img src="file://{abs_path}"'
-        
-        html_content = re.sub(r'<img src="([^"]+)"', replace_image_path, html_content)
-        
-        # Create styled HTML
-        styled_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                @page {{
-                    size: A4;
-                    margin: 2cm;
-                }}
-                body {{
-                    font-family: 'Arial', sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 100%;
-                }}
-                h1 {{
-                    color: #ea580c;
-                    border-bottom: 3px solid #ea580c;
-                    padding-bottom: 10px;
-                    margin-top: 0;
-                }}
-                h2 {{
-                    color: #ea580c;
-                    margin-top: 30px;
-                    border-bottom: 1px solid #ddd;
-                    padding-bottom: 5px;
-                }}
-                h3 {{
-                    color: #f97316;
-                    margin-top: 20px;
-                }}
-                img {{
-                    max-width: 100%;
-                    height: auto;
-                    margin: 15px 0;
-                    border: 1px solid #ddd;
-                    border-radius: 4px;
-                    page-break-inside: avoid;
-                }}
-                hr {{
-                    border: none;
-                    border-top: 1px solid #ddd;
-                    margin: 20px 0;
-                }}
-                strong {{
-                    color: #ea580c;
-                }}
-                em {{
-                    color: #666;
-                    font-size: 0.9em;
-                }}
-                p {{
-                    margin: 10px 0;
-                }}
-                ul {{
-                    margin: 10px 0;
-                    padding-left: 30px;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
-        
-        # Generate PDF
-        pdf_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        HTML(string=styled_html, base_url=str(base_dir)).write_pdf(pdf_file.name)
-        pdf_file.close()
-        
-        # Create safe filename
-        safe_filename = f"{app_name}_{task_name}_guide.pdf".replace(" ", "_").lower()
-        
-        # Return PDF file
-        return FileResponse(
-            pdf_file.name,
-            media_type="application/pdf",
-            filename=safe_filename,
-            background=None
+        pdf_path = await pdf_exporter.get_pdf([workflow_path])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    
+    # Create safe filename
+    safe_filename = f"{app_name}_{task_name}_guide.pdf".replace(" ", "_").lower()
+    
+    # Revalidated on every download: the URL stays the same when the guide changes
+    response = await http_cache.file_response(request, pdf_path, immutable=False, media_type="application/pdf")
+    response.headers["Content-Disposition"] = f'attachment; filename="{safe_filename}"'
+    return response
+
+
+@app.get("/api/export")
+async def export_guides(
+    request: Request,
+    format: str = "zip",
+    app_name: Optional[str] = Query(None, alias="app"),
+    tasks: Optional[List[str]] = Query(None, alias="task")
+):
+    """
+    Bulk-export guides for one app (?app=), a list of tasks (?task=app/task, repeatable)
+    or the whole dataset (no filter), as a streamed ZIP or a combined PDF.
+    """
+    if format not in ("zip", "pdf"):
+        raise HTTPException(status_code=400, detail="format must be 'zip' or 'pdf'")
+    
+    dataset_dir = Path("dataset")
+    task_dirs = await asyncio.to_thread(select_task_dirs, dataset_dir, app_name, tasks)
+    if not task_dirs:
+        raise HTTPException(status_code=404, detail="No matching guides found")
+    
+    filename = export_filename(app_name, tasks, format)
+    
+    if format == "zip":
+        # Built while it's sent: constant memory, nothing staged on disk
+        return StreamingResponse(
+            iter_zip_stream(task_dirs, dataset_dir),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
-        
+    
+    workflow_paths = [d / "workflow.md" for d in task_dirs if (d / "workflow.md").exists()]
+    if not workflow_paths:
+        raise HTTPException(status_code=404, detail="No matching guides found")
+    try:
+        pdf_path = await pdf_exporter.get_pdf(workflow_paths)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    
+    response = await http_cache.file_response(request, pdf_path, immutable=False, media_type="application/pdf")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from .login import wait_for_login_completion
+from .overlay import install_overlay_suppression, suppress_overlays
+from .pool import BrowserLease, BrowserPool
+from .probe import PageProbe, ProbeResult, ReadinessThresholds
+from .stability import StabilityConfig, install_stability_tracking, wait_for_stable
+
+__all__ = [
+    'BrowserLease',
+    'BrowserPool',
+    'PageProbe',
+    'ProbeResult',
+    'ReadinessThresholds',
+    'StabilityConfig',
+    'install_overlay_suppression',
+    'install_stability_tracking',
+    'suppress_overlays',
+    'wait_for_login_completion',
+    'wait_for_stable',
+]
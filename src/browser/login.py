@@ -0,0 +1,136 @@
+"""
+Event-driven detection of a finished manual login.
+"""
+import asyncio
+import re
+import time
+from typing import Callable, Optional
+
+from .probe import LOGIN_SCRIPT, LOGIN_TITLE_PATTERNS, LOGIN_URL_PATTERNS, PageProbe
+
+
+# Cookie names that typically appear once a user is authenticated
+AUTH_COOKIE_PATTERN = re.compile(r'sess|auth|token|sid|login|logged|user|jwt|remember', re.IGNORECASE)
+
+# In-page predicate. A MutationObserver re-runs the login-only check when the
+# DOM changes (password fields disappearing, post-login render) and Playwright
+# just reads the flag each frame, re-installing it on every new document.
+# Readiness is left to the probe: it's far too heavy to run per mutation.
+NOT_LOGIN_PREDICATE = """
+(params) => {
+    const isLogin = () => (%s)(params).is_login;
+    let watch = window.__navigatorLoginWatch;
+    if (!watch) {
+        watch = window.__navigatorLoginWatch = { gone: !isLogin() };
+        new MutationObserver(() => {
+            if (!watch.gone) watch.gone = !isLogin();
+        }).observe(document, { childList: true, subtree: true, attributes: true });
+    }
+    return watch.gone;
+}
+""" % LOGIN_SCRIPT.strip()
+
+
+async def wait_for_login_completion(
+    page,
+    max_wait_time: float = 300,
+    on_waiting: Optional[Callable[[int], None]] = None,
+    status_interval: float = 15,
+    cookie_check_interval: float = 1.0
+) -> bool:
+    """
+    Wait until the page is no longer a login page.
+
+    Three signals can end the wait, whichever fires first:
+    - an in-page observer sees the login indicators (password/email fields,
+      login buttons, login URL/title) disappear, including after navigations
+    - a main-frame navigation lands on a page the probe says isn't a login page
+    - new auth-looking cookies appear in the browser context and the probe
+      confirms the login page is gone
+
+    Args:
+        page: Playwright page showing the login form
+        max_wait_time: Seconds to wait before giving up
+        on_waiting: Called with elapsed seconds every status_interval seconds
+        status_interval: Seconds between on_waiting calls
+        cookie_check_interval: Seconds between cookie jar checks (no DOM access)
+
+    Returns:
+        True if login completed, False on timeout
+    """
+    probe = PageProbe()
+    start_time = time.time()
+    params = {
+        "loginUrlPatterns": LOGIN_URL_PATTERNS,
+        "loginTitlePatterns": LOGIN_TITLE_PATTERNS,
+    }
+
+    async def login_gone() -> bool:
+        try:
+            return not (await probe.run(page)).is_login
+        except Exception:
+            return False  # Navigation in progress; another signal will follow
+
+    async def watch_dom():
+        await page.wait_for_function(
+            NOT_LOGIN_PREDICATE,
+            arg=params,
+            timeout=max_wait_time * 1000
+        )
+
+    navigated = asyncio.Event()
+
+    def on_navigation(frame):
+        if frame == page.main_frame:
+            navigated.set()
+
+    async def watch_navigation():
+        while True:
+            await navigated.wait()
+            navigated.clear()
+            try:
+                await page.wait_for_load_state('domcontentloaded', timeout=5000)
+            except Exception:
+                pass
+            if await login_gone():
+                return
+
+    async def watch_cookies():
+        known = {cookie['name'] for cookie in await page.context.cookies()}
+        while True:
+            await asyncio.sleep(cookie_check_interval)
+            names = {cookie['name'] for cookie in await page.context.cookies()}
+            new_auth = {name for name in names - known if AUTH_COOKIE_PATTERN.search(name)}
+            known = names
+            if new_auth and await login_gone():
+                return
+
+    page.on('framenavigated', on_navigation)
+    watchers = [
+        asyncio.create_task(watch_dom()),
+        asyncio.create_task(watch_navigation()),
+        asyncio.create_task(watch_cookies()),
+    ]
+    try:
+        while True:
+            remaining = max_wait_time - (time.time() - start_time)
+            if remaining <= 0:
+                return False
+            done, _ = await asyncio.wait(
+                watchers,
+                timeout=min(status_interval, remaining),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                watchers.remove(task)
+                if task.exception() is None:
+                    return True
+            if not watchers:
+                return False
+            if not done and on_waiting:
+                on_waiting(int(time.time() - start_time))
+    finally:
+        page.remove_listener('framenavigated', on_navigation)
+        for task in watchers:
+            task.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
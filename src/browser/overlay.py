@@ -0,0 +1,142 @@
+"""
+Suppression of Browser Use highlight overlays, installed once per page.
+
+The previous cleanup ran getComputedStyle on every element before each
+capture. Here a stylesheet hides overlays that can be matched by selector,
+and MutationObservers inspect only subtrees that are added (or top-level
+nodes whose style changes), so the per-capture cost is proportional to what
+changed since the last capture instead of to the size of the DOM.
+"""
+import weakref
+
+
+# Elements Browser Use injects for element highlighting
+OVERLAY_SELECTORS = (
+    '[data-browser-use], [data-browser-use-index], [id^="browser-use"], '
+    '[class*="browser-use"], [data-highlight], [data-index], '
+    'svg[style*="pointer-events: none"]'
+)
+
+OVERLAY_SCRIPT = """
+(() => {
+    if (window.__navigatorOverlays) return;
+
+    const SELECTORS = %s;
+    // Anything stacked above this is a debugging overlay, not app UI
+    const OVERLAY_Z_INDEX = 999999;
+    // Fixed/absolute top-level divs above this are highlight containers
+    const TOP_LEVEL_Z_INDEX = 1000;
+
+    // Elements hidden since the last flush
+    let newlyHidden = 0;
+
+    const hide = (el) => {
+        if (el.hasAttribute('data-navigator-hidden')) return;
+        el.setAttribute('data-navigator-hidden', '');
+        el.style.setProperty('display', 'none', 'important');
+        newlyHidden++;
+    };
+
+    const zIndexOf = (style) => {
+        const z = parseInt(style.zIndex, 10);
+        return Number.isNaN(z) ? 0 : z;
+    };
+
+    const check = (el) => {
+        if (el.nodeType !== 1 || el.hasAttribute('data-navigator-hidden')) return;
+        const style = getComputedStyle(el);
+        const z = zIndexOf(style);
+        if (z > OVERLAY_Z_INDEX) {
+            hide(el);
+        } else if (el.parentElement === document.body && el.tagName === 'DIV' &&
+                   (style.position === 'absolute' || style.position === 'fixed') &&
+                   z > TOP_LEVEL_Z_INDEX) {
+            hide(el);
+        }
+    };
+
+    // An added subtree may carry an overlay below its root
+    const checkTree = (node) => {
+        if (node.nodeType !== 1) return;
+        check(node);
+        const walker = document.createTreeWalker(node, NodeFilter.SHOW_ELEMENT);
+        for (let el = walker.nextNode(); el; el = walker.nextNode()) check(el);
+    };
+
+    const installStyle = () => {
+        if (document.getElementById('__navigator-overlay-style')) return;
+        const style = document.createElement('style');
+        style.id = '__navigator-overlay-style';
+        style.textContent = SELECTORS + ' { display: none !important; }';
+        (document.head || document.documentElement).appendChild(style);
+    };
+
+    // After the one pass at install, only newly added subtrees are inspected
+    const added = new MutationObserver(records => {
+        for (const record of records) record.addedNodes.forEach(checkTree);
+    });
+    // Top-level nodes can become overlays by changing style/class in place
+    const topLevel = new MutationObserver(records => {
+        for (const record of records) {
+            if (record.target.parentElement === document.body) check(record.target);
+        }
+    });
+
+    const observeBody = () => {
+        topLevel.observe(document.body, {
+            attributes: true, attributeFilter: ['style', 'class'], subtree: true
+        });
+        // Overlays already on the page may sit deep inside wrappers
+        checkTree(document.body);
+    };
+
+    installStyle();
+    added.observe(document.documentElement, { childList: true, subtree: true });
+    if (document.body) observeBody();
+    else document.addEventListener('DOMContentLoaded', observeBody, { once: true });
+
+    window.__navigatorOverlays = {
+        // Apply pending mutations synchronously; called right before a capture
+        flush() {
+            installStyle();
+            for (const record of added.takeRecords()) record.addedNodes.forEach(checkTree);
+            for (const record of topLevel.takeRecords()) {
+                if (record.target.parentElement === document.body) check(record.target);
+            }
+            const hidden = newlyHidden;
+            newlyHidden = 0;
+            return hidden;
+        },
+    };
+})();
+""" % repr(OVERLAY_SELECTORS)
+
+# Pages that already have the suppression registered as an init script
+_installed_pages = weakref.WeakSet()
+
+
+async def install_overlay_suppression(page):
+    """Register overlay suppression for future documents and the current one."""
+    if page not in _installed_pages:
+        try:
+            await page.add_init_script(OVERLAY_SCRIPT)
+            _installed_pages.add(page)
+        except Exception:
+            pass
+    await page.evaluate(OVERLAY_SCRIPT)
+
+
+async def suppress_overlays(page) -> int:
+    """
+    Hide overlays that appeared since the last call.
+
+    Installs the suppression first if this document doesn't have it yet
+    (e.g. a page opened before install_overlay_suppression was called).
+
+    Returns:
+        Number of elements hidden by this call
+    """
+    installed = await page.evaluate("() => !!window.__navigatorOverlays")
+    if not installed:
+        await install_overlay_suppression(page)
+    return await page.evaluate("() => window.__navigatorOverlays.flush()")
@@ -0,0 +1,312 @@
+"""
+Pool of pre-launched Chromium processes that hands out isolated contexts.
+"""
+import asyncio
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _session_key(app_name: str) -> str:
+    """Turn an app name into a safe session file name."""
+    return re.sub(r'[^a-z0-9_-]+', '_', app_name.lower()).strip('_') or "default"
+
+
+class PooledBrowser:
+    """A Chromium process launched by the pool and driven over CDP."""
+
+    def __init__(self, process: asyncio.subprocess.Process, browser, port: int, profile_dir: Path):
+        self.process = process
+        self.browser = browser
+        self.port = port
+        self.profile_dir = profile_dir
+        self.jobs_served = 0
+        self.launched_at = time.time()
+
+    @property
+    def cdp_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def rss_mb(self) -> float:
+        """Resident memory of the browser and all of its child processes, in MB."""
+        try:
+            root = psutil.Process(self.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def is_alive(self) -> bool:
+        return self.process.returncode is None and self.browser.is_connected()
+
+
+class BrowserLease:
+    """An isolated browser context checked out of the pool for one job."""
+
+    def __init__(self, pooled: PooledBrowser, context, page, app_name: str):
+        self.pooled = pooled
+        self.context = context
+        self.page = page
+        self.app_name = app_name
+        self.acquired_at = time.time()
+
+    @property
+    def browser(self):
+        return self.pooled.browser
+
+    @property
+    def cdp_url(self) -> str:
+        return self.pooled.cdp_url
+
+
+class BrowserPool:
+    """
+    Keeps warm Chromium processes and gives each job a fresh context.
+
+    Every job gets its own browser context, seeded from the saved session
+    (cookies + local storage) of the app it targets, so concurrent jobs never
+    share state. A browser is relaunched after serving max_jobs_per_browser
+    jobs or once its process tree grows past max_rss_mb.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_jobs_per_browser: int = 20,
+        max_rss_mb: float = 1500,
+        headless: bool = False,
+        sessions_dir: str = "browser_sessions",
+        launch_timeout: float = 15.0
+    ):
+        """
+        Initialize the browser pool.
+
+        Args:
+            size: Number of Chromium processes kept warm
+            max_jobs_per_browser: Recycle a browser after this many jobs
+            max_rss_mb: Recycle a browser once its memory exceeds this (MB)
+            headless: Launch Chromium without a window
+            sessions_dir: Directory holding per-app saved sessions
+            launch_timeout: Seconds to wait for a new browser's CDP endpoint
+        """
+        self.size = max(1, size)
+        self.max_jobs_per_browser = max_jobs_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.sessions_dir = Path(sessions_dir)
+        self.launch_timeout = launch_timeout
+        self._playwright = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._browsers: List[PooledBrowser] = []
+        self._recycled = 0
+
+    async def start(self):
+        """Launch Playwright and pre-start all browsers."""
+        if self._playwright is not None:
+            return
+
+        from playwright.async_api import async_playwright
+
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+
+        launched = await asyncio.gather(*(self._launch() for _ in range(self.size)))
+        for pooled in launched:
+            self._idle.put_nowait(pooled)
+        print(f"🌐 Browser pool ready ({self.size} warm browser{'s' if self.size != 1 else ''})")
+
+    async def stop(self):
+        """Close all browsers and stop Playwright."""
+        for pooled in list(self._browsers):
+            await self._close(pooled)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def session_path(self, app_name: str) -> Path:
+        """Path of the saved session (Playwright storage state) for an app."""
+        return self.sessions_dir / f"{_session_key(app_name)}.json"
+
+    async def acquire(self, app_name: str) -> BrowserLease:
+        """
+        Check out a fresh context for a job, waiting for a free browser if needed.
+
+        Args:
+            app_name: App the job targets; its saved session seeds the context
+        """
+        if self._idle is None:
+            raise RuntimeError("BrowserPool.start() must be called before acquiring browsers")
+
+        pooled = await self._idle.get()
+        context = None
+        try:
+            if not pooled.is_alive():
+                await self._close(pooled)
+                pooled = await self._launch()
+
+            session_file = self.session_path(app_name)
+            context = await pooled.browser.new_context(
+                storage_state=str(session_file) if session_file.exists() else None,
+                no_viewport=True
+            )
+            page = await context.new_page()
+            # Leave the job's tab as the only one, so a CDP client attaching to
+            # this browser (Browser Use) drives the isolated context
+            for other in pooled.browser.contexts:
+                if other is not context:
+                    for stale in other.pages:
+                        await stale.close()
+        except Exception:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._idle.put_nowait(pooled)
+            raise
+
+        return BrowserLease(pooled, context, page, app_name)
+
+    async def release(self, lease: BrowserLease, save_session: bool = True):
+        """
+        Return a leased browser to the pool.
+
+        Args:
+            lease: The lease returned by acquire()
+            save_session: Persist the context's cookies/storage as the app's session
+        """
+        pooled = lease.pooled
+        try:
+            if save_session:
+                try:
+                    session_file = self.session_path(lease.app_name)
+                    tmp_file = session_file.with_suffix(".json.tmp")
+                    await lease.context.storage_state(path=str(tmp_file))
+                    tmp_file.replace(session_file)
+                except Exception as e:
+                    print(f"⚠ Could not save session for {lease.app_name}: {e}")
+            try:
+                await lease.context.close()
+            except Exception:
+                pass
+
+            pooled.jobs_served += 1
+            if self._needs_recycle(pooled):
+                await self._close(pooled)
+                self._recycled += 1
+                pooled = await self._launch()
+        finally:
+            self._idle.put_nowait(pooled)
+
+    @asynccontextmanager
+    async def lease(self, app_name: str, save_session: bool = True):
+        """Context manager wrapper around acquire()/release()."""
+        lease = await self.acquire(app_name)
+        try:
+            yield lease
+        finally:
+            await self.release(lease, save_session=save_session)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool utilisation and per-browser health."""
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "recycled": self._recycled,
+            "browsers": [
+                {
+                    "port": pooled.port,
+                    "jobs_served": pooled.jobs_served,
+                    "rss_mb": round(pooled.rss_mb(), 1),
+                    "uptime_s": round(time.time() - pooled.launched_at, 1),
+                }
+                for pooled in self._browsers
+            ],
+        }
+
+    def _needs_recycle(self, pooled: PooledBrowser) -> bool:
+        if not pooled.is_alive():
+            return True
+        if self.max_jobs_per_browser and pooled.jobs_served >= self.max_jobs_per_browser:
+            return True
+        if self.max_rss_mb and pooled.rss_mb() > self.max_rss_mb:
+            return True
+        return False
+
+    async def _launch(self) -> PooledBrowser:
+        """Start a Chromium process with remote debugging and connect to it."""
+        port = _free_port()
+        profile_dir = Path(tempfile.mkdtemp(prefix="navigator_browser_"))
+        args = [
+            self._playwright.chromium.executable_path,
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        args.append("about:blank")
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.time() + self.launch_timeout
+        while True:
+            try:
+                browser = await self._playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{port}")
+                break
+            except Exception:
+                if process.returncode is not None or time.time() > deadline:
+                    process.kill()
+                    shutil.rmtree(profile_dir, ignore_errors=True)
+                    raise RuntimeError(f"Chromium did not start on port {port}")
+                await asyncio.sleep(0.1)
+
+        pooled = PooledBrowser(process, browser, port, profile_dir)
+        self._browsers.append(pooled)
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser):
+        """Disconnect from and terminate a pooled browser."""
+        if pooled in self._browsers:
+            self._browsers.remove(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+        if pooled.process.returncode is None:
+            pooled.process.terminate()
+            try:
+                await asyncio.wait_for(pooled.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pooled.process.kill()
+        shutil.rmtree(pooled.profile_dir, ignore_errors=True)
@@ -0,0 +1,168 @@
+"""
+Single-round-trip page inspection: login indicators, readiness and skeletons.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+
+LOGIN_URL_PATTERNS = ['login', 'signin', 'sign-in', 'auth', 'authenticate', 'sso']
+LOGIN_TITLE_PATTERNS = ['log in', 'sign in', 'login', 'signin', 'authenticate']
+# Pages captured in guides must never be auth pages, so this list is broader
+AUTH_URL_PATTERNS = ['login', 'signin', 'sign-in', 'auth', 'accounts.google', 'sso']
+
+SKELETON_SELECTORS = (
+    '.skeleton, [class*="skeleton"], ytd-rich-grid-skeleton, '
+    '#masthead-skeleton, [placeholder][aria-hidden="true"]'
+)
+
+# Login indicators only: cheap enough to re-run on every DOM mutation
+LOGIN_SCRIPT = """
+(params) => {
+    const lowerUrl = location.href.toLowerCase();
+    const lowerTitle = (document.title || '').toLowerCase();
+
+    const loginButtonText = /\\b(log in|sign in)\\b/i;
+    let loginButton = false;
+    for (const el of document.querySelectorAll('button, [role="button"], input[type="submit"]')) {
+        if (loginButtonText.test(el.innerText || el.value || '')) { loginButton = true; break; }
+    }
+    const login = {
+        url_match: params.loginUrlPatterns.some(p => lowerUrl.includes(p)),
+        title_match: params.loginTitlePatterns.some(p => lowerTitle.includes(p)),
+        password_field: !!document.querySelector(
+            'input[type="password"], input[name*="password"], input[placeholder*="password" i]'
+        ),
+        email_field: !!document.querySelector('input[name*="email"], input[placeholder*="email" i]'),
+        login_button: loginButton,
+    };
+    login.is_login = Object.values(login).some(Boolean);
+    return login;
+}
+"""
+
+PROBE_SCRIPT = """
+(params) => {
+    const login = (%s)(params);
+
+    let loadedMedia = 0;
+    for (const img of document.querySelectorAll('img[src]:not([src=""])')) {
+        if (img.complete && img.naturalHeight > 50) loadedMedia++;
+    }
+    for (const video of document.querySelectorAll('video')) {
+        if (video.readyState >= 2) loadedMedia++;  // HAVE_CURRENT_DATA or better
+    }
+    const readiness = {
+        loaded_media: loadedMedia,
+        links: document.querySelectorAll('a[href]').length,
+        buttons: document.querySelectorAll('button').length,
+        text_length: document.body ? document.body.innerText.trim().length : 0,
+    };
+
+    return {
+        url: location.href,
+        title: document.title || '',
+        login,
+        readiness,
+        skeleton: !!document.querySelector(params.skeletonSelectors),
+    };
+}
+""" % LOGIN_SCRIPT.strip()
+
+
+class ReadinessThresholds:
+    """Minimum content a page needs before it's worth capturing."""
+
+    def __init__(
+        self,
+        min_loaded_media: int = 0,
+        min_links: int = 1,
+        min_buttons: int = 1,
+        min_text_length: int = 100
+    ):
+        self.min_loaded_media = min_loaded_media
+        self.min_links = min_links
+        self.min_buttons = min_buttons
+        self.min_text_length = min_text_length
+
+    @classmethod
+    def for_app(cls, app_name: Optional[str], apps_file: str = "config/apps.yaml") -> "ReadinessThresholds":
+        """
+        Load thresholds from the app's `readiness` block in apps.yaml.
+
+        Missing keys (or apps) fall back to the generic defaults.
+        """
+        overrides: Dict[str, Any] = {}
+        path = Path(apps_file)
+        if app_name and path.exists():
+            with open(path, 'r') as f:
+                apps = yaml.safe_load(f) or {}
+            app_config = apps.get(app_name.lower()) or {}
+            overrides = app_config.get('readiness') or {}
+
+        defaults = cls()
+        return cls(**{
+            key: int(overrides.get(key, getattr(defaults, key)))
+            for key in ('min_loaded_media', 'min_links', 'min_buttons', 'min_text_length')
+        })
+
+    def is_ready(self, readiness: Dict[str, int]) -> bool:
+        return (
+            readiness['loaded_media'] >= self.min_loaded_media
+            and readiness['links'] >= self.min_links
+            and readiness['buttons'] >= self.min_buttons
+            and readiness['text_length'] >= self.min_text_length
+        )
+
+
+class ProbeResult:
+    """Structured result of one PageProbe run."""
+
+    def __init__(self, data: Dict[str, Any], thresholds: ReadinessThresholds):
+        self.url: str = data['url']
+        self.title: str = data['title']
+        self.login: Dict[str, bool] = data['login']
+        self.readiness: Dict[str, int] = data['readiness']
+        self.skeleton: bool = data['skeleton']
+        self.content_ready = thresholds.is_ready(self.readiness)
+
+    @property
+    def is_login(self) -> bool:
+        return self.login['is_login']
+
+    @property
+    def is_auth_url(self) -> bool:
+        lower_url = self.url.lower()
+        return any(pattern in lower_url for pattern in AUTH_URL_PATTERNS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "title": self.title,
+            "login": self.login,
+            "readiness": self.readiness,
+            "content_ready": self.content_ready,
+            "skeleton": self.skeleton,
+        }
+
+
+class PageProbe:
+    """Collects everything the capture path needs about a page in one evaluate."""
+
+    def __init__(self, thresholds: Optional[ReadinessThresholds] = None):
+        """
+        Args:
+            thresholds: Readiness thresholds (see ReadinessThresholds.for_app)
+        """
+        self.thresholds = thresholds or ReadinessThresholds()
+        self._params = {
+            "loginUrlPatterns": LOGIN_URL_PATTERNS,
+            "loginTitlePatterns": LOGIN_TITLE_PATTERNS,
+            "skeletonSelectors": SKELETON_SELECTORS,
+        }
+
+    async def run(self, page) -> ProbeResult:
+        """Inspect the page with a single CDP round trip."""
+        data = await page.evaluate(PROBE_SCRIPT, self._params)
+        return ProbeResult(data, self.thresholds)
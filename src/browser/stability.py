@@ -0,0 +1,215 @@
+"""
+Event-driven detection of when a page has visually settled.
+"""
+import asyncio
+import os
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+
+# Installed once per document. Tracks DOM mutations, layout shifts and
+# in-flight fetch/XHR requests, and exposes waitForStable() which resolves as
+# soon as all of them have been quiet for `quietMs`.
+STABILITY_SCRIPT = """
+(() => {
+    if (window.__navigatorStability) return;
+
+    const state = {
+        lastActivity: performance.now(),
+        inflight: new Map(),
+        nextRequestId: 0,
+    };
+    const touch = () => { state.lastActivity = performance.now(); };
+
+    const observe = () => {
+        new MutationObserver(touch).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, characterData: true
+        });
+    };
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe, { once: true });
+
+    try {
+        new PerformanceObserver(list => {
+            if (list.getEntries().some(e => e.value > 0.001)) touch();
+        }).observe({ type: 'layout-shift', buffered: false });
+    } catch (e) {}
+
+    const track = () => {
+        const id = state.nextRequestId++;
+        state.inflight.set(id, performance.now());
+        touch();
+        return () => { state.inflight.delete(id); touch(); };
+    };
+
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function (...args) {
+            const done = track();
+            return originalFetch.apply(this, args).finally(done);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        const done = track();
+        this.addEventListener('loadend', done, { once: true });
+        return originalSend.apply(this, args);
+    };
+
+    // Requests open longer than longRequestMs (long polling, streaming) are
+    // ignored so apps like YouTube can still be considered settled
+    const pendingRequests = (longRequestMs) => {
+        const now = performance.now();
+        let count = 0;
+        state.inflight.forEach(start => { if (now - start < longRequestMs) count++; });
+        return count;
+    };
+
+    const frame = () => new Promise(resolve => requestAnimationFrame(() => resolve()));
+
+    window.__navigatorStability = {
+        disableAnimations() {
+            if (document.getElementById('__navigator-no-animations')) return;
+            const style = document.createElement('style');
+            style.id = '__navigator-no-animations';
+            style.textContent = '*, *::before, *::after {' +
+                'animation-duration: 0s !important; animation-delay: 0s !important;' +
+                'transition-duration: 0s !important; transition-delay: 0s !important;' +
+                'scroll-behavior: auto !important; caret-color: transparent !important; }';
+            (document.head || document.documentElement).appendChild(style);
+        },
+        async waitForStable({ quietMs, timeoutMs, longRequestMs }) {
+            const start = performance.now();
+            if (document.readyState === 'loading') {
+                await new Promise(r => document.addEventListener('DOMContentLoaded', r, { once: true }));
+            }
+            if (document.fonts && document.fonts.status !== 'loaded') {
+                await Promise.race([document.fonts.ready, new Promise(r => setTimeout(r, timeoutMs))]);
+            }
+            while (true) {
+                await frame();
+                const now = performance.now();
+                const quiet = now - state.lastActivity >= quietMs;
+                const pending = pendingRequests(longRequestMs);
+                if (quiet && pending === 0) {
+                    // One more frame so the settled layout is actually painted
+                    await frame();
+                    return { stable: true, waited_ms: Math.round(performance.now() - start) };
+                }
+                if (now - start >= timeoutMs) {
+                    return { stable: false, waited_ms: Math.round(now - start), pending_requests: pending };
+                }
+                await new Promise(r => setTimeout(r, Math.min(50, quietMs)));
+            }
+        },
+    };
+})();
+"""
+
+
+# Pages that already have the tracker registered as an init script
+_tracked_pages = weakref.WeakSet()
+
+
+class StabilityConfig:
+    """Timeouts for stability detection (all in milliseconds)."""
+
+    def __init__(
+        self,
+        quiet_ms: int = 300,
+        timeout_ms: int = 4000,
+        long_request_ms: int = 2000,
+        disable_animations: bool = True
+    ):
+        """
+        Args:
+            quiet_ms: How long the DOM, layout and network must stay idle
+            timeout_ms: Give up and report an unstable page after this long
+            long_request_ms: Requests open longer than this are ignored
+            disable_animations: Turn off CSS animations/transitions on the page
+        """
+        self.quiet_ms = quiet_ms
+        self.timeout_ms = timeout_ms
+        self.long_request_ms = long_request_ms
+        self.disable_animations = disable_animations
+
+    @classmethod
+    def from_env(cls) -> "StabilityConfig":
+        """Build a config from NAVIGATOR_STABLE_* environment variables."""
+        return cls(
+            quiet_ms=int(os.getenv("NAVIGATOR_STABLE_QUIET_MS", "300")),
+            timeout_ms=int(os.getenv("NAVIGATOR_STABLE_TIMEOUT_MS", "4000")),
+            long_request_ms=int(os.getenv("NAVIGATOR_STABLE_LONG_REQUEST_MS", "2000")),
+            disable_animations=os.getenv("NAVIGATOR_DISABLE_ANIMATIONS", "true").lower() in ("1", "true", "yes"),
+        )
+
+
+async def install_stability_tracking(page, config: Optional[StabilityConfig] = None):
+    """
+    Register the tracking script for future documents and install it now.
+
+    Pages opened before this call only see requests started afterwards;
+    that's fine, since those are the ones that matter for the next capture.
+    """
+    config = config or StabilityConfig()
+    if page not in _tracked_pages:
+        try:
+            await page.add_init_script(STABILITY_SCRIPT)
+            _tracked_pages.add(page)
+        except Exception:
+            pass
+    await page.evaluate(STABILITY_SCRIPT)
+    if config.disable_animations:
+        await page.evaluate("() => window.__navigatorStability.disableAnimations()")
+
+
+async def wait_for_stable(page, config: Optional[StabilityConfig] = None, quiet_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Wait until the page is quiescent: no DOM mutations, layout shifts or
+    recent network requests for quiet_ms, or until the timeout expires.
+
+    Survives navigations that happen while waiting by re-installing the
+    tracker in the new document.
+
+    Args:
+        page: Playwright page
+        config: Stability timeouts (defaults to StabilityConfig())
+        quiet_ms: Override config.quiet_ms for this call
+
+    Returns:
+        Dict with `stable` (bool) and `waited_ms`
+    """
+    config = config or StabilityConfig()
+    options = {
+        "quietMs": quiet_ms if quiet_ms is not None else config.quiet_ms,
+        "timeoutMs": config.timeout_ms,
+        "longRequestMs": config.long_request_ms,
+    }
+    start = time.monotonic()
+    deadline = start + config.timeout_ms / 1000
+
+    while True:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            return {"stable": False, "waited_ms": int((time.monotonic() - start) * 1000)}
+        try:
+            await install_stability_tracking(page, config)
+            result = await asyncio.wait_for(
+                page.evaluate(
+                    "(options) => window.__navigatorStability.waitForStable(options)",
+                    {**options, "timeoutMs": remaining_ms}
+                ),
+                timeout=remaining_ms / 1000 + 1
+            )
+            result["waited_ms"] = int((time.monotonic() - start) * 1000)
+            return result
+        except asyncio.TimeoutError:
+            return {"stable": False, "waited_ms": int((time.monotonic() - start) * 1000)}
+        except Exception:
+            # Usually "execution context was destroyed" because the page
+            # navigated; wait for the new document and try again
+            try:
+                await page.wait_for_load_state('domcontentloaded', timeout=max(remaining_ms, 1))
+            except Exception:
+                await asyncio.sleep(0.05)
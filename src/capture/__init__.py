@@ -0,0 +1,13 @@
+from .encoding import IMAGE_FORMATS, IMAGE_MIME_TYPES, EncodingConfig, ScreenshotEncoder, encode_image
+from .processing import FrameProcessor, analyze_frame, worker_context
+
+__all__ = [
+    'EncodingConfig',
+    'FrameProcessor',
+    'IMAGE_FORMATS',
+    'IMAGE_MIME_TYPES',
+    'ScreenshotEncoder',
+    'analyze_frame',
+    'encode_image',
+    'worker_context',
+]
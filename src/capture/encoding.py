@@ -0,0 +1,214 @@
+"""
+Post-capture screenshot encoding (WebP/AVIF) in a worker pool.
+
+Raw captures are large full-page PNG/JPEG frames; before they're stored in
+the dataset they're re-encoded to a compact web format so both disk usage
+and transfer to the frontend drop.
+"""
+import io
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from PIL import Image, features
+
+from .processing import worker_context
+
+
+# Output format -> (file extension, MIME type, Pillow format name)
+IMAGE_FORMATS = {
+    "webp": ("webp", "image/webp", "WEBP"),
+    "avif": ("avif", "image/avif", "AVIF"),
+    "jpeg": ("jpg", "image/jpeg", "JPEG"),
+    "png": ("png", "image/png", "PNG"),
+    # Keep captures exactly as taken
+    "original": (None, None, None),
+}
+
+# MIME types for every extension the dataset may contain
+IMAGE_MIME_TYPES = {ext: mime for ext, mime, _ in IMAGE_FORMATS.values() if ext}
+
+# Largest width/height libwebp can encode; taller full-page captures stay as taken
+WEBP_MAX_DIMENSION = 16383
+
+
+def avif_supported() -> bool:
+    """Whether Pillow can write AVIF (natively or via the pillow-avif-plugin)."""
+    if features.check("avif"):
+        return True
+    try:
+        import pillow_avif  # noqa: F401 - registers the AVIF codec with Pillow
+    except ImportError:
+        return False
+    return True
+
+
+class EncodingConfig:
+    """Target format and quality for stored screenshots."""
+
+    def __init__(
+        self,
+        image_format: str = "webp",
+        quality: int = 80,
+        effort: int = 4,
+        max_width: Optional[int] = None
+    ):
+        """
+        Initialize encoding settings.
+
+        Args:
+            image_format: One of IMAGE_FORMATS ("webp", "avif", "jpeg", "png", "original")
+            quality: Lossy quality 1-100 (ignored for png)
+            effort: Encoder effort, 0 (fast) - 6 (small); WebP "method" / AVIF "speed"
+            max_width: Downscale wider captures to this width (None keeps full size)
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        if image_format == "avif" and not avif_supported():
+            print("⚠️  AVIF encoding is not available in this Pillow build, using WebP")
+            image_format = "webp"
+        self.image_format = image_format
+        self.quality = max(1, min(100, quality))
+        self.effort = max(0, min(6, effort))
+        self.max_width = max_width
+
+    @classmethod
+    def from_env(cls) -> "EncodingConfig":
+        """Read NAVIGATOR_IMAGE_FORMAT/QUALITY/EFFORT/MAX_WIDTH overrides."""
+        max_width = int(os.getenv("NAVIGATOR_IMAGE_MAX_WIDTH", "0"))
+        return cls(
+            image_format=os.getenv("NAVIGATOR_IMAGE_FORMAT", "webp").lower(),
+            quality=int(os.getenv("NAVIGATOR_IMAGE_QUALITY", "80")),
+            effort=int(os.getenv("NAVIGATOR_IMAGE_EFFORT", "4")),
+            max_width=max_width or None
+        )
+
+    @property
+    def extension(self) -> Optional[str]:
+        return IMAGE_FORMATS[self.image_format][0]
+
+
+def encode_image(
+    data: bytes,
+    image_format: str = "webp",
+    quality: int = 80,
+    effort: int = 4,
+    max_width: Optional[int] = None
+) -> bytes:
+    """
+    Re-encode a screenshot into the target format.
+
+    Runs in a worker process, so it only takes and returns plain bytes.
+    Returns the input unchanged for "original", if the re-encoded image
+    would be larger than the source, or if the frame can't be encoded in
+    the target format (e.g. a page taller than WebP allows), so one
+    oversized capture never costs the whole guide.
+    """
+    _, _, pil_format = IMAGE_FORMATS[image_format]
+    if pil_format is None:
+        return data
+    if pil_format == "AVIF" and not features.check("avif"):
+        import pillow_avif  # noqa: F401 - registers the AVIF codec in this worker
+
+    try:
+        encoded = _encode(data, pil_format, quality, effort, max_width)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠ Keeping screenshot as captured, {pil_format} encoding failed: {e}")
+        return data
+    if encoded is None or (len(encoded) >= len(data) and not max_width):
+        return data
+    return encoded
+
+
+def _encode(data: bytes, pil_format: str, quality: int, effort: int, max_width: Optional[int]) -> Optional[bytes]:
+    """Encode with Pillow; None if the image is too large for the format."""
+    with Image.open(io.BytesIO(data)) as image:
+        if max_width and image.width > max_width:
+            image.draft('RGB', (max_width, image.height))
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+        if pil_format == "WEBP" and max(image.size) > WEBP_MAX_DIMENSION:
+            return None
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        if pil_format == "JPEG" and image.mode == "RGBA":
+            image = image.convert("RGB")
+
+        options = {}
+        if pil_format == "WEBP":
+            options = {"quality": quality, "method": effort}
+        elif pil_format == "AVIF":
+            # AVIF speed runs the other way round: 0 is slowest/smallest, 10 fastest
+            options = {"quality": quality, "speed": 10 - effort}
+        elif pil_format == "JPEG":
+            options = {"quality": quality, "optimize": True, "progressive": True}
+        elif pil_format == "PNG":
+            options = {"optimize": True}
+
+        output = io.BytesIO()
+        image.save(output, format=pil_format, **options)
+    return output.getvalue()
+
+
+class ScreenshotEncoder:
+    """
+    Encodes screenshots in a worker pool shared by all jobs.
+    """
+
+    def __init__(
+        self,
+        config: Optional[EncodingConfig] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            config: Target format/quality (defaults to EncodingConfig.from_env())
+            max_workers: Pool size (defaults to min(4, CPU count))
+            use_processes: Use a process pool (True) or a thread pool (False)
+        """
+        self.config = config or EncodingConfig.from_env()
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="screenshot-encoder"
+                )
+        return self._executor
+
+    def _args(self):
+        return (
+            self.config.image_format,
+            self.config.quality,
+            self.config.effort,
+            self.config.max_width
+        )
+
+    def encode_many(self, images: Iterable[bytes]) -> List[bytes]:
+        """
+        Encode several screenshots in parallel, preserving order.
+
+        Blocking; call from a worker thread (e.g. via asyncio.to_thread).
+        """
+        images = list(images)
+        if self.config.image_format == "original" or not images:
+            return images
+        args = [[arg] * len(images) for arg in self._args()]
+        return list(self.executor.map(encode_image, images, *args))
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
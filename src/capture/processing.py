@@ -0,0 +1,119 @@
+"""
+Screenshot analysis (decode, downscale, perceptual hash) off the event loop.
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import imagehash
+from PIL import Image
+
+
+def worker_context():
+    """
+    Start method for long-lived worker pools.
+
+    Workers are forked from a clean fork server instead of from this process,
+    so they don't inherit its open pipes. A forked worker holding the pipe to
+    Playwright's driver keeps the driver alive, and BrowserPool.stop() hangs.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def analyze_frame(data: bytes, max_side: int = 512, hash_size: int = 8) -> str:
+    """
+    Compute the perceptual hash of an encoded screenshot.
+
+    The image is decoded at reduced resolution (JPEG draft mode decodes
+    straight to a smaller scale) and downscaled to at most max_side pixels
+    before hashing, since average_hash only looks at a hash_size x hash_size
+    thumbnail anyway.
+
+    Args:
+        data: Encoded image bytes (PNG/JPEG/WebP)
+        max_side: Longest side of the reduced copy used for hashing
+        hash_size: Side length of the average-hash grid
+
+    Returns:
+        Hex string of the average hash (see imagehash.hex_to_hash)
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft('RGB', (max_side, max_side))
+        image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return str(imagehash.average_hash(image, hash_size=hash_size))
+
+
+class FrameProcessor:
+    """
+    Runs screenshot analysis in a worker pool shared by all jobs.
+
+    Full-resolution bytes are only held while a frame is being analysed;
+    at most max_in_flight frames are queued at once so memory stays bounded
+    no matter how many jobs capture concurrently.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        max_in_flight: Optional[int] = None,
+        analysis_max_side: int = 512,
+        hash_size: int = 8
+    ):
+        """
+        Initialize the frame processor.
+
+        Args:
+            max_workers: Pool size (defaults to min(4, CPU count))
+            use_processes: Use a process pool (True) or a thread pool (False)
+            max_in_flight: Maximum frames submitted at once (defaults to 2 x max_workers)
+            analysis_max_side: Longest side of the reduced copy used for hashing
+            hash_size: Side length of the average-hash grid
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.analysis_max_side = analysis_max_side
+        self.hash_size = hash_size
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="frame-processor"
+                )
+        return self._executor
+
+    async def average_hash(self, data: bytes) -> imagehash.ImageHash:
+        """Compute the perceptual hash of a screenshot without blocking the loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            hex_hash = await loop.run_in_executor(
+                self.executor,
+                analyze_frame,
+                data,
+                self.analysis_max_side,
+                self.hash_size
+            )
+        return imagehash.hex_to_hash(hex_hash)
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
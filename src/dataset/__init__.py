@@ -1,5 +1,6 @@
+from .blob_store import BlobStore
 from .builder import DatasetBuilder
 from .docs_generator import DocsGenerator
+from .guide_cache import GuideCache, task_slug
 
-__all__ = ['DatasetBuilder', 'DocsGenerator']
-
+__all__ = ['BlobStore', 'DatasetBuilder', 'DocsGenerator', 'GuideCache', 'task_slug']
@@ -0,0 +1,307 @@
+"""
+Content-addressed storage for screenshots shared by all workflows.
+
+Each distinct image is stored once as dataset/_blobs/{hh}/{sha256}.{ext};
+workflows reference blobs by hash, so identical frames across steps,
+re-runs and tasks take up disk space only once.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+BLOBS_DIRNAME = "_blobs"
+# Blobs younger than this are never collected: a guide being saved writes its
+# blobs before the metadata.json that references them
+GC_GRACE_SECONDS = 3600
+
+
+def sniff_extension(data: bytes) -> str:
+    """Return the file extension matching an image's actual format."""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "png"
+    if data.startswith(b'\xff\xd8\xff'):
+        return "jpg"
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return "webp"
+    if data[4:12] in (b'ftypavif', b'ftypavis'):
+        return "avif"
+    return "bin"
+
+
+class BlobRef:
+    """A stored blob: its hash, location and whether this put created it."""
+
+    def __init__(self, sha256: str, path: Path, size: int, created: bool):
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.created = created
+
+
+class BlobStore:
+    """Stores files once under their SHA-256 content hash."""
+
+    def __init__(self, base_dir: str = "dataset"):
+        """
+        Initialize the blob store.
+
+        Args:
+            base_dir: Base dataset directory; blobs live in {base_dir}/_blobs
+        """
+        self.base_dir = Path(base_dir)
+        self.blobs_dir = self.base_dir / BLOBS_DIRNAME
+
+    def path_for(self, sha256: str, extension: str) -> Path:
+        return self.blobs_dir / sha256[:2] / f"{sha256}.{extension}"
+
+    def find(self, sha256: str) -> Optional[Path]:
+        """Return the stored file for a hash, whatever its extension."""
+        shard = self.blobs_dir / sha256[:2]
+        if shard.is_dir():
+            for path in shard.glob(f"{sha256}.*"):
+                return path
+        return None
+
+    def put_bytes(self, data: bytes, extension: Optional[str] = None) -> BlobRef:
+        """Store bytes (no-op if an identical blob already exists)."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha256, extension or sniff_extension(data))
+        if path.exists():
+            try:
+                # Reused by a save in progress: restart its garbage collection grace period
+                os.utime(path)
+                return BlobRef(sha256, path, len(data), created=False)
+            except FileNotFoundError:
+                pass  # Collected in the meantime; write it again
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+        return BlobRef(sha256, path, len(data), created=True)
+
+    def put_file(self, source: Path) -> BlobRef:
+        """Store a file's contents."""
+        with open(source, 'rb') as f:
+            return self.put_bytes(f.read())
+
+    def link_from(self, directory: Path, ref: BlobRef) -> str:
+        """Relative path from a workflow directory to a blob, for metadata/markdown."""
+        return Path(os.path.relpath(ref.path, directory)).as_posix()
+
+    def iter_blobs(self) -> Iterator[Path]:
+        if not self.blobs_dir.exists():
+            return
+        for path in self.blobs_dir.glob("*/*"):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                yield path
+
+    def referenced_hashes(self) -> Set[str]:
+        """Hashes referenced by any workflow's metadata.json."""
+        referenced = set()
+        for task_dir in iter_task_dirs(self.base_dir):
+            with open(task_dir / "metadata.json", 'r') as f:
+                metadata = json.load(f)
+            for state in metadata.get('states', []):
+                if state.get('screenshot_sha256'):
+                    referenced.add(state['screenshot_sha256'])
+        return referenced
+
+    def collect_garbage(self, dry_run: bool = False, grace_seconds: float = GC_GRACE_SECONDS) -> Dict[str, int]:
+        """
+        Delete blobs no workflow references any more (e.g. after re-runs).
+
+        Args:
+            dry_run: Report without deleting anything
+            grace_seconds: Keep unreferenced blobs written or reused more recently
+                than this, so blobs of a guide that is still being saved survive
+        """
+        cutoff = time.time() - grace_seconds
+        referenced = self.referenced_hashes()
+        removed = 0
+        freed = 0
+        skipped = 0
+        for path in list(self.iter_blobs()):
+            if path.stem in referenced:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                skipped += 1
+                continue
+            removed += 1
+            freed += stat.st_size
+            if not dry_run:
+                path.unlink(missing_ok=True)
+        return {"removed_blobs": removed, "freed_bytes": freed, "recent_blobs_kept": skipped}
+
+
+def iter_task_dirs(base_dir: Path) -> Iterator[Path]:
+    """Yield every dataset/{app}/{task} directory that has a metadata.json."""
+    if not base_dir.exists():
+        return
+    for app_dir in sorted(base_dir.iterdir()):
+        if not app_dir.is_dir() or app_dir.name.startswith(('.', '_')):
+            continue
+        for task_dir in sorted(app_dir.iterdir()):
+            if task_dir.is_dir() and (task_dir / "metadata.json").exists():
+                yield task_dir
+
+
+def workflow_screenshot_paths(task_dir: Path) -> List[Path]:
+    """A workflow's screenshot files in step order (blob or legacy layout), without duplicates."""
+    metadata_path = task_dir / "metadata.json"
+    if not metadata_path.exists():
+        return []
+    with open(metadata_path, 'r') as f:
+        metadata = json.load(f)
+
+    paths: List[Path] = []
+    for state in metadata.get('states', []):
+        if state.get('screenshot'):
+            path = Path(os.path.normpath(task_dir / state['screenshot']))
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def migrate_task_dir(task_dir: Path, store: BlobStore, dry_run: bool = False) -> List[BlobRef]:
+    """
+    Move one workflow's screenshots/ files into the blob store.
+
+    Rewrites metadata.json and workflow.md to point at the blobs, then
+    deletes the migrated copies.
+
+    Returns:
+        A BlobRef per migrated screenshot (in a dry run nothing is written
+        and `path` is where the blob would go)
+    """
+    metadata_path = task_dir / "metadata.json"
+    with open(metadata_path, 'r') as f:
+        metadata = json.load(f)
+
+    links: Dict[str, str] = {}
+    refs: List[BlobRef] = []
+    migrated_files = set()
+    for state in metadata.get('states', []):
+        screenshot = state.get('screenshot')
+        if not screenshot or state.get('screenshot_sha256'):
+            continue
+        source = task_dir / screenshot
+        if not source.is_file():
+            continue
+        if dry_run:
+            data = source.read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            ref = BlobRef(sha256, store.path_for(sha256, sniff_extension(data)), len(data), created=False)
+        else:
+            ref = store.put_file(source)
+        link = store.link_from(task_dir, ref)
+        links[screenshot] = link
+        state['screenshot'] = link
+        state['screenshot_sha256'] = ref.sha256
+        refs.append(ref)
+        migrated_files.add(source)
+
+    if dry_run or not links:
+        return refs
+
+    tmp_path = metadata_path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    tmp_path.replace(metadata_path)
+
+    workflow_path = task_dir / "workflow.md"
+    if workflow_path.exists():
+        content = workflow_path.read_text(encoding='utf-8')
+        for old, new in links.items():
+            content = content.replace(f"]({old})", f"]({new})")
+        workflow_path.write_text(content, encoding='utf-8')
+
+    for source in migrated_files:
+        source.unlink()
+    screenshots_dir = task_dir / "screenshots"
+    if screenshots_dir.is_dir() and not any(screenshots_dir.iterdir()):
+        screenshots_dir.rmdir()
+
+    return refs
+
+
+def migrate_dataset(base_dir: str = "dataset", dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Migrate every workflow in the dataset to the blob store.
+
+    Returns:
+        Report with screenshot counts and disk usage before/after
+    """
+    store = BlobStore(base_dir)
+    report = {"workflows": 0, "screenshots": 0, "unique_blobs": 0, "bytes_before": 0, "bytes_after": 0}
+    seen: Set[str] = set()
+
+    for task_dir in iter_task_dirs(store.base_dir):
+        refs = migrate_task_dir(task_dir, store, dry_run=dry_run)
+        if not refs:
+            continue
+        report["workflows"] += 1
+        for ref in refs:
+            report["screenshots"] += 1
+            report["bytes_before"] += ref.size
+            if ref.sha256 in seen:
+                continue
+            seen.add(ref.sha256)
+            report["unique_blobs"] += 1
+            # Blobs that were already in the store before this migration cost nothing extra
+            new_blob = ref.created if not dry_run else store.find(ref.sha256) is None
+            if new_blob:
+                report["bytes_after"] += ref.size
+
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    report["dry_run"] = dry_run
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    mb = lambda n: f"{n / (1024 * 1024):.2f} MB"
+    print("\n📦 Screenshot blob store migration" + (" (dry run)" if report["dry_run"] else ""))
+    print(f"  - {report['workflows']} workflows, {report['screenshots']} screenshots")
+    print(f"  - {report['unique_blobs']} unique blobs")
+    print(f"  - Before: {mb(report['bytes_before'])}")
+    print(f"  - After:  {mb(report['bytes_after'])}")
+    saved_pct = 100 * report['bytes_saved'] / report['bytes_before'] if report['bytes_before'] else 0
+    print(f"  - Saved:  {mb(report['bytes_saved'])} ({saved_pct:.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the content-addressed screenshot store")
+    parser.add_argument("--dataset", default="dataset", help="Dataset directory")
+    parser.add_argument("--migrate", action="store_true", help="Move screenshots/ folders into the blob store")
+    parser.add_argument("--gc", action="store_true", help="Delete blobs no workflow references")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    parser.add_argument("--gc-grace", type=float, default=GC_GRACE_SECONDS,
+                        help="Keep unreferenced blobs newer than this many seconds (default: %(default)s)")
+    args = parser.parse_args()
+
+    if not (args.migrate or args.gc):
+        parser.error("nothing to do: pass --migrate and/or --gc")
+
+    if args.migrate:
+        print_report(migrate_dataset(args.dataset, dry_run=args.dry_run))
+    if args.gc:
+        result = BlobStore(args.dataset).collect_garbage(dry_run=args.dry_run, grace_seconds=args.gc_grace)
+        print(f"\n🧹 Removed {result['removed_blobs']} unreferenced blobs "
+              f"({result['freed_bytes'] / (1024 * 1024):.2f} MB)")
+        if result['recent_blobs_kept']:
+            print(f"   Kept {result['recent_blobs_kept']} unreferenced blobs newer than {args.gc_grace:g}s")
+
+
+if __name__ == "__main__":
+    main()
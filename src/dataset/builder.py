@@ -5,7 +5,9 @@ import json
 from pathlib import Path
 from typing import Dict, Any, List
 from datetime import datetime
-import shutil
+
+from .blob_store import BlobStore
+from .catalog import Catalog
 
 
 class DatasetBuilder:
@@ -20,6 +22,8 @@ class DatasetBuilder:
         """
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(exist_ok=True)
+        self.blob_store = BlobStore(str(self.base_dir))
+        self.catalog = Catalog(str(self.base_dir))
     
     def save_workflow(
         self,
@@ -45,29 +49,20 @@ class DatasetBuilder:
         # Create directory structure
         app_dir = self.base_dir / app_name.lower()
         task_dir = app_dir / task_name
-        screenshots_dir = task_dir / "screenshots"
-        
-        screenshots_dir.mkdir(exist_ok=True, parents=True)
+        task_dir.mkdir(exist_ok=True, parents=True)
         
-        # Copy and rename screenshots
-        temp_dir = Path(temp_screenshots_dir)
+        # Store screenshots in the content-addressed blob store
         screenshot_mapping = {}
         
-        for i, state in enumerate(captured_states, start=1):
+        for state in captured_states:
             old_path = Path(state['screenshot'])
             if old_path.exists():
-                # Create clean filename
-                description_slug = state.get('description', 'state').replace(' ', '_').lower()
-                description_slug = ''.join(c for c in description_slug if c.isalnum() or c == '_')[:50]
-                new_filename = f"{i:02d}_{description_slug}.png"
-                new_path = screenshots_dir / new_filename
+                ref = self.blob_store.put_file(old_path)
+                screenshot_mapping[str(old_path)] = str(ref.path)
                 
-                # Copy file
-                shutil.copy2(old_path, new_path)
-                screenshot_mapping[str(old_path)] = str(new_path)
-                
-                # Update state with new path
-                state['screenshot'] = str(new_path.relative_to(task_dir))
+                # Update state to point at the blob
+                state['screenshot'] = self.blob_store.link_from(task_dir, ref)
+                state['screenshot_sha256'] = ref.sha256
         
         # Create metadata
         metadata = {
@@ -83,6 +78,7 @@ class DatasetBuilder:
         metadata_path = task_dir / "metadata.json"
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
+        self.catalog.upsert_workflow(task_dir, metadata)
         
         print(f"✓ Saved workflow to: {task_dir}")
         print(f"  - {len(captured_states)} states")
@@ -92,29 +88,20 @@ class DatasetBuilder:
     
     def get_all_workflows(self) -> List[Dict[str, Any]]:
         """
-        Get metadata for all workflows in the dataset.
+        Get all workflows in the dataset from the catalog.
         
         Returns:
-            List of workflow metadata dictionaries
+            List of workflow dictionaries (path, app_name, task_name, task_query,
+            num_states, generated_at)
         """
         workflows = []
-        
-        for app_dir in self.base_dir.iterdir():
-            if not app_dir.is_dir():
-                continue
-            
-            for task_dir in app_dir.iterdir():
-                if not task_dir.is_dir():
-                    continue
-                
-                metadata_path = task_dir / "metadata.json"
-                if metadata_path.exists():
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                        metadata['path'] = str(task_dir.relative_to(self.base_dir))
-                        workflows.append(metadata)
-        
-        return workflows
+        offset = 0
+        while True:
+            page = self.catalog.list_workflows(limit=1000, offset=offset)
+            workflows.extend(page['items'])
+            offset += len(page['items'])
+            if not page['items'] or offset >= page['total']:
+                return workflows
     
     def generate_dataset_summary(self) -> Dict[str, Any]:
         """
@@ -123,41 +110,8 @@ class DatasetBuilder:
         Returns:
             Dictionary with dataset statistics
         """
-        workflows = self.get_all_workflows()
-        
-        # Group by app
-        apps = {}
-        for workflow in workflows:
-            app_name = workflow['app_name']
-            if app_name not in apps:
-                apps[app_name] = []
-            apps[app_name].append(workflow)
-        
-        # Calculate statistics
-        total_states = sum(w['num_states'] for w in workflows)
-        
-        summary = {
-            "total_workflows": len(workflows),
-            "total_states_captured": total_states,
-            "apps": {},
-            "generated_at": datetime.now().isoformat()
-        }
-        
-        for app_name, app_workflows in apps.items():
-            summary['apps'][app_name] = {
-                "num_workflows": len(app_workflows),
-                "total_states": sum(w['num_states'] for w in app_workflows),
-                "workflows": [
-                    {
-                        "task_name": w['task_name'],
-                        "task_query": w['task_query'],
-                        "num_states": w['num_states'],
-                        "path": w['path']
-                    }
-                    for w in app_workflows
-                ]
-            }
-        
+        summary = self.catalog.summary()
+        summary["generated_at"] = datetime.now().isoformat()
         return summary
     
     def save_dataset_summary(self) -> str:
@@ -0,0 +1,447 @@
+"""
+SQLite catalog of the dataset: workflows, their steps and screenshots.
+
+The catalog is updated in a single transaction whenever a workflow is
+saved, so listings, filters, summaries and full-text search never have to
+walk the dataset directory. If it ever drifts from disk (manual edits, copied datasets),
+resynchronise it with
+
+    python -m src.dataset.catalog --rebuild [--dataset dataset]
+"""
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .blob_store import iter_task_dirs
+from .steps import load_step_records
+
+
+CATALOG_FILENAME = "_catalog.sqlite3"
+# Bump when the schema gains derived data that existing rows must be re-indexed for
+CATALOG_VERSION = 2
+REBUILD_BATCH_SIZE = 500
+
+# bm25 column weights for search: task, labels, typed text, page titles
+SEARCH_WEIGHTS = (10.0, 4.0, 3.0, 2.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    app_name TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    task_query TEXT NOT NULL,
+    num_states INTEGER NOT NULL,
+    generated_at TEXT,
+    metadata_mtime_ns INTEGER NOT NULL,
+    metadata_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workflows_app_generated ON workflows (app_name, generated_at);
+CREATE INDEX IF NOT EXISTS workflows_generated ON workflows (generated_at);
+CREATE INDEX IF NOT EXISTS workflows_task ON workflows (task_name);
+
+CREATE TABLE IF NOT EXISTS steps (
+    workflow_id INTEGER NOT NULL REFERENCES workflows (id) ON DELETE CASCADE,
+    step INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    label TEXT,
+    text TEXT,
+    success INTEGER,
+    screenshot_sha256 TEXT,
+    PRIMARY KEY (workflow_id, step)
+);
+CREATE INDEX IF NOT EXISTS steps_screenshot ON steps (screenshot_sha256);
+
+CREATE TABLE IF NOT EXISTS screenshots (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL
+);
+
+-- Inverted index over each workflow's searchable text; rowid is workflows.id
+CREATE VIRTUAL TABLE IF NOT EXISTS workflow_search USING fts5 (
+    task, labels, typed, titles,
+    tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS workflows_search_delete AFTER DELETE ON workflows BEGIN
+    DELETE FROM workflow_search WHERE rowid = old.id;
+END;
+"""
+
+_SEARCH_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_WORKFLOW_COLUMNS = "path, app_name, task_name, task_query, num_states, generated_at"
+
+
+class Catalog:
+    """Indexes workflows, steps and screenshots in SQLite."""
+
+    def __init__(self, base_dir: str = "dataset", db_path: Optional[str] = None):
+        """
+        Initialize the catalog, creating the database if needed.
+
+        Args:
+            base_dir: Dataset directory the catalog describes
+            db_path: Database file (defaults to {base_dir}/_catalog.sqlite3)
+        """
+        self.base_dir = Path(base_dir)
+        self.db_path = Path(db_path) if db_path else self.base_dir / CATALOG_FILENAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the server's worker threads; sqlite3 connections aren't, so serialize access
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < CATALOG_VERSION:
+                # Forget file stats so the next rebuild() re-indexes every workflow
+                self._conn.execute("UPDATE workflows SET metadata_mtime_ns = 0")
+                self._conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+
+    def _relative(self, task_dir: Path) -> str:
+        try:
+            return task_dir.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return task_dir.as_posix()
+
+    def _write_workflow(self, task_dir: Path, metadata: Dict[str, Any]):
+        """Replace one workflow's rows (caller holds the lock and the transaction)."""
+        stat = (task_dir / "metadata.json").stat()
+        path = self._relative(task_dir)
+        self._conn.execute("DELETE FROM workflows WHERE path = ?", (path,))
+        cursor = self._conn.execute(
+            f"INSERT INTO workflows ({_WORKFLOW_COLUMNS}, metadata_mtime_ns, metadata_size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path,
+                metadata.get('app_name', task_dir.parent.name),
+                metadata.get('task_name', task_dir.name),
+                metadata.get('task_query', ""),
+                metadata.get('num_states', len(metadata.get('states', []))),
+                metadata.get('timestamp'),
+                stat.st_mtime_ns,
+                stat.st_size,
+            )
+        )
+        workflow_id = cursor.lastrowid
+
+        step_rows = []
+        screenshot_rows = []
+        labels, typed, titles = [], [], []
+        for record in load_step_records(metadata):
+            step_rows.append((
+                workflow_id,
+                record.step,
+                record.action,
+                record.url,
+                record.title,
+                record.target.label if record.target else None,
+                record.text,
+                None if record.success is None else int(record.success),
+                record.screenshot_sha256,
+            ))
+            if record.screenshot_sha256 and record.screenshot:
+                blob_path = self._relative(task_dir / record.screenshot)
+                screenshot_rows.append((record.screenshot_sha256, blob_path))
+            if record.target and record.target.label:
+                labels.append(record.target.label)
+            if record.text and record.action in ('type', 'search'):
+                typed.append(record.text)
+            # Consecutive steps on the same page repeat its title
+            if record.title and (not titles or titles[-1] != record.title):
+                titles.append(record.title)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", step_rows
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO screenshots (sha256, path) VALUES (?, ?)", screenshot_rows
+        )
+
+        task = " ".join(filter(None, [
+            metadata.get('app_name', task_dir.parent.name),
+            metadata.get('task_query', ""),
+            metadata.get('task_name', task_dir.name).replace("_", " "),
+        ]))
+        self._conn.execute(
+            "INSERT INTO workflow_search (rowid, task, labels, typed, titles) VALUES (?, ?, ?, ?, ?)",
+            (workflow_id, task, " · ".join(labels), " · ".join(typed), " · ".join(titles))
+        )
+
+    def upsert_workflow(self, task_dir: Path, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Add or replace a workflow, atomically.
+
+        Args:
+            task_dir: The workflow's directory (containing metadata.json)
+            metadata: Its metadata, if already loaded
+        """
+        task_dir = Path(task_dir)
+        if metadata is None:
+            with open(task_dir / "metadata.json", 'r') as f:
+                metadata = json.load(f)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_workflow(task_dir, metadata)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def rebuild(self, full: bool = False) -> Dict[str, int]:
+        """
+        Bring the catalog in line with the dataset on disk.
+
+        Workflows whose metadata.json is unchanged (same mtime and size) are
+        skipped unless full is set; missing workflows are removed.
+
+        Returns:
+            Counts of added/updated, unchanged and removed workflows
+        """
+        with self._lock:
+            known = {
+                row['path']: (row['metadata_mtime_ns'], row['metadata_size'])
+                for row in self._conn.execute("SELECT path, metadata_mtime_ns, metadata_size FROM workflows")
+            }
+
+        stats = {"updated": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        pending: List[Path] = []
+        for task_dir in iter_task_dirs(self.base_dir):
+            path = self._relative(task_dir)
+            seen.add(path)
+            stat = (task_dir / "metadata.json").stat()
+            if not full and known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                stats["unchanged"] += 1
+                continue
+            pending.append(task_dir)
+
+        # Index in batches so memory stays bounded on large datasets
+        for start in range(0, len(pending), REBUILD_BATCH_SIZE):
+            batch: List[Tuple[Path, Dict[str, Any]]] = []
+            for task_dir in pending[start:start + REBUILD_BATCH_SIZE]:
+                try:
+                    with open(task_dir / "metadata.json", 'r') as f:
+                        batch.append((task_dir, json.load(f)))
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"⚠️  Skipping {task_dir}: {e}")
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for task_dir, metadata in batch:
+                        self._write_workflow(task_dir, metadata)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            stats["updated"] += len(batch)
+
+        removed = [path for path in known if path not in seen]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM workflows WHERE path = ?", [(p,) for p in removed])
+                self._conn.execute(
+                    "DELETE FROM screenshots WHERE sha256 NOT IN "
+                    "(SELECT screenshot_sha256 FROM steps WHERE screenshot_sha256 IS NOT NULL)"
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+        stats["removed"] = len(removed)
+        return stats
+
+    def list_workflows(
+        self,
+        app_name: Optional[str] = None,
+        task: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Page through workflows, newest first.
+
+        Args:
+            app_name: Only this app
+            task: Substring of the task name or query
+            since: ISO timestamp; only workflows generated at or after it
+            until: ISO timestamp; only workflows generated before it
+            limit: Page size
+            offset: Rows to skip
+
+        Returns:
+            {"total", "limit", "offset", "items"}
+        """
+        clauses = []
+        params: List[Any] = []
+        if app_name:
+            clauses.append("app_name = ?")
+            params.append(app_name.lower())
+        if task:
+            clauses.append("(task_name LIKE ? ESCAPE '\\' OR task_query LIKE ? ESCAPE '\\')")
+            escaped = task.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            # Task names are slugs ("search_for_x"), queries are plain text ("search for x")
+            params += ["%" + escaped.replace(" ", "\\_") + "%", "%" + escaped + "%"]
+        if since:
+            clauses.append("generated_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("generated_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM workflows {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {_WORKFLOW_COLUMNS} FROM workflows {where} "
+                "ORDER BY generated_at DESC, path LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return {"total": total, "limit": limit, "offset": offset, "items": [dict(row) for row in rows]}
+
+    def _match(self, terms: List[str], mode: str) -> str:
+        """FTS5 query: quoted terms (no operator injection), last one a prefix for type-ahead."""
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return f" {mode} ".join(quoted)
+
+    def search(self, query: str, app_name: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Ranked full-text search over task queries, clicked labels, typed text and page titles.
+
+        All terms must match; if nothing does, workflows matching any term
+        are returned instead. Ranking is bm25 with task matches weighted highest.
+
+        Args:
+            query: Free text
+            app_name: Only this app
+            limit: Maximum results
+
+        Returns:
+            {"query", "total", "items"}, items carrying a score and a highlighted snippet
+        """
+        terms = _SEARCH_TOKEN.findall(query.lower())
+        if not terms:
+            return {"query": query, "total": 0, "items": []}
+
+        app_clause = "AND w.app_name = ?" if app_name else ""
+        app_params = [app_name.lower()] if app_name else []
+        weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+
+        with self._lock:
+            for mode in ("AND", "OR"):
+                params = [self._match(terms, mode)] + app_params
+                total = self._conn.execute(
+                    "SELECT COUNT(*) FROM workflow_search s JOIN workflows w ON w.id = s.rowid "
+                    f"WHERE workflow_search MATCH ? {app_clause}",
+                    params
+                ).fetchone()[0]
+                if total or len(terms) == 1:
+                    break
+            rows = self._conn.execute(
+                f"SELECT {', '.join('w.' + c.strip() for c in _WORKFLOW_COLUMNS.split(','))}, "
+                f"bm25(workflow_search, {weights}) AS rank, "
+                "snippet(workflow_search, -1, '**', '**', '…', 12) AS snippet "
+                "FROM workflow_search s JOIN workflows w ON w.id = s.rowid "
+                f"WHERE workflow_search MATCH ? {app_clause} "
+                "ORDER BY rank LIMIT ?",
+                params + [limit]
+            ).fetchall() if total else []
+
+        items = []
+        for row in rows:
+            item = dict(row)
+            # bm25 is lower-is-better and negative; report a positive relevance
+            item['score'] = round(-item.pop('rank'), 4)
+            items.append(item)
+        return {"query": query, "total": total, "items": items}
+
+    def get_workflow(self, path: str) -> Optional[Dict[str, Any]]:
+        """A workflow ("app/task") with its steps."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id, {_WORKFLOW_COLUMNS} FROM workflows WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None:
+                return None
+            steps = self._conn.execute(
+                "SELECT step, action, url, title, label, text, success, screenshot_sha256 "
+                "FROM steps WHERE workflow_id = ? ORDER BY step",
+                (row['id'],)
+            ).fetchall()
+        workflow = dict(row)
+        del workflow['id']
+        workflow['steps'] = [{k: v for k, v in dict(step).items() if v is not None} for step in steps]
+        return workflow
+
+    def summary(self, include_workflows: bool = True) -> Dict[str, Any]:
+        """Dataset summary in the shape DatasetBuilder.generate_dataset_summary returns."""
+        with self._lock:
+            app_rows = self._conn.execute(
+                "SELECT app_name, COUNT(*) AS num_workflows, SUM(num_states) AS total_states "
+                "FROM workflows GROUP BY app_name ORDER BY app_name"
+            ).fetchall()
+            workflow_rows = self._conn.execute(
+                "SELECT app_name, task_name, task_query, num_states, path FROM workflows ORDER BY app_name, path"
+            ).fetchall() if include_workflows else []
+            unique_screenshots = self._conn.execute("SELECT COUNT(*) FROM screenshots").fetchone()[0]
+
+        apps = {
+            row['app_name']: {
+                "num_workflows": row['num_workflows'],
+                "total_states": row['total_states'] or 0,
+            }
+            for row in app_rows
+        }
+        if include_workflows:
+            for app in apps.values():
+                app['workflows'] = []
+            for row in workflow_rows:
+                workflow = dict(row)
+                apps[workflow.pop('app_name')]['workflows'].append(workflow)
+
+        return {
+            "total_workflows": sum(app['num_workflows'] for app in apps.values()),
+            "total_states_captured": sum(app['total_states'] for app in apps.values()),
+            "unique_screenshots": unique_screenshots,
+            "apps": apps,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the dataset's SQLite catalog")
+    parser.add_argument("--dataset", default="dataset", help="Dataset directory")
+    parser.add_argument("--rebuild", action="store_true", help="Resynchronise the catalog with the files on disk")
+    parser.add_argument("--full", action="store_true", help="Re-index every workflow, not just changed ones")
+    args = parser.parse_args()
+
+    catalog = Catalog(args.dataset)
+    if args.rebuild:
+        stats = catalog.rebuild(full=args.full)
+        print(f"✓ Catalog rebuilt: {stats['updated']} updated, {stats['unchanged']} unchanged, {stats['removed']} removed")
+    summary = catalog.summary(include_workflows=False)
+    print(f"  - {summary['total_workflows']} workflows, {summary['total_states_captured']} steps, "
+          f"{summary['unique_screenshots']} unique screenshots")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Width-bounded derivatives of dataset screenshots for the web viewer.
+
+Full captures are thousands of pixels wide but are shown in a chat-width
+panel. Derivatives (thumb/preview) are generated on demand in a worker
+pool, stored in a size-bounded disk cache and evicted least recently used.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from PIL import Image
+
+
+# Named derivative sizes -> maximum width in pixels (None = the original file)
+DERIVATIVE_WIDTHS = {
+    "thumb": 320,
+    "preview": 960,
+    "full": None,
+}
+
+
+def render_derivative(data: bytes, max_width: int, quality: int = 75) -> Optional[bytes]:
+    """
+    Downscale an image to at most max_width pixels and encode it as WebP.
+
+    Runs in a worker process. Returns None if the image is already narrow
+    enough, in which case the original should be served.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        if image.width <= max_width:
+            return None
+        height = max(1, round(image.height * max_width / image.width))
+        image.draft('RGB', (max_width, height))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        resized = image.resize((max_width, height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    resized.save(output, format="WEBP", quality=quality, method=4)
+    return output.getvalue()
+
+
+class DerivativeCache:
+    """
+    Disk cache of resized screenshots with LRU eviction.
+
+    Entries are keyed by source path, modification time and size name, so
+    a changed source never serves a stale derivative. Concurrent requests
+    for the same derivative share one render.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "dataset/_derivatives",
+        max_bytes: int = 256 * 1024 * 1024,
+        quality: int = 75,
+        executor: Union[Executor, Callable[[], Executor], None] = None
+    ):
+        """
+        Initialize the derivative cache.
+
+        Args:
+            cache_dir: Directory holding rendered derivatives
+            max_bytes: Total cache size before least recently used entries are evicted
+            quality: WebP quality for derivatives
+            executor: Worker pool used for rendering, or a callable returning it so a
+                lazily created pool isn't started until the first render
+                (None = default thread pool)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._executor = executor
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Cache file name -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._load_index()
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """The render pool, resolved on each use if a callable was given."""
+        if callable(self._executor):
+            return self._executor()
+        return self._executor
+
+    def _load_index(self):
+        if not self.cache_dir.exists():
+            return
+        files = [p for p in self.cache_dir.glob("*/*.webp") if p.is_file()]
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[self._entry_name(path)] = size
+            self._total_bytes += size
+
+    def _entry_name(self, path: Path) -> str:
+        return f"{path.parent.name}/{path.name}"
+
+    def _key(self, source: Path, size_name: str) -> str:
+        stat = source.stat()
+        raw = f"{source.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{size_name}:{self.quality}"
+        digest = hashlib.sha256(raw.encode()).hexdigest()
+        return f"{digest[:2]}/{digest}.webp"
+
+    async def get(self, source: Path, size_name: str) -> Path:
+        """
+        Return the file to serve for a source image at a named size.
+
+        Args:
+            source: Original screenshot
+            size_name: One of DERIVATIVE_WIDTHS
+
+        Returns:
+            Path of the cached derivative, or the source itself when no
+            smaller version is needed
+        """
+        if size_name not in DERIVATIVE_WIDTHS:
+            raise ValueError(f"Unknown size: {size_name}")
+        max_width = DERIVATIVE_WIDTHS[size_name]
+        if max_width is None:
+            return source
+
+        key = self._key(source, size_name)
+        path = self.cache_dir / key
+        if key in self._entries and path.exists():
+            self.hits += 1
+            self._touch(key, path)
+            return path
+
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._render(source, key, max_width)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            # Cancellation too: other requests for this derivative are waiting on it
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited isn't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _render(self, source: Path, key: str, max_width: int) -> Path:
+        loop = asyncio.get_running_loop()
+        data = await asyncio.to_thread(source.read_bytes)
+        rendered = await loop.run_in_executor(
+            self.executor, render_derivative, data, max_width, self.quality
+        )
+        if rendered is None:
+            return source
+
+        path = self.cache_dir / key
+        await asyncio.to_thread(self._write, path, rendered)
+        self._total_bytes += len(rendered) - self._entries.pop(key, 0)
+        self._entries[key] = len(rendered)
+        self._evict()
+        return path
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+
+    def _touch(self, key: str, path: Path):
+        self._entries.move_to_end(key)
+        try:
+            # Persist recency so the LRU order survives restarts
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                (self.cache_dir / key).unlink()
+            except FileNotFoundError:
+                pass
+
+    async def pregenerate(self, sources: Iterable[Path], size_names: Iterable[str] = ("thumb", "preview")):
+        """Render derivatives for freshly saved screenshots so first views are already cached."""
+        await asyncio.gather(*(
+            self.get(source, size_name)
+            for source in sources
+            for size_name in size_names
+        ))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit-rate statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,9 +1,74 @@
 """
 Documentation generator for creating markdown documentation.
+
+Builds are incremental: a manifest (dataset/_docs_manifest.json) records a
+hash of each workflow's metadata and screenshots, so only workflows that
+changed are regenerated (in a worker pool) and the README summary is
+updated from the manifest instead of re-reading every workflow.
 """
+import hashlib
 import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..capture.processing import worker_context
+
+
+# Bump when the generated markdown changes so every workflow is rebuilt once
+DOCS_VERSION = "2"
+MANIFEST_FILENAME = "_docs_manifest.json"
+# Below this many changed workflows, starting a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+# Serializes builds within a process (guides saved by concurrent jobs)
+_build_lock = threading.Lock()
+
+
+def _workflow_fingerprint(task_dir: Path) -> Tuple[int, int]:
+    """Cheap change check: metadata.json's (mtime_ns, size)."""
+    stat = (task_dir / "metadata.json").stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _workflow_hash(task_dir: Path, metadata_bytes: bytes, metadata: Dict[str, Any]) -> str:
+    """Content hash of a workflow's metadata and the screenshots it references."""
+    digest = hashlib.sha256(DOCS_VERSION.encode())
+    digest.update(metadata_bytes)
+    for state in metadata.get('states', []):
+        if state.get('screenshot_sha256'):
+            continue  # already covered by the metadata bytes
+        screenshot = state.get('screenshot')
+        if screenshot:
+            path = task_dir / screenshot
+            if path.exists():
+                stat = path.stat()
+                digest.update(f"{screenshot}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def _build_workflow(dataset_dir: str, task_dir: str) -> Dict[str, Any]:
+    """Regenerate one workflow.md (runs in a worker process) and return its manifest entry."""
+    task_path = Path(task_dir)
+    fingerprint = _workflow_fingerprint(task_path)
+    metadata_bytes = (task_path / "metadata.json").read_bytes()
+    metadata = json.loads(metadata_bytes)
+    DocsGenerator(dataset_dir).generate_workflow_markdown(task_dir, metadata)
+    return {
+        "hash": _workflow_hash(task_path, metadata_bytes, metadata),
+        "fingerprint": list(fingerprint),
+        "summary": {
+            "app_name": metadata['app_name'],
+            "task_name": metadata['task_name'],
+            "task_query": metadata['task_query'],
+            "num_states": metadata['num_states'],
+            "path": str(task_path.relative_to(dataset_dir)),
+        },
+    }
 
 
 class DocsGenerator:
@@ -73,6 +138,43 @@ class DocsGenerator:
         else:
             return f"Step {step_num}"
     
+    def _record_step_title(self, state: Dict[str, Any]) -> str:
+        """Step title from a structured step record (metadata schema v2)."""
+        action = state.get('action')
+        label = (state.get('target') or {}).get('label')
+        text = state.get('text')
+        
+        if action == 'click' and label and len(label) < 50:
+            return f'Click "{label.title()}"'
+        if action == 'type' and text and len(text) < 50:
+            return f'Enter "{text}"'
+        if action == 'search' and text:
+            return f'Search for "{text}"'
+        if action == 'navigate' and text:
+            domain = urlparse(text).netloc.removeprefix('www.')
+            domain_clean = domain.rsplit('.', 1)[0] if '.' in domain else domain
+            return f"Open {domain_clean.title()}" if domain_clean else "Navigate to Page"
+        if action == 'keys' and text:
+            return f'Press {text}'
+        
+        return {
+            'click': "Click Element",
+            'type': "Fill in Form",
+            'scroll': "Scroll Page",
+            'wait': "Wait for Page Load",
+            'done': "Task Completed Successfully",
+        }.get(action, f"Step {state['step']}")
+    
+    def _record_description(self, state: Dict[str, Any]) -> str:
+        """One-line description of a structured step record."""
+        label = (state.get('target') or {}).get('label')
+        if state.get('action') == 'click' and label:
+            return f'Clicked "{label}"'
+        if state.get('action') == 'type' and state.get('text'):
+            return f'Entered: "{state["text"]}"'
+        summary = state.get('summary') or ""
+        return summary if len(summary) < 200 else ""
+    
     def _clean_action_description(self, action: str) -> str:
         """Extract clean, human-readable description from action string."""
         if not action:
@@ -169,12 +271,19 @@ This guide shows you how to **{task_action}** in {metadata['app_name'].title()}
         # Add each state with descriptive titles
         for state in metadata['states']:
             step_num = state['step']
-            description = state.get('description', 'UI State')
-            action = state.get('action_taken', '')
             screenshot_rel = state.get('screenshot', '')
             
-            # Generate a clean step title from the action
-            step_title = self._generate_step_title(step_num, action, description)
+            if 'action' in state:
+                # Structured step record: no need to scrape the action text
+                step_title = self._record_step_title(state)
+                clean_action = self._record_description(state)
+            else:
+                # Legacy repr strings
+                description = state.get('description', 'UI State')
+                action = state.get('action_taken', '')
+                step_title = self._generate_step_title(step_num, action, description)
+                # Extract clean action description (remove ActionResult verbose output)
+                clean_action = self._clean_action_description(action)
             
             md_content += f"### {step_num}. {step_title}\n\n"
             
@@ -182,8 +291,6 @@ This guide shows you how to **{task_action}** in {metadata['app_name'].title()}
             if screenshot_rel:
                 md_content += f"![{step_title}]({screenshot_rel})\n\n"
             
-            # Extract clean action description (remove ActionResult verbose output)
-            clean_action = self._clean_action_description(action)
             if clean_action and len(clean_action) > 5:
                 md_content += f"_{clean_action}_\n\n"
             
@@ -206,23 +313,26 @@ This guide shows you how to **{task_action}** in {metadata['app_name'].title()}
         print(f"✓ Generated workflow documentation: {md_path}")
         return str(md_path)
     
-    def generate_dataset_readme(self) -> str:
+    def generate_dataset_readme(self, summary: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate main README for the dataset.
         
+        Args:
+            summary: Dataset summary (defaults to the one in summary.json)
+        
         Returns:
             Path to the generated README
         """
         # Load summary
         summary_path = self.dataset_dir / "summary.json"
-        if not summary_path.exists():
+        if summary is None and not summary_path.exists():
             print("No summary.json found, generating basic README")
             summary = {
                 "total_workflows": 0,
                 "total_states_captured": 0,
                 "apps": {}
             }
-        else:
+        elif summary is None:
             with open(summary_path, 'r') as f:
                 summary = json.load(f)
         
@@ -243,12 +353,10 @@ Each workflow is organized as follows:
 
 ```
 dataset/
-├── {app_name}/
-│   ├── {task_name}/
-│   │   ├── screenshots/
-│   │   │   ├── 01_state_description.png
-│   │   │   ├── 02_state_description.png
-│   │   │   └── ...
+├── _blobs/
+│   └── {{hash[:2]}}/{{sha256}}.{{ext}}    (screenshots, stored once by content hash)
+├── {{app_name}}/
+│   ├── {{task_name}}/
 │   │   ├── metadata.json
 │   │   └── workflow.md
 ```
@@ -295,8 +403,8 @@ The goal is to demonstrate UI workflows that include non-URL states like modals,
 
 Each workflow includes:
 
-- **screenshots/**: Numbered screenshots showing each UI state
-- **metadata.json**: Structured data about each step
+- **metadata.json**: Structured data about each step, including the hash of its screenshot
+- **_blobs/**: Screenshots shared by all workflows; identical frames are stored once
 - **workflow.md**: Human-readable documentation with embedded images
 
 ## Methodology
@@ -319,28 +427,132 @@ This approach prioritizes generalizability over hardcoded selectors, making it a
         print(f"✓ Generated dataset README: {readme_path}")
         return str(readme_path)
     
-    def generate_all_docs(self):
-        """Generate all documentation for the dataset."""
-        print("\nGenerating documentation...")
-        
-        # Generate workflow docs for each task
+    def _load_manifest(self) -> Dict[str, Any]:
+        manifest_path = self.dataset_dir / MANIFEST_FILENAME
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('docs_version') == DOCS_VERSION:
+                    return manifest
+            except (OSError, json.JSONDecodeError):
+                pass
+        return {"docs_version": DOCS_VERSION, "workflows": {}, "summary_hash": None}
+    
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        manifest_path = self.dataset_dir / MANIFEST_FILENAME
+        tmp_path = manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        tmp_path.replace(manifest_path)
+    
+    def _summary_from_manifest(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Dataset summary (same shape as DatasetBuilder's) built from manifest entries."""
+        apps: Dict[str, Dict[str, Any]] = {}
+        for key in sorted(manifest['workflows']):
+            workflow = manifest['workflows'][key]['summary']
+            app = apps.setdefault(workflow['app_name'], {"num_workflows": 0, "total_states": 0, "workflows": []})
+            app['num_workflows'] += 1
+            app['total_states'] += workflow['num_states']
+            app['workflows'].append({k: v for k, v in workflow.items() if k != 'app_name'})
+        return {
+            "total_workflows": sum(app['num_workflows'] for app in apps.values()),
+            "total_states_captured": sum(app['total_states'] for app in apps.values()),
+            "apps": apps,
+        }
+    
+    def _find_changed(self, manifest: Dict[str, Any], force: bool) -> Tuple[List[Path], List[str]]:
+        """Task dirs whose docs are out of date, and manifest keys of removed workflows."""
+        changed = []
+        present = set()
+        workflows = manifest['workflows']
         for app_dir in self.dataset_dir.iterdir():
-            if not app_dir.is_dir() or app_dir.name.startswith('.'):
+            if not app_dir.is_dir() or app_dir.name.startswith(('.', '_')):
                 continue
-            
             for task_dir in app_dir.iterdir():
-                if not task_dir.is_dir():
+                if not task_dir.is_dir() or not (task_dir / "metadata.json").exists():
                     continue
-                
-                metadata_path = task_dir / "metadata.json"
-                if metadata_path.exists():
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    self.generate_workflow_markdown(str(task_dir), metadata)
+                key = f"{app_dir.name}/{task_dir.name}"
+                present.add(key)
+                entry = workflows.get(key)
+                if force or entry is None or not (task_dir / "workflow.md").exists():
+                    changed.append(task_dir)
+                    continue
+                if tuple(entry.get('fingerprint', ())) == _workflow_fingerprint(task_dir):
+                    continue
+                # metadata.json was touched: only rebuild if its content actually changed
+                metadata_bytes = (task_dir / "metadata.json").read_bytes()
+                if _workflow_hash(task_dir, metadata_bytes, json.loads(metadata_bytes)) != entry['hash']:
+                    changed.append(task_dir)
+                else:
+                    entry['fingerprint'] = list(_workflow_fingerprint(task_dir))
+        removed = [key for key in workflows if key not in present]
+        return changed, removed
+    
+    def generate_all_docs(self, force: bool = False, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Bring all documentation up to date.
+        
+        Only workflows whose metadata or screenshots changed since the last
+        build are regenerated; the README is rewritten only if the summary changed.
         
-        # Generate main README
-        self.generate_dataset_readme()
+        Args:
+            force: Rebuild every workflow regardless of the manifest
+            max_workers: Worker processes for rebuilding (defaults to CPU count, max 8)
         
-        print("✓ Documentation generation complete")
+        Returns:
+            Counts of rebuilt, unchanged and removed workflows
+        """
+        print("\nGenerating documentation...")
+        
+        with _build_lock:
+            manifest = self._load_manifest()
+            changed, removed = self._find_changed(manifest, force)
+            
+            for key in removed:
+                del manifest['workflows'][key]
+            
+            dataset_dir = str(self.dataset_dir)
+            task_dirs = [str(d) for d in changed]
+            if len(task_dirs) >= PARALLEL_THRESHOLD:
+                workers = max_workers or min(8, os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context()) as executor:
+                    entries = list(executor.map(_build_workflow, [dataset_dir] * len(task_dirs), task_dirs, chunksize=8))
+            else:
+                entries = [_build_workflow(dataset_dir, d) for d in task_dirs]
+            
+            for task_dir, entry in zip(changed, entries):
+                manifest['workflows'][f"{task_dir.parent.name}/{task_dir.name}"] = entry
+            
+            # Update the README/summary only when the set of workflows or their stats changed
+            summary = self._summary_from_manifest(manifest)
+            summary_hash = hashlib.sha256(json.dumps(summary, sort_keys=True).encode()).hexdigest()
+            readme_exists = (self.dataset_dir / "README.md").exists()
+            if force or summary_hash != manifest.get('summary_hash') or not readme_exists:
+                summary_path = self.dataset_dir / "summary.json"
+                with open(summary_path, 'w') as f:
+                    json.dump({**summary, "generated_at": datetime.now().isoformat()}, f, indent=2)
+                self.generate_dataset_readme(summary)
+                manifest['summary_hash'] = summary_hash
+            
+            self._save_manifest(manifest)
+        
+        stats = {
+            "rebuilt": len(changed),
+            "unchanged": len(manifest['workflows']) - len(changed),
+            "removed": len(removed),
+        }
+        print(f"✓ Documentation up to date ({stats['rebuilt']} rebuilt, {stats['unchanged']} unchanged, {stats['removed']} removed)")
+        return stats
+
 
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build workflow docs and the dataset README")
+    parser.add_argument("--dataset", default="dataset", help="Dataset directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild every workflow")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+    
+    DocsGenerator(args.dataset).generate_all_docs(force=args.force, max_workers=args.workers)
@@ -0,0 +1,164 @@
+"""
+Bulk export of guides as a streamed ZIP archive.
+
+The archive is produced incrementally: each file is read and compressed
+in small chunks that are handed to the HTTP response as soon as they're
+written, so memory stays constant and nothing is staged on disk no matter
+how many guides are exported.
+"""
+import io
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from .blob_store import iter_task_dirs, workflow_screenshot_paths
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-compressed formats are stored as-is; deflating them only costs CPU
+STORED_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif", ".pdf"}
+
+
+def select_task_dirs(
+    base_dir: Path,
+    app_name: Optional[str] = None,
+    tasks: Optional[Sequence[str]] = None
+) -> List[Path]:
+    """
+    Resolve which workflows to export.
+
+    Args:
+        base_dir: Dataset directory
+        app_name: Only export this app's guides
+        tasks: Explicit "app/task" directory names (takes precedence over app_name)
+
+    Returns:
+        Task directories with a workflow, in a stable order
+    """
+    if tasks:
+        base = base_dir.resolve()
+        selected = []
+        for task in tasks:
+            app, _, task_name = task.strip("/").partition("/")
+            # Names come from the request: exactly app/task, never outside the dataset
+            if not task_name or "/" in task_name or "\\" in task or ".." in (app, task_name):
+                continue
+            task_dir = base_dir / app.lower() / task_name
+            try:
+                task_dir.resolve().relative_to(base)
+            except ValueError:
+                continue
+            if (task_dir / "metadata.json").exists() and task_dir not in selected:
+                selected.append(task_dir)
+        return selected
+
+    task_dirs = list(iter_task_dirs(base_dir))
+    if app_name:
+        task_dirs = [d for d in task_dirs if d.parent.name == app_name.lower()]
+    return task_dirs
+
+
+def export_files(task_dirs: Iterable[Path], base_dir: Path) -> Iterator[Path]:
+    """
+    Every file belonging to the given workflows, each yielded once.
+
+    Shared screenshots in the blob store are included once however many
+    guides reference them, at the same relative location so the markdown
+    links inside the archive keep working.
+    """
+    base = base_dir.resolve()
+    seen = set()
+    for task_dir in task_dirs:
+        candidates = [task_dir / "workflow.md", task_dir / "metadata.json"]
+        candidates += workflow_screenshot_paths(task_dir)
+        for path in candidates:
+            resolved = path.resolve()
+            if resolved in seen or not resolved.is_file():
+                continue
+            try:
+                resolved.relative_to(base)
+            except ValueError:
+                continue
+            seen.add(resolved)
+            yield resolved
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that ZipFile writes into and the response drains."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_stream(task_dirs: Sequence[Path], base_dir: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of the workflows chunk by chunk.
+
+    Blocking; meant to be iterated from a worker thread (StreamingResponse
+    does this for plain iterators).
+
+    Args:
+        task_dirs: Workflows to include
+        base_dir: Dataset directory; archive paths are relative to it
+        chunk_size: Read size per file chunk
+    """
+    base = base_dir.resolve()
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in export_files(task_dirs, base_dir):
+            stat = path.stat()
+            info = zipfile.ZipInfo.from_file(path, arcname=path.relative_to(base).as_posix())
+            info.file_size = stat.st_size
+            if path.suffix.lower() in STORED_SUFFIXES:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(path, 'rb') as source, archive.open(info, mode="w") as target:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory, written when the archive closes
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def export_filename(app_name: Optional[str], tasks: Optional[Sequence[str]], extension: str) -> str:
+    """Download filename for an export."""
+    if tasks and len(tasks) == 1:
+        stem = tasks[0].strip("/").replace("/", "_")
+    elif app_name:
+        stem = app_name.lower()
+    elif tasks:
+        stem = "selected"
+    else:
+        stem = "all"
+    return f"{stem}_guides.{extension}".replace(" ", "_")
@@ -0,0 +1,111 @@
+"""
+Lookup of previously generated guides so repeated questions skip the agent run.
+"""
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+# Words that don't change which task is meant ("create a project" == "create project")
+STOPWORDS = {"a", "an", "the", "my", "new", "some"}
+
+
+def task_slug(task: str) -> str:
+    """Directory name used for a task inside dataset/{app}/."""
+    return re.sub(r'[^a-z0-9]+', '_', task.lower()).strip('_') or "task"
+
+
+def normalize_task(task: str) -> str:
+    """Normalize a task phrase or task directory name into a comparison key."""
+    words = re.split(r'[^a-z0-9]+', task.lower())
+    return " ".join(w for w in words if w and w not in STOPWORDS)
+
+
+class GuideCache:
+    """Finds fresh guides in the dataset for an (app, task) pair."""
+
+    def __init__(self, base_dir: str = "dataset", ttl_seconds: float = 7 * 24 * 3600):
+        """
+        Initialize the guide cache.
+
+        Args:
+            base_dir: Base dataset directory
+            ttl_seconds: Maximum age of a guide that may be reused (0 disables reuse)
+        """
+        self.base_dir = Path(base_dir)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, app_name: str, task: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a fresh guide for the task.
+
+        Args:
+            app_name: Application name
+            task: Task phrase as parsed from the question
+
+        Returns:
+            generate_guide-style result dict, or None if no fresh guide exists
+        """
+        task_dir = self._find_task_dir(app_name, task)
+        metadata = self._load_metadata(task_dir) if task_dir else None
+        if metadata is None or not self._is_fresh(task_dir, metadata):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return {
+            "success": True,
+            "cached": True,
+            "dataset_path": str(task_dir),
+            "app_name": app_name,
+            "task": metadata.get("task_query", task),
+            "num_steps": metadata.get("num_states", 0),
+            "generated_at": metadata.get("timestamp"),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _find_task_dir(self, app_name: str, task: str) -> Optional[Path]:
+        app_dir = self.base_dir / app_name.lower()
+        exact = app_dir / task_slug(task)
+        if (exact / "workflow.md").exists():
+            return exact
+        if not app_dir.is_dir():
+            return None
+
+        key = normalize_task(task)
+        for task_dir in app_dir.iterdir():
+            if task_dir.is_dir() and normalize_task(task_dir.name) == key and (task_dir / "workflow.md").exists():
+                return task_dir
+        return None
+
+    @staticmethod
+    def _load_metadata(task_dir: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(task_dir / "metadata.json", 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, task_dir: Path, metadata: Dict[str, Any]) -> bool:
+        if self.ttl_seconds <= 0:
+            return False
+        try:
+            generated_at = datetime.fromisoformat(metadata.get("timestamp")).timestamp()
+        except (ValueError, TypeError):
+            generated_at = (task_dir / "workflow.md").stat().st_mtime
+        return time.time() - generated_at <= self.ttl_seconds
@@ -0,0 +1,322 @@
+"""
+PDF export of workflow guides, rendered in a worker pool and cached.
+
+Rendering (markdown conversion, image downscaling and WeasyPrint layout)
+takes seconds, so it runs in worker processes. Finished PDFs are cached
+under dataset/_exports keyed by a hash of the guide's markdown and images,
+so repeat downloads are served straight from disk until the guide changes.
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from PIL import Image
+
+from ..capture.processing import worker_context
+from ..metrics import metrics
+
+
+# Bump when the HTML/CSS or image handling changes so cached PDFs are re-rendered
+RENDER_VERSION = "1"
+
+# A4 text width (17cm) at ~180 DPI; plenty for print, a fraction of a 3360px capture
+PRINT_IMAGE_WIDTH = 1200
+PRINT_IMAGE_QUALITY = 80
+
+PDF_STYLESHEET = """
+@page {
+    size: A4;
+    margin: 2cm;
+}
+body {
+    font-family: 'Arial', sans-serif;
+    line-height: 1.6;
+    color: #333;
+    max-width: 100%;
+}
+h1 {
+    color: #ea580c;
+    border-bottom: 3px solid #ea580c;
+    padding-bottom: 10px;
+    margin-top: 0;
+}
+h2 {
+    color: #ea580c;
+    margin-top: 30px;
+    border-bottom: 1px solid #ddd;
+    padding-bottom: 5px;
+}
+h3 {
+    color: #f97316;
+    margin-top: 20px;
+}
+img {
+    max-width: 100%;
+    height: auto;
+    margin: 15px 0;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    page-break-inside: avoid;
+}
+hr {
+    border: none;
+    border-top: 1px solid #ddd;
+    margin: 20px 0;
+}
+strong {
+    color: #ea580c;
+}
+em {
+    color: #666;
+    font-size: 0.9em;
+}
+p {
+    margin: 10px 0;
+}
+ul {
+    margin: 10px 0;
+    padding-left: 30px;
+}
+.guide + .guide {
+    page-break-before: always;
+}
+"""
+
+_IMAGE_LINK = re.compile(r'!\[[^\]]*\]\(([^)\s]+)\)')
+_IMG_SRC = re.compile(r'(<img\b[^>]*?\bsrc=")([^"]+)(")')
+
+
+def workflow_images(workflow_path: Path, markdown_text: str) -> List[Path]:
+    """Local image files referenced by a workflow's markdown."""
+    images = []
+    for link in _IMAGE_LINK.findall(markdown_text):
+        if "://" in link:
+            continue
+        path = Path(os.path.normpath(workflow_path.parent / link))
+        if path not in images:
+            images.append(path)
+    return images
+
+
+def workflows_content_hash(workflow_paths: Sequence[Path], max_image_width: int = PRINT_IMAGE_WIDTH) -> str:
+    """
+    Hash identifying the rendered PDF for a set of workflows.
+
+    Covers each workflow.md's bytes and every referenced image's identity
+    (blob name, or size and modification time for legacy screenshots), so
+    editing the markdown or replacing an image invalidates the PDF.
+    """
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{max_image_width}".encode())
+    for workflow_path in workflow_paths:
+        data = workflow_path.read_bytes()
+        digest.update(str(workflow_path).encode() + b"\0" + data)
+        for image in workflow_images(workflow_path, data.decode('utf-8')):
+            try:
+                stat = image.stat()
+            except FileNotFoundError:
+                digest.update(f"{image}:missing".encode())
+                continue
+            digest.update(f"{image}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def print_image_data_uri(path: Path, max_width: int, quality: int) -> Optional[str]:
+    """Downscale an image for print and return it as an inline JPEG data URI."""
+    try:
+        with Image.open(path) as image:
+            if image.width > max_width:
+                height = max(1, round(image.height * max_width / image.width))
+                image.draft('RGB', (max_width, height))
+                image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=quality, optimize=True)
+    except (FileNotFoundError, OSError):
+        return None
+    return "data:image/jpeg;base64," + base64.b64encode(output.getvalue()).decode('ascii')
+
+
+def workflow_html(workflow_path: Path, max_image_width: int, quality: int) -> str:
+    """Render one workflow.md to HTML with print-sized images inlined."""
+    import markdown
+
+    md_content = workflow_path.read_text(encoding='utf-8')
+    html_content = markdown.markdown(md_content, extensions=['extra', 'codehilite'])
+
+    def replace_image(match):
+        src = match.group(2)
+        if "://" in src or src.startswith("data:"):
+            return match.group(0)
+        data_uri = print_image_data_uri(
+            Path(os.path.normpath(workflow_path.parent / src)), max_image_width, quality
+        )
+        return f"{match.group(1)}{data_uri or src}{match.group(3)}"
+
+    return _IMG_SRC.sub(replace_image, html_content)
+
+
+def render_pdf(
+    workflow_paths: Sequence[str],
+    output_path: str,
+    max_image_width: int = PRINT_IMAGE_WIDTH,
+    quality: int = PRINT_IMAGE_QUALITY
+) -> int:
+    """
+    Render one or more workflows into a single PDF file.
+
+    Runs in a worker process. The PDF is written to a temporary file next
+    to output_path and moved into place, so readers never see a partial file.
+
+    Returns:
+        Size of the written PDF in bytes
+    """
+    from weasyprint import HTML
+
+    sections = "\n".join(
+        f'<section class="guide">{workflow_html(Path(p), max_image_width, quality)}</section>'
+        for p in workflow_paths
+    )
+    styled_html = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>{PDF_STYLESHEET}</style>
+</head>
+<body>
+{sections}
+</body>
+</html>"""
+
+    pdf_bytes = HTML(string=styled_html, base_url=str(Path(workflow_paths[0]).parent)).write_pdf()
+
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=output.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_name, output)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return len(pdf_bytes)
+
+
+class PdfExporter:
+    """
+    Renders workflow PDFs in a process pool and caches them on disk.
+
+    Concurrent downloads of the same guide share one render; the cache
+    keeps the most recently used max_entries PDFs.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "dataset/_exports",
+        max_workers: Optional[int] = None,
+        max_entries: int = 200,
+        max_image_width: int = PRINT_IMAGE_WIDTH,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            cache_dir: Directory holding rendered PDFs
+            max_workers: Render processes (defaults to min(2, CPU count))
+            max_entries: Number of cached PDFs kept before the least recently used are deleted
+            max_image_width: Width screenshots are downscaled to for print
+            executor: Existing pool to render in instead of creating one
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or min(2, os.cpu_count() or 1)
+        self.max_entries = max_entries
+        self.max_image_width = max_image_width
+        self._executor = executor
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.renders = 0
+
+    @property
+    def executor(self) -> Executor:
+        """The render pool, created on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+        return self._executor
+
+    async def get_pdf(self, workflow_paths: Sequence[Path]) -> Path:
+        """
+        Return a cached PDF for the workflows, rendering it if needed.
+
+        Args:
+            workflow_paths: workflow.md files, in the order they appear in the PDF
+
+        Returns:
+            Path of the PDF in the cache directory
+        """
+        content_hash = await asyncio.to_thread(
+            workflows_content_hash, workflow_paths, self.max_image_width
+        )
+        pdf_path = self.cache_dir / f"{content_hash}.pdf"
+        try:
+            # Pruning keeps the most recently used PDFs, not the most recently rendered
+            os.utime(pdf_path)
+            self.hits += 1
+            return pdf_path
+        except FileNotFoundError:
+            pass
+
+        if content_hash in self._in_flight:
+            return await asyncio.shield(self._in_flight[content_hash])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[content_hash] = future
+        started = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                render_pdf,
+                [str(p) for p in workflow_paths],
+                str(pdf_path),
+                self.max_image_width
+            )
+            self.renders += 1
+            metrics.observe_stage("pdf", time.perf_counter() - started)
+            await asyncio.to_thread(self._prune)
+            future.set_result(pdf_path)
+            return pdf_path
+        except BaseException as e:
+            # Cancellation too: concurrent downloads are waiting on this future
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited isn't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[content_hash]
+
+    def _prune(self):
+        pdfs = sorted(self.cache_dir.glob("*.pdf"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in pdfs[self.max_entries:]:
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "renders": self.renders, "in_flight": len(self._in_flight)}
+
+    def shutdown(self):
+        """Stop the render pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
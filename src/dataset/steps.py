@@ -0,0 +1,374 @@
+"""
+Compact, typed per-step records for metadata.json.
+
+Browser Use history items are turned into StepRecords once, when a guide
+is saved: URL, page title, what kind of action was taken, which element it
+targeted and whether it succeeded. Older datasets stored the full Python
+reprs of the history objects; migrate them with
+
+    python -m src.dataset.steps --migrate [--dry-run] [--workers N]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..capture.processing import worker_context
+from .blob_store import iter_task_dirs
+
+
+STEP_SCHEMA_VERSION = 2
+
+
+class StepTarget(BaseModel):
+    """The element an action was performed on."""
+    label: Optional[str] = None
+    role: Optional[str] = None
+    tag: Optional[str] = None
+    # [x, y, width, height] in CSS pixels
+    bounds: Optional[List[float]] = None
+
+
+class StepRecord(BaseModel):
+    """One captured step of a workflow."""
+    step: int
+    screenshot: str = ""
+    screenshot_sha256: Optional[str] = None
+    url: Optional[str] = None
+    title: Optional[str] = None
+    # navigate, click, type, keys, scroll, wait, search, done or other
+    action: str = "other"
+    target: Optional[StepTarget] = None
+    # [x, y] of the click/input in CSS pixels
+    click: Optional[List[float]] = None
+    text: Optional[str] = None
+    success: Optional[bool] = None
+    summary: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        """Dict for metadata.json, without empty fields."""
+        return self.model_dump(exclude_none=True)
+
+
+def write_metadata(path: Path, metadata: Dict[str, Any]):
+    """Write metadata.json compactly and atomically."""
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, separators=(',', ':'), ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+_CLICKED = re.compile(r'^Clicked (?P<tag>[\w-]+)(?P<rest>.*)$', re.S)
+_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_ATTRIBUTE = re.compile(r'\b(role|aria-label|id|name|placeholder)=(.+?)(?=\s+[\w-]+=|$)', re.S)
+_TYPED = re.compile(r"^(?:Typed|Input|Filled(?: in)?) '(?P<text>.*)'", re.S)
+_NAVIGATED = re.compile(r'Navigated to (?P<url>\S+)')
+_SEARCHED = re.compile(r'Searched for "(?P<text>[^"]*)"')
+_SENT_KEYS = re.compile(r'^Sent keys: (?P<text>.+)$', re.S)
+
+
+def classify_action(content: str) -> Tuple[str, Optional[StepTarget], Optional[str]]:
+    """
+    Derive (action type, target, text) from an ActionResult's extracted_content.
+
+    Args:
+        content: Browser Use's one-line action summary, e.g. 'Clicked a role=link "Settings"'
+
+    Returns:
+        Action type, the target element (clicks only) and typed/searched text
+    """
+    content = content.strip()
+    plain = content.lstrip("🔗🔍⌨️🖱️ ").strip()
+
+    match = _CLICKED.match(plain)
+    if match:
+        rest = match.group('rest')
+        quoted = _QUOTED.search(rest)
+        attributes = {key: value.strip() for key, value in _ATTRIBUTE.findall(_QUOTED.sub(" ", rest))}
+        label = quoted.group(1) if quoted else attributes.get('aria-label') or attributes.get('name')
+        if label:
+            # Keyboard-shortcut hints follow the visible label on new lines
+            label = label.replace('\\n', '\n').split('\n')[0].strip() or None
+        return "click", StepTarget(label=label, role=attributes.get('role'), tag=match.group('tag')), None
+
+    match = _TYPED.match(plain)
+    if match:
+        return "type", None, match.group('text')
+    match = _NAVIGATED.search(plain)
+    if match:
+        return "navigate", None, match.group('url')
+    match = _SEARCHED.search(plain)
+    if match:
+        return "search", None, match.group('text')
+    match = _SENT_KEYS.match(plain)
+    if match:
+        return "keys", None, match.group('text').strip()
+    if plain.startswith("Scrolled"):
+        return "scroll", None, None
+    if plain.startswith("Waited"):
+        return "wait", None, None
+    return "other", None, None
+
+
+def build_step(
+    step: int,
+    results: List[Dict[str, Any]],
+    url: Optional[str] = None,
+    title: Optional[str] = None,
+    element: Optional[Dict[str, Any]] = None,
+    screenshot: str = "",
+    screenshot_sha256: Optional[str] = None
+) -> StepRecord:
+    """
+    Build a StepRecord from plain action results and page state.
+
+    Args:
+        step: 1-based step number
+        results: The step's ActionResults as dicts (extracted_content, metadata,
+            is_done, success, error)
+        url: Page URL at this step
+        title: Page title at this step
+        element: Interacted element (attributes, node_name, bounds)
+        screenshot: Link to the step's screenshot
+        screenshot_sha256: Hash of the screenshot blob
+    """
+    record = StepRecord(
+        step=step,
+        screenshot=screenshot,
+        screenshot_sha256=screenshot_sha256,
+        url=url or None,
+        title=title or None
+    )
+
+    # The last action that didn't fail describes the step; earlier failures are
+    # only kept as the error when nothing succeeded
+    summaries = []
+    primary = None
+    for result in results:
+        content = (result.get('extracted_content') or "").strip()
+        if result.get('error'):
+            record.error = str(result['error'])[:500]
+            continue
+        if content:
+            summaries.append(content)
+        primary = result
+
+    if primary is not None:
+        record.error = None
+        content = (primary.get('extracted_content') or "").strip()
+        if primary.get('is_done'):
+            record.action = "done"
+        else:
+            record.action, record.target, record.text = classify_action(content)
+        if record.action == "type":
+            typed = [classify_action(s)[2] for s in summaries if classify_action(s)[0] == "type"]
+            record.text = " / ".join(t for t in typed if t) or record.text
+        record.success = primary.get('success')
+        metadata = primary.get('metadata') or {}
+        x = metadata.get('click_x', metadata.get('input_x'))
+        y = metadata.get('click_y', metadata.get('input_y'))
+        if x is not None and y is not None:
+            record.click = [round(float(x), 1), round(float(y), 1)]
+        summary = primary.get('long_term_memory') if not content else content
+        record.summary = " ".join(summary.lstrip("🔗🔍 ").split()) if summary else None
+
+    if element:
+        attributes = element.get('attributes') or {}
+        target = record.target or StepTarget()
+        target.role = target.role or attributes.get('role')
+        target.label = target.label or attributes.get('aria-label') or attributes.get('title') or attributes.get('placeholder')
+        target.tag = target.tag or (element.get('node_name') or "").lower() or None
+        bounds = element.get('bounds')
+        if bounds:
+            target.bounds = [round(float(v), 1) for v in bounds]
+        if any(v is not None for v in (target.label, target.role, target.tag, target.bounds)):
+            record.target = target
+
+    return record
+
+
+def _element_from_history(state: Any) -> Optional[Dict[str, Any]]:
+    elements = getattr(state, 'interacted_element', None) or []
+    element = next((e for e in elements if e is not None), None)
+    if element is None:
+        return None
+    bounds = getattr(element, 'bounds', None)
+    return {
+        'attributes': getattr(element, 'attributes', None) or {},
+        'node_name': getattr(element, 'node_name', None),
+        'bounds': [bounds.x, bounds.y, bounds.width, bounds.height] if bounds is not None else None,
+    }
+
+
+def step_from_history(step: int, item: Any, screenshot: str = "", screenshot_sha256: Optional[str] = None) -> StepRecord:
+    """Build a StepRecord from a Browser Use AgentHistory item."""
+    state = getattr(item, 'state', None)
+    results = item.result if isinstance(getattr(item, 'result', None), list) else [getattr(item, 'result', None)]
+    result_dicts = [
+        {
+            'extracted_content': getattr(r, 'extracted_content', None),
+            'long_term_memory': getattr(r, 'long_term_memory', None),
+            'metadata': getattr(r, 'metadata', None),
+            'is_done': getattr(r, 'is_done', False),
+            'success': getattr(r, 'success', None),
+            'error': getattr(r, 'error', None),
+        }
+        for r in results if r is not None
+    ]
+    return build_step(
+        step,
+        result_dicts,
+        url=getattr(state, 'url', None),
+        title=getattr(state, 'title', None),
+        element=_element_from_history(state) if state is not None else None,
+        screenshot=screenshot,
+        screenshot_sha256=screenshot_sha256
+    )
+
+
+# Parsing of the legacy repr strings (migration only)
+
+_REPR_STRING = r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|None)"
+_REPR_FIELDS = {
+    name: re.compile(rf"\b{name}={_REPR_STRING}")
+    for name in ('extracted_content', 'long_term_memory', 'error', 'url', 'title')
+}
+_REPR_BOOL = {name: re.compile(rf"\b{name}=(True|False|None)") for name in ('is_done', 'success')}
+_REPR_DICT = re.compile(r"\bmetadata=(\{[^{}]*\}|None)")
+_REPR_BOUNDS = re.compile(r"bounds=DOMRect\(x=([-\d.]+), y=([-\d.]+), width=([-\d.]+), height=([-\d.]+)\)")
+_REPR_ATTRIBUTES = re.compile(r"attributes=(\{(?:[^{}'\"]|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")*\})")
+_REPR_NODE_NAME = re.compile(r"node_name='([^']*)'")
+
+
+def _literal(text: Optional[str]) -> Any:
+    if text is None:
+        return None
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _first(pattern: re.Pattern, text: str) -> Any:
+    match = pattern.search(text)
+    return _literal(match.group(1)) if match else None
+
+
+def step_from_legacy(state: Dict[str, Any]) -> StepRecord:
+    """Convert a repr-based state (description/action_taken strings) to a StepRecord."""
+    description = state.get('description') or ""
+    action_taken = state.get('action_taken') or ""
+
+    results = []
+    for chunk in action_taken.split("ActionResult(")[1:]:
+        results.append({
+            **{name: _first(pattern, chunk) for name, pattern in _REPR_FIELDS.items()},
+            **{name: _first(pattern, chunk) for name, pattern in _REPR_BOOL.items()},
+            'metadata': _first(_REPR_DICT, chunk),
+        })
+    if not results and action_taken and "(" not in action_taken:
+        # Plain-text action from the custom capture path
+        results.append({'extracted_content': action_taken})
+
+    element = None
+    bounds = _REPR_BOUNDS.search(description)
+    attributes = _first(_REPR_ATTRIBUTES, description)
+    if bounds or attributes:
+        node_name = _REPR_NODE_NAME.search(description)
+        element = {
+            'attributes': attributes if isinstance(attributes, dict) else {},
+            'node_name': node_name.group(1) if node_name else None,
+            'bounds': [float(v) for v in bounds.groups()] if bounds else None,
+        }
+
+    return build_step(
+        state.get('step', 0),
+        results,
+        url=_first(_REPR_FIELDS['url'], description),
+        title=_first(_REPR_FIELDS['title'], description),
+        element=element,
+        screenshot=state.get('screenshot', ""),
+        screenshot_sha256=state.get('screenshot_sha256')
+    )
+
+
+def load_step_records(metadata: Dict[str, Any]) -> List[StepRecord]:
+    """A workflow's steps as StepRecords, whichever schema its metadata.json uses."""
+    records = []
+    for state in metadata.get('states', []):
+        if 'action' in state:
+            records.append(StepRecord.model_validate(state))
+        else:
+            records.append(step_from_legacy(state))
+    return records
+
+
+def migrate_metadata_file(path: str, dry_run: bool = False) -> Tuple[str, int, int]:
+    """
+    Rewrite one metadata.json with StepRecords (runs in a worker process).
+
+    Returns:
+        (path, size before, size after); sizes are equal if nothing changed
+    """
+    metadata_path = Path(path)
+    before = metadata_path.stat().st_size
+    with open(metadata_path, 'r') as f:
+        metadata = json.load(f)
+
+    if metadata.get('schema_version', 1) >= STEP_SCHEMA_VERSION:
+        return path, before, before
+
+    metadata['states'] = [step_from_legacy(state).to_json() for state in metadata.get('states', [])]
+    metadata['schema_version'] = STEP_SCHEMA_VERSION
+    after = len(json.dumps(metadata, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    if not dry_run:
+        write_metadata(metadata_path, metadata)
+    return path, before, after
+
+
+def migrate_dataset(base_dir: str = "dataset", workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Migrate every workflow's metadata.json in parallel."""
+    paths = [str(task_dir / "metadata.json") for task_dir in iter_task_dirs(Path(base_dir))]
+    report = {"workflows": len(paths), "migrated": 0, "bytes_before": 0, "bytes_after": 0, "dry_run": dry_run}
+    if not paths:
+        return report
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context()) as executor:
+        for _, before, after in executor.map(migrate_metadata_file, paths, [dry_run] * len(paths), chunksize=16):
+            report["bytes_before"] += before
+            report["bytes_after"] += after
+            if after != before:
+                report["migrated"] += 1
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert metadata.json steps to the compact schema")
+    parser.add_argument("--dataset", default="dataset", help="Dataset directory")
+    parser.add_argument("--migrate", action="store_true", help="Rewrite legacy metadata.json files")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the size change")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    if not args.migrate:
+        parser.print_help()
+        return
+
+    report = migrate_dataset(args.dataset, workers=args.workers, dry_run=args.dry_run)
+    kb = lambda n: f"{n / 1024:.1f} KB"
+    print("\n🗂️  Step schema migration" + (" (dry run)" if report["dry_run"] else ""))
+    print(f"  - {report['migrated']} of {report['workflows']} workflows migrated")
+    print(f"  - Before: {kb(report['bytes_before'])}")
+    print(f"  - After:  {kb(report['bytes_after'])}")
+
+
+if __name__ == "__main__":
+    main()
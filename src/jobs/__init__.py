@@ -0,0 +1,3 @@
+from .queue import Job, JobQueue, JobStatus, QueueFullError
+
+__all__ = ['Job', 'JobQueue', 'JobStatus', 'QueueFullError']
@@ -0,0 +1,214 @@
+"""
+Asynchronous job queue with a bounded worker pool for guide generation.
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class JobStatus:
+    """Lifecycle states of a queued job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    FINISHED = (COMPLETED, FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A single guide-generation request tracked by the queue."""
+
+    def __init__(self, question: str, options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize a job.
+
+        Args:
+            question: The user's natural language question
+            options: Extra per-job options passed through to the runner
+        """
+        self.id = uuid.uuid4().hex
+        self.question = question
+        self.options = options or {}
+        self.status = JobStatus.QUEUED
+        self.stage = "queued"
+        self.message = "Waiting for a free worker..."
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job's status (without the full result)."""
+        return {
+            "job_id": self.id,
+            "question": self.question,
+            "status": self.status,
+            "stage": self.stage,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+JobRunner = Callable[[Job], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """Runs submitted jobs on a fixed number of asyncio workers."""
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        num_workers: int = 1,
+        max_queue_size: int = 100,
+        max_history: int = 500
+    ):
+        """
+        Initialize the job queue.
+
+        Args:
+            runner: Coroutine function that executes a job and returns its result
+            num_workers: Number of jobs allowed to run concurrently
+            max_queue_size: Maximum number of jobs waiting for a worker
+            max_history: Number of finished jobs kept for status/result lookups
+        """
+        self.runner = runner
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max_queue_size
+        self.max_history = max_history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Spawn the worker tasks. Must be called from a running event loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"guide-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+
+    async def stop(self):
+        """Cancel the workers. Running jobs are interrupted."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, question: str, options: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Enqueue a new job.
+
+        Args:
+            question: The user's natural language question
+            options: Extra per-job options passed through to the runner
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If max_queue_size jobs are already waiting
+        """
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() must be called before submitting jobs")
+
+        job = Job(question, options)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Job queue is full ({self.max_queue_size} jobs waiting), try again later"
+            )
+
+        self.jobs[job.id] = job
+        self._prune_history()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """
+        List jobs, newest first.
+
+        Args:
+            status: Only include jobs in this state
+            limit: Maximum number of jobs returned
+        """
+        jobs = [job for job in reversed(self.jobs.values()) if status is None or job.status == status]
+        return jobs[:limit]
+
+    def position(self, job: Job) -> int:
+        """Return the number of queued jobs ahead of this one (0 once it is running)."""
+        if job.status != JobStatus.QUEUED:
+            return 0
+        ahead = 0
+        for other in self.jobs.values():
+            if other is job:
+                break
+            if other.status == JobStatus.QUEUED:
+                ahead += 1
+        return ahead
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and worker utilisation."""
+        counts = {status: 0 for status in (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.COMPLETED, JobStatus.FAILED)}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": self.num_workers,
+            "max_queue_size": self.max_queue_size,
+            "jobs": counts,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.stage = "starting"
+            job.message = "Job started"
+            job.started_at = datetime.now()
+            try:
+                job.result = await self.runner(job)
+                job.status = JobStatus.COMPLETED
+                job.message = "Job completed"
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+                job.message = f"Job failed: {e}"
+            finally:
+                job.finished_at = datetime.now()
+                self._queue.task_done()
+
+    def _prune_history(self):
+        """Drop the oldest finished jobs once more than max_history are tracked."""
+        excess = len(self.jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in list(self.jobs.keys()):
+            if excess <= 0:
+                break
+            if self.jobs[job_id].status in JobStatus.FINISHED:
+                del self.jobs[job_id]
+                excess -= 1
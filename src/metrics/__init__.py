@@ -0,0 +1,4 @@
+from .registry import Histogram, MetricsRegistry, metrics
+from .timing import RunTimer
+
+__all__ = ['Histogram', 'MetricsRegistry', 'RunTimer', 'metrics']
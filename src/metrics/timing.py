@@ -0,0 +1,82 @@
+"""
+Timing spans for a single guide-generation run.
+
+A RunTimer records named spans ("parse", "capture.screenshot", ...) with
+their offset from the start of the run, and feeds every span into the
+process-wide stage histograms so /metrics covers all runs.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .registry import MetricsRegistry, metrics
+
+
+class RunTimer:
+    """Collects the timing spans of one run."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the timer; the run starts now.
+
+        Args:
+            registry: Where spans are also observed (defaults to the shared registry)
+        """
+        self.registry = registry or metrics
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        # save_to_dataset records spans from a worker thread
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, duration: float, step: Optional[int] = None):
+        """
+        Record a span measured elsewhere.
+
+        Args:
+            name: Stage name, dotted for sub-stages ("capture.hash")
+            start: perf_counter() value when the span began
+            duration: Seconds
+            step: Agent step the span belongs to, if any
+        """
+        span = {
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 1),
+            "duration_ms": round(duration * 1000, 1),
+        }
+        if step is not None:
+            span["step"] = step
+        with self._lock:
+            self.spans.append(span)
+        self.registry.observe_stage(name, duration)
+
+    @contextmanager
+    def span(self, name: str, step: Optional[int] = None) -> Iterator[None]:
+        """Time the enclosed block (sync or async code) as a span."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, step)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, total and max, in milliseconds."""
+        stages: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(span["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stage["count"] += 1
+            stage["total_ms"] = round(stage["total_ms"] + span["duration_ms"], 1)
+            stage["max_ms"] = max(stage["max_ms"], span["duration_ms"])
+        return stages
+
+    def to_json(self) -> Dict[str, Any]:
+        """Elapsed time, per-stage summary and every span, for results and metadata.json."""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages": self.summary(),
+            "spans": spans,
+        }
@@ -0,0 +1,4 @@
+from .cache import ParseCache, normalize_question
+from .rules import RuleBasedParser
+
+__all__ = ['ParseCache', 'RuleBasedParser', 'normalize_question']
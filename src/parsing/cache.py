@@ -0,0 +1,148 @@
+"""
+LRU + TTL cache for parsed questions, persisted to disk between restarts.
+"""
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize question text into a cache key.
+
+    Case, repeated whitespace and trailing punctuation don't change what a
+    question is asking, so "How do I create a project in Linear?" and
+    "how do i create a project in linear" share a key.
+    """
+    text = re.sub(r'\s+', ' ', question.strip().lower())
+    return text.rstrip(' ?!.')
+
+
+class ParseCache:
+    """Caches parse_question results keyed on the normalized question."""
+
+    def __init__(
+        self,
+        cache_file: Optional[str] = "config/parse_cache.json",
+        max_entries: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Initialize the parse cache.
+
+        Args:
+            cache_file: JSON file used to persist entries (None keeps it in memory)
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl_seconds: Age after which an entry is treated as missing
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._load()
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parse for a question, or None if missing/expired."""
+        key = normalize_question(question)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(entry['value'])
+
+    def put(self, question: str, value: Dict[str, Any]):
+        """Store a parse result and persist the cache."""
+        key = normalize_question(question)
+        self._entries[key] = {'value': dict(value), 'created_at': time.time()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._save()
+
+    async def get_or_parse(
+        self,
+        question: str,
+        parse: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached parse, or run `parse` and cache its result.
+
+        Concurrent callers asking the same question share a single parse.
+        """
+        cached = self.get(question)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        key = normalize_question(question)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return dict(await asyncio.shield(pending))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await parse(question)
+            self.put(question, value)
+            future.set_result(value)
+            return dict(value)
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def clear(self):
+        """Drop all entries and delete the persisted file."""
+        self._entries.clear()
+        if self.cache_file and self.cache_file.exists():
+            self.cache_file.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit-rate statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return bool(self.ttl_seconds) and time.time() - entry['created_at'] > self.ttl_seconds
+
+    def _load(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Entries are stored oldest-used first, so insertion order restores LRU order
+        for key, entry in data.items():
+            if isinstance(entry, dict) and 'value' in entry and not self._expired(entry):
+                self._entries[key] = entry
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        tmp_file.replace(self.cache_file)
@@ -0,0 +1,220 @@
+"""
+Local rule-based question parser built from config/apps.yaml and the URL cache.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import yaml
+
+
+# Lead-in phrases that precede the task in how-to questions
+LEAD_IN_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:(?:can|could|would)\s+you\s+)?(?:show\s+me\s+|tell\s+me\s+|explain\s+)?"
+    r"(?:how\s+(?:do|can|would|should|could)\s+(?:i|you|we|one)\s+"
+    r"|how\s+to\s+"
+    r"|how\s+does\s+one\s+"
+    r"|what(?:'s|\s+is)\s+the\s+(?:best\s+)?way\s+to\s+"
+    r"|i\s+(?:want|need|would\s+like)\s+to\s+"
+    r"|help\s+me\s+)",
+    re.IGNORECASE
+)
+
+# Words that introduce the app when they directly precede its name
+APP_PREPOSITIONS = ("in", "on", "with", "using", "inside", "within", "via", "from", "to", "at")
+
+TRAILING_NOISE = re.compile(r"[\s?!.,;:]+$")
+
+
+class RuleBasedParser:
+    """
+    Resolves app, task, URL and auth flag without an LLM call.
+
+    The app is found through an alias index built from apps.yaml (keys,
+    display names, base URL domains and optional `aliases` lists) plus the
+    apps discovered earlier in url_cache.json. Results carry a confidence
+    score so callers can fall back to the LLM when the rules are unsure.
+    """
+
+    def __init__(
+        self,
+        apps_file: str = "config/apps.yaml",
+        url_cache_file: str = "config/url_cache.json"
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            apps_file: Path to the apps configuration
+            url_cache_file: Path to the cache of LLM-discovered app URLs
+        """
+        self.apps_file = Path(apps_file)
+        self.url_cache_file = Path(url_cache_file)
+        self.apps: Dict[str, Dict[str, Any]] = {}
+        self._alias_patterns: List[Tuple[re.Pattern, str]] = []
+        self._mtimes: Tuple[float, float] = (-1.0, -1.0)
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the alias index if either config file changed on disk."""
+        mtimes = (self._mtime(self.apps_file), self._mtime(self.url_cache_file))
+        if mtimes == self._mtimes:
+            return
+        self._mtimes = mtimes
+
+        apps: Dict[str, Dict[str, Any]] = {}
+
+        if self.url_cache_file.exists():
+            try:
+                with open(self.url_cache_file, 'r') as f:
+                    for key, entry in (json.load(f) or {}).items():
+                        apps[key.lower()] = {
+                            'url': entry.get('url'),
+                            'requires_auth': entry.get('requires_auth', True),
+                            'aliases': set(),
+                        }
+            except (OSError, ValueError):
+                pass
+
+        # apps.yaml is curated, so it wins over discovered URLs
+        if self.apps_file.exists():
+            with open(self.apps_file, 'r') as f:
+                for key, config in (yaml.safe_load(f) or {}).items():
+                    if not isinstance(config, dict):
+                        continue
+                    entry = apps.setdefault(key.lower(), {'aliases': set()})
+                    entry['url'] = config.get('base_url', entry.get('url'))
+                    entry['requires_auth'] = config.get('requires_auth', entry.get('requires_auth', True))
+                    if config.get('name'):
+                        name = str(config['name']).lower()
+                        entry['aliases'].update({name, name.replace(' ', '')})
+                    entry['aliases'].update(str(a).lower() for a in config.get('aliases', []) or [])
+
+        aliases: Dict[str, str] = {}
+        for key, entry in apps.items():
+            entry['aliases'].add(key)
+            domain_label = self._domain_label(entry.get('url'))
+            if domain_label:
+                entry['aliases'].add(domain_label)
+            # Full hosts are longer, so "notion.so" is cut out whole rather than leaving ".so" in the task
+            entry['aliases'].update(self._host_aliases(entry.get('url')))
+            for alias in entry['aliases']:
+                # An alias claimed by two apps can't identify either of them
+                aliases[alias] = key if aliases.get(alias, key) == key else None
+
+        # Longest aliases first so "google calendar" beats "calendar"
+        self._alias_patterns = [
+            (re.compile(r"\b" + re.escape(alias).replace(r"\ ", r"\s+") + r"(?:'s)?\b", re.IGNORECASE), key)
+            for alias, key in sorted(aliases.items(), key=lambda item: -len(item[0]))
+            if key
+        ]
+        self.apps = apps
+
+    def parse(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a question with local rules.
+
+        Returns:
+            Dict with app, task, url, requires_auth and confidence (0-1),
+            or None if no known app is mentioned
+        """
+        self.refresh()
+        text = question.strip()
+
+        match = self._find_app(text)
+        if match is None:
+            return None
+        app_key, start, end, introduced = match
+
+        # Cut the app mention (and the preposition introducing it) out of the question
+        before = text[:start]
+        if introduced:
+            before = re.sub(r"\s*\b(?:%s)\s+(?:the\s+)?$" % "|".join(APP_PREPOSITIONS), "", before, flags=re.IGNORECASE)
+        after = re.sub(r"^\s*(?:app|website|site)\b", "", text[end:], flags=re.IGNORECASE)
+        remainder = (before + " " + after).strip(" ,:")
+
+        lead_in = LEAD_IN_PATTERN.match(remainder)
+        if lead_in:
+            remainder = remainder[lead_in.end():]
+        task = TRAILING_NOISE.sub("", remainder).strip(" ,:")
+        task = re.sub(r"\s+", " ", task)
+        if task:
+            task = task[0].lower() + task[1:]
+
+        confidence = 0.6 if introduced else 0.3
+        if lead_in:
+            confidence += 0.2
+        if 1 <= len(task.split()) <= 10:
+            confidence += 0.2
+
+        entry = self.apps[app_key]
+        return {
+            "app": app_key,
+            "task": task,
+            "url": entry.get('url'),
+            "requires_auth": entry.get('requires_auth', True),
+            "confidence": round(min(confidence, 1.0), 2),
+            "source": "rules",
+        }
+
+    def _find_app(self, text: str) -> Optional[Tuple[str, int, int, bool]]:
+        """
+        Locate the single app mentioned in the text.
+
+        Returns:
+            (app key, match start, match end, introduced by a preposition),
+            or None if no app or more than one app is mentioned
+        """
+        found: Dict[str, Tuple[int, int, bool]] = {}
+        taken: List[Tuple[int, int]] = []
+        for pattern, key in self._alias_patterns:
+            for m in pattern.finditer(text):
+                if any(m.start() < e and s < m.end() for s, e in taken):
+                    continue
+                taken.append((m.start(), m.end()))
+                preceding = text[:m.start()].rstrip().lower()
+                introduced = (
+                    preceding.endswith(tuple(f" {p}" for p in APP_PREPOSITIONS))
+                    or preceding.endswith(tuple(f" {p} the" for p in APP_PREPOSITIONS))
+                    or preceding in APP_PREPOSITIONS
+                    or not preceding
+                )
+                if key not in found or (introduced and not found[key][2]):
+                    found[key] = (m.start(), m.end(), introduced)
+
+        if len(found) != 1:
+            return None
+        key, (start, end, introduced) = next(iter(found.items()))
+        return key, start, end, introduced
+
+    @staticmethod
+    def _domain_label(url: Optional[str]) -> Optional[str]:
+        """Return the registrable label of a URL, e.g. "notion" for www.notion.so."""
+        if not url:
+            return None
+        host = urlparse(url).netloc.lower().split(':')[0]
+        parts = [p for p in host.split('.') if p not in ('www', 'app', 'id')]
+        return parts[0] if len(parts) >= 2 else None
+
+    @staticmethod
+    def _host_aliases(url: Optional[str]) -> set:
+        """Return the hosts a URL may be mentioned by, e.g. {"www.notion.so", "notion.so"}."""
+        if not url:
+            return set()
+        host = urlparse(url).netloc.lower().split(':')[0]
+        if '.' not in host:
+            return set()
+        hosts = {host}
+        while host.split('.', 1)[0] in ('www', 'app', 'id') and host.count('.') >= 2:
+            host = host.split('.', 1)[1]
+            hosts.add(host)
+        return hosts
+
+    @staticmethod
+    def _mtime(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
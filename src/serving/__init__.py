@@ -0,0 +1,4 @@
+from .channels import Client, ConnectionManager
+from .http_cache import HttpCache, is_content_addressed
+
+__all__ = ['Client', 'ConnectionManager', 'HttpCache', 'is_content_addressed']
@@ -0,0 +1,342 @@
+"""
+Job-scoped WebSocket channels with bounded, concurrent fan-out.
+
+Clients subscribe to the jobs they care about and only receive those
+jobs' events. Every client has its own bounded outbox drained by its own
+sender task, so one slow socket never delays anyone else, and publishing
+an event costs one JSON encoding plus one enqueue per subscriber of that
+job, however many clients are connected.
+
+When a client falls behind, a newer event replaces a pending one with the
+same coalesce key (e.g. an older "status" of the same job); if the outbox
+is still full, or a single send takes too long, the client is disconnected.
+
+Every job's events are also kept in a bounded ring buffer and numbered
+with a per-job sequence ("seq"). A client that reconnects subscribes with
+the last seq it saw and is sent only what it missed.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+
+# Close code for clients dropped for not keeping up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class _Outgoing:
+    """An encoded event waiting in a client's outbox."""
+    __slots__ = ("job_id", "coalesce_key", "text", "queued_at", "replay")
+
+    def __init__(self, job_id: Optional[str], coalesce_key: Optional[str], text: str, replay: bool = False):
+        self.job_id = job_id
+        self.coalesce_key = coalesce_key
+        self.text = text
+        self.queued_at = time.perf_counter()
+        self.replay = replay
+
+
+class _LogEntry:
+    """A published event kept for replay."""
+    __slots__ = ("seq", "coalesce_key", "text")
+
+    def __init__(self, seq: int, coalesce_key: Optional[str], text: str):
+        self.seq = seq
+        self.coalesce_key = coalesce_key
+        self.text = text
+
+
+class EventLog:
+    """Ring buffer of one job's recent events, numbered from 1."""
+
+    def __init__(self, max_events: int, max_bytes: int):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.entries: Deque[_LogEntry] = deque()
+        self.bytes = 0
+        self.last_seq = 0
+
+    def append(self, coalesce_key: Optional[str], encode) -> _LogEntry:
+        """Number and store an event; encode(seq) returns its JSON text."""
+        self.last_seq += 1
+        entry = _LogEntry(self.last_seq, coalesce_key, encode(self.last_seq))
+        self.entries.append(entry)
+        self.bytes += len(entry.text)
+        while len(self.entries) > 1 and (len(self.entries) > self.max_events or self.bytes > self.max_bytes):
+            self.bytes -= len(self.entries.popleft().text)
+        return entry
+
+    def covers(self, last_seen: int) -> bool:
+        """Whether every event after last_seen is still in the buffer."""
+        if last_seen >= self.last_seq:
+            return True
+        return bool(self.entries) and self.entries[0].seq <= last_seen + 1
+
+    def since(self, last_seen: int) -> List[_LogEntry]:
+        """
+        Retained events after last_seen, without coalescable events that a
+        later one with the same key supersedes.
+        """
+        missed = [entry for entry in self.entries if entry.seq > last_seen]
+        latest = {entry.coalesce_key: entry.seq for entry in missed if entry.coalesce_key is not None}
+        return [
+            entry for entry in missed
+            if entry.coalesce_key is None or latest[entry.coalesce_key] == entry.seq
+        ]
+
+
+class Client:
+    """One WebSocket connection, its subscriptions and its outbox."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.subscriptions: Set[str] = set()
+        self.outbox: Deque[_Outgoing] = deque()
+        # Replayed events in the outbox; they don't count against max_queue
+        self.replay_pending = 0
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.sender: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.outbox)
+
+
+class ConnectionManager:
+    """Routes job events to subscribed WebSocket clients."""
+
+    def __init__(
+        self,
+        max_queue: int = 64,
+        send_timeout: float = 5.0,
+        replay_events: int = 256,
+        replay_bytes: int = 4 * 1024 * 1024,
+        max_logs: int = 500
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            max_queue: Events buffered per client before it counts as a slow consumer
+            send_timeout: Seconds a single send may take before the client is dropped
+            replay_events: Events kept per job for replay after a reconnect
+            replay_bytes: Size limit of one job's replay buffer
+            max_logs: Jobs whose replay buffers are kept (least recently published dropped first)
+        """
+        self.max_queue = max(1, max_queue)
+        self.send_timeout = send_timeout
+        self.replay_events = max(1, replay_events)
+        self.replay_bytes = replay_bytes
+        self.max_logs = max(1, max_logs)
+        self.clients: Set[Client] = set()
+        self.channels: Dict[str, Set[Client]] = {}
+        self.logs: "OrderedDict[str, EventLog]" = OrderedDict()
+
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.slow_disconnects = 0
+        self.replayed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def connect(self, websocket: WebSocket) -> Client:
+        """Accept a connection and start its sender task."""
+        await websocket.accept()
+        client = Client(websocket, self.max_queue)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.clients.add(client)
+        return client
+
+    def disconnect(self, client: Client):
+        """Forget a client and stop its sender. Safe to call more than once."""
+        if client.closed:
+            return
+        client.closed = True
+        self.clients.discard(client)
+        for job_id in client.subscriptions:
+            subscribers = self.channels.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.channels[job_id]
+        client.subscriptions.clear()
+        client.outbox.clear()
+        client.replay_pending = 0
+        client.wakeup.set()
+        if client.sender is not None and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+
+    def subscribe(
+        self,
+        client: Client,
+        job_id: str,
+        last_seen: int = 0,
+        snapshot: Optional[Callable[[], Dict[str, Any]]] = None
+    ):
+        """
+        Start delivering a job's events to a client, first replaying the
+        buffered events it hasn't seen.
+
+        Args:
+            client: Subscribing client
+            job_id: Job to follow
+            last_seen: Highest seq the client already has (0 for none)
+            snapshot: Builds an event with the job's current state; sent first
+                when the buffer doesn't hold everything after last_seen (the job
+                has no events yet, or older ones were dropped)
+        """
+        if client.closed:
+            return
+        client.subscriptions.add(job_id)
+        self.channels.setdefault(job_id, set()).add(client)
+
+        log = self.logs.get(job_id)
+        if snapshot is not None and (log is None or not log.covers(last_seen)):
+            self.send(client, {**snapshot(), "replay_truncated": log is not None})
+        if log is None:
+            return
+        for entry in log.since(last_seen):
+            self._enqueue(client, _Outgoing(job_id, entry.coalesce_key, entry.text, replay=True))
+            self.replayed += 1
+
+    def unsubscribe(self, client: Client, job_id: str):
+        """Stop delivering a job's events to a client."""
+        client.subscriptions.discard(job_id)
+        subscribers = self.channels.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self.channels[job_id]
+
+    def send(self, client: Client, message: Dict[str, Any], coalesce_key: Optional[str] = None):
+        """Queue a message for a single client."""
+        self._enqueue(client, _Outgoing(message.get("job_id"), coalesce_key, json.dumps(message)))
+
+    def publish(self, job_id: str, message: Dict[str, Any], coalesce_key: Optional[str] = None) -> int:
+        """
+        Queue an event for every subscriber of a job. Never blocks.
+
+        Args:
+            job_id: Channel to publish on
+            message: JSON-serializable event
+            coalesce_key: Events sharing a key replace each other while undelivered
+
+        Returns:
+            Number of subscribers the event was queued for
+        """
+        self.published += 1
+        log = self.logs.get(job_id)
+        if log is None:
+            log = self.logs[job_id] = EventLog(self.replay_events, self.replay_bytes)
+            while len(self.logs) > self.max_logs:
+                self.logs.popitem(last=False)
+        else:
+            self.logs.move_to_end(job_id)
+        # Encode once; the log and every subscriber share the text
+        entry = log.append(coalesce_key, lambda seq: json.dumps({"job_id": job_id, "seq": seq, **message}))
+
+        subscribers = self.channels.get(job_id)
+        if not subscribers:
+            return 0
+        for client in list(subscribers):
+            self._enqueue(client, _Outgoing(job_id, coalesce_key, entry.text))
+        return len(subscribers)
+
+    def _enqueue(self, client: Client, item: _Outgoing):
+        if client.closed:
+            return
+        if item.coalesce_key is not None:
+            for index, pending in enumerate(client.outbox):
+                if pending.job_id == item.job_id and pending.coalesce_key == item.coalesce_key:
+                    # Keep the original queue time so latency reflects how long the client waited
+                    item.queued_at = pending.queued_at
+                    if pending.replay:
+                        client.replay_pending -= 1
+                    del client.outbox[index]
+                    self.coalesced += 1
+                    break
+        # Replays may exceed the limit; they're bounded by the log size instead
+        if item.replay:
+            client.replay_pending += 1
+        elif len(client.outbox) - client.replay_pending >= client.max_queue:
+            self._drop_slow(client, "outbox full")
+            return
+        client.outbox.append(item)
+        client.wakeup.set()
+
+    def _drop_slow(self, client: Client, reason: str):
+        self.slow_disconnects += 1
+        print(f"⚠️  Dropping slow WebSocket client ({reason})")
+        websocket = client.websocket
+        self.disconnect(client)
+        asyncio.create_task(self._close(websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Too slow, reconnect to catch up"),
+                timeout=self.send_timeout
+            )
+        except Exception:
+            pass
+
+    async def _send_loop(self, client: Client):
+        try:
+            while not client.closed:
+                if not client.outbox:
+                    client.wakeup.clear()
+                    await client.wakeup.wait()
+                    continue
+                item = client.outbox.popleft()
+                if item.replay:
+                    client.replay_pending -= 1
+                try:
+                    await asyncio.wait_for(client.websocket.send_text(item.text), timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    self._drop_slow(client, f"send took over {self.send_timeout:g}s")
+                    return
+                except Exception:
+                    # Socket already gone; the receive loop will notice too
+                    self.disconnect(client)
+                    return
+                latency = time.perf_counter() - item.queued_at
+                self.delivered += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+        except asyncio.CancelledError:
+            pass
+
+    async def close_all(self):
+        """Disconnect every client (server shutdown)."""
+        clients = list(self.clients)
+        senders = [client.sender for client in clients if client.sender is not None]
+        for client in clients:
+            self.disconnect(client)
+        await asyncio.gather(*senders, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection, queue depth and send latency figures."""
+        depths: List[int] = [client.queue_depth for client in self.clients]
+        return {
+            "connections": len(self.clients),
+            "channels": len(self.channels),
+            "subscriptions": sum(len(subscribers) for subscribers in self.channels.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "slow_disconnects": self.slow_disconnects,
+            "replayed": self.replayed,
+            "replay_logs": len(self.logs),
+            "replay_bytes": sum(log.bytes for log in self.logs.values()),
+            "queued": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "avg_send_latency_ms": round(self._latency_total / self.delivered * 1000, 2) if self.delivered else 0.0,
+            "max_send_latency_ms": round(self._latency_max * 1000, 2),
+        }
@@ -0,0 +1,269 @@
+"""
+Conditional and cacheable responses for dataset artifacts.
+
+Files get strong ETags and Last-Modified validators so repeat views are
+answered with 304 Not Modified. Content-addressed files (blobs and
+derivatives) are marked immutable, and markdown/JSON bodies are kept
+precompressed (gzip, plus brotli when installed) in a bounded memory cache.
+Range requests are handled by FileResponse using the same ETag for If-Range.
+"""
+import asyncio
+import gzip
+import hashlib
+import re
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Cache, but check the validators before every reuse
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Directories whose files are named by the hash of their content
+CONTENT_ADDRESSED_DIRS = ("_blobs", "_derivatives")
+COMPRESSIBLE_MEDIA_TYPES = {
+    ".md": "text/markdown; charset=utf-8",
+    ".json": "application/json",
+}
+
+_SHA256_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_content_addressed(path: Path) -> bool:
+    """Whether a file's name is its content hash, so its bytes can never change."""
+    return bool(_SHA256_NAME.match(path.stem)) and any(
+        part in CONTENT_ADDRESSED_DIRS for part in path.parts
+    )
+
+
+def accepted_encodings(request: Request) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    encodings = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        encodings[coding.strip().lower()] = q
+    return encodings
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match."""
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+
+
+class HttpCache:
+    """
+    Builds cache-friendly responses for files served by the API.
+
+    Validators are computed once per file version (path, mtime, size) and
+    compressed bodies are reused until the file changes.
+    """
+
+    def __init__(self, max_body_bytes: int = 32 * 1024 * 1024, min_compress_bytes: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            max_body_bytes: Memory budget for precompressed/rendered bodies
+            min_compress_bytes: Bodies smaller than this are sent uncompressed
+        """
+        self.max_body_bytes = max_body_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self._etags: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._bodies: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._body_bytes = 0
+        self.not_modified = 0
+
+    def _version(self, path: Path) -> Tuple:
+        stat = path.stat()
+        return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    async def _file_etag(self, path: Path, version: Tuple) -> str:
+        """Strong ETag from the file's content hash (hashed once per version)."""
+        if is_content_addressed(path):
+            return f'"{path.stem}"'
+        etag = self._etags.get(version)
+        if etag is not None:
+            self._etags.move_to_end(version)
+            return etag
+
+        data = await asyncio.to_thread(path.read_bytes)
+        etag = f'"{hashlib.sha256(data).hexdigest()[:40]}"'
+        self._etags[version] = etag
+        while len(self._etags) > 4096:
+            self._etags.popitem(last=False)
+        return etag
+
+    def _headers(self, etag: str, encoding: Optional[str], mtime: float, immutable: bool, vary: bool) -> Dict[str, str]:
+        headers = {
+            # Each encoding is a different representation, so it needs its own ETag
+            "ETag": f'{etag[:-1]}-{encoding}"' if encoding else etag,
+            "Last-Modified": formatdate(mtime, usegmt=True),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if vary:
+            headers["Vary"] = "Accept-Encoding"
+        return headers
+
+    def _not_modified(self, headers: Dict[str, str]) -> Response:
+        self.not_modified += 1
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+
+    def _is_fresh(self, request: Request, etag: str, mtime: float) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def _get_body(self, key: Tuple, build: Callable[[], bytes]) -> bytes:
+        """Cached body for a key, built in a worker thread on a miss."""
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+        body = await asyncio.to_thread(build)
+        if key in self._bodies:
+            return body
+        self._bodies[key] = body
+        self._body_bytes += len(body)
+        while self._body_bytes > self.max_body_bytes and len(self._bodies) > 1:
+            _, evicted = self._bodies.popitem(last=False)
+            self._body_bytes -= len(evicted)
+        return body
+
+    def _pick_encoding(self, request: Request, size: int) -> Optional[str]:
+        if size < self.min_compress_bytes:
+            return None
+        encodings = accepted_encodings(request)
+        if brotli is not None and encodings.get("br", 0) > 0:
+            return "br"
+        if encodings.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def _compress(self, data: bytes, encoding: Optional[str]) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=11)
+        if encoding == "gzip":
+            return gzip.compress(data, compresslevel=9, mtime=0)
+        return data
+
+    async def file_response(
+        self,
+        request: Request,
+        path: Path,
+        immutable: Optional[bool] = None,
+        media_type: Optional[str] = None
+    ) -> Response:
+        """
+        Serve a file with validators, 304 handling, ranges and compression.
+
+        Args:
+            request: Incoming request (for conditional/encoding headers)
+            path: File to send
+            immutable: Allow long-lived caching (defaults to is_content_addressed(path))
+            media_type: Content-Type override
+        """
+        if immutable is None:
+            immutable = is_content_addressed(path)
+        version = await asyncio.to_thread(self._version, path)
+        etag = await self._file_etag(path, version)
+        mtime = version[1] / 1e9
+
+        compressible = path.suffix.lower() in COMPRESSIBLE_MEDIA_TYPES
+        encoding = self._pick_encoding(request, version[2]) if compressible else None
+        if compressible:
+            media_type = media_type or COMPRESSIBLE_MEDIA_TYPES[path.suffix.lower()]
+
+        headers = self._headers(etag, encoding, mtime, immutable, vary=compressible)
+        if self._is_fresh(request, headers["ETag"], mtime):
+            return self._not_modified(headers)
+
+        if encoding is None:
+            # FileResponse streams from disk and honours Range/If-Range against our ETag
+            return FileResponse(path, media_type=media_type, headers=headers)
+
+        body = await self._get_body(
+            version + (encoding,),
+            lambda: self._compress(path.read_bytes(), encoding)
+        )
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def rendered_response(
+        self,
+        request: Request,
+        source: Path,
+        render: Callable[[bytes], bytes],
+        variant: str,
+        media_type: str = "application/json"
+    ) -> Response:
+        """
+        Serve a body derived from a file (e.g. JSON wrapping a markdown file).
+
+        The rendered and compressed body is cached until the source changes,
+        and validators follow the source file.
+
+        Args:
+            request: Incoming request
+            source: File the body is rendered from
+            render: Turns the file's bytes into the response body
+            variant: Distinguishes this rendering in ETags and cache keys
+            media_type: Content-Type of the rendered body
+        """
+        version = await asyncio.to_thread(self._version, source)
+        file_etag = await self._file_etag(source, version)
+        mtime = version[1] / 1e9
+        encoding = self._pick_encoding(request, version[2])
+
+        headers = self._headers(f'{file_etag[:-1]}-{variant}"', encoding, mtime, immutable=False, vary=True)
+        if self._is_fresh(request, headers["ETag"], mtime):
+            return self._not_modified(headers)
+
+        plain = await self._get_body(
+            version + (variant, None),
+            lambda: render(source.read_bytes())
+        )
+        body = plain
+        if encoding is not None:
+            body = await self._get_body(
+                version + (variant, encoding),
+                lambda: self._compress(plain, encoding)
+            )
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_bodies": len(self._bodies),
+            "cached_body_bytes": self._body_bytes,
+            "not_modified": self.not_modified,
+        }
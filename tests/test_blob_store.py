@@ -0,0 +1,59 @@
+"""
+Blob store garbage collection vs. guides that are still being saved.
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.dataset.blob_store import BlobStore
+
+PNG = b'\x89PNG\r\n\x1a\n'
+
+
+def _age(path: Path, seconds: float):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def _reference(store: BlobStore, *refs):
+    task_dir = store.base_dir / "app" / "task"
+    task_dir.mkdir(parents=True, exist_ok=True)
+    states = [{"screenshot": store.link_from(task_dir, ref), "screenshot_sha256": ref.sha256} for ref in refs]
+    with open(task_dir / "metadata.json", 'w') as f:
+        json.dump({"states": states}, f)
+
+
+def test_gc_keeps_blobs_of_a_save_in_progress(tmp_path):
+    store = BlobStore(str(tmp_path))
+    stale = store.put_bytes(PNG + b"old run")
+    kept = store.put_bytes(PNG + b"kept")
+    _reference(store, kept)
+    _age(stale.path, 7200)
+    _age(kept.path, 7200)
+
+    # Written by a save whose metadata.json doesn't exist yet
+    pending = store.put_bytes(PNG + b"new run")
+
+    result = store.collect_garbage()
+
+    assert result["removed_blobs"] == 1
+    assert result["recent_blobs_kept"] == 1
+    assert not stale.path.exists()
+    assert pending.path.exists()
+    assert kept.path.exists()
+
+
+def test_reusing_an_old_blob_restarts_its_grace_period(tmp_path):
+    store = BlobStore(str(tmp_path))
+    old = store.put_bytes(PNG + b"frame")
+    _age(old.path, 7200)
+
+    reused = store.put_bytes(PNG + b"frame")
+
+    assert not reused.created
+    assert store.collect_garbage()["removed_blobs"] == 0
+    assert old.path.exists()
+    assert store.collect_garbage(grace_seconds=0)["removed_blobs"] == 1
@@ -0,0 +1,130 @@
+"""
+Pooled guide generation: Browser Use drives the leased tab and the lease
+always goes back to the pool.
+
+Needs browser_use and a Chromium that Playwright can launch; skipped otherwise.
+Answers come from benchmarks/stub_llm.py, so nothing leaves the machine.
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import yaml
+
+pytest.importorskip("browser_use")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+from stub_llm import StubLLM
+from src.browser import BrowserPool
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Pooltest</title></head>
+<body><h1>Pooltest</h1><button onclick="this.textContent='Clicked'">Open settings</button></body></html>
+"""
+QUESTION = "How do I open settings in Pooltest?"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def guide_env(tmp_path_factory):
+    """Serve a one-page app, stub the LLM and import app.py inside a scratch workspace."""
+    workspace = tmp_path_factory.mktemp("workspace")
+    site = workspace / "site"
+    site.mkdir()
+    (site / "index.html").write_text(PAGE)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(site)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+    (workspace / "config").mkdir()
+    with open(workspace / "config" / "apps.yaml", 'w') as f:
+        yaml.safe_dump({"pooltest": {"name": "Pooltest", "base_url": url, "requires_auth": False}}, f)
+
+    stub = StubLLM()
+    stub.start()
+    saved_env = {key: os.environ.get(key) for key in ("OPENAI_API_KEY", "OPENAI_BASE_URL", "ANONYMIZED_TELEMETRY")}
+    os.environ.update(OPENAI_API_KEY="stub-key", OPENAI_BASE_URL=stub.base_url, ANONYMIZED_TELEMETRY="false")
+    cwd = os.getcwd()
+    # app.py opens dataset/ and config/ relative to the working directory at import
+    os.chdir(workspace)
+    try:
+        import app
+        from browser_use import ChatOpenAI
+        llm = ChatOpenAI(model="stub-llm", base_url=stub.base_url, api_key="stub-key")
+        yield {"app": app, "llm": llm, "stub": stub, "url": url, "workspace": workspace}
+    finally:
+        os.chdir(cwd)
+        stub.stop()
+        server.shutdown()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+async def _with_pool(workspace: Path, run):
+    pool = BrowserPool(size=1, headless=True, sessions_dir=str(workspace / "browser_sessions"))
+    try:
+        await pool.start()
+    except Exception as e:
+        pytest.skip(f"Chromium is not available: {e}")
+    try:
+        return await run(pool)
+    finally:
+        await pool.stop()
+
+
+def test_pooled_run_returns_lease(guide_env):
+    stub = guide_env["stub"]
+    stub.load(
+        [
+            {"navigate": {"url": guide_env["url"], "new_tab": False}},
+            {"click": {"index": {"element": "Open settings"}}},
+            {"done": {"text": "Settings opened", "success": True}},
+        ],
+        {"app": "pooltest", "task": "open settings", "url": guide_env["url"], "requires_auth": False},
+    )
+
+    events = []
+
+    async def run(pool):
+        result = await guide_env["app"].generate_guide(
+            QUESTION, browser_pool=pool, force_refresh=True, llm=guide_env["llm"], on_step=events.append
+        )
+        return result, pool.stats()
+
+    result, stats = asyncio.run(_with_pool(guide_env["workspace"], run))
+
+    assert result["success"], result.get("error")
+    assert events and all(e["url"] == guide_env["url"] and e["title"] == "Pooltest" for e in events)
+    assert Path(result["dataset_path"], "metadata.json").exists()
+    assert stats["idle"] == 1
+    assert stats["browsers"][0]["jobs_served"] == 1
+    assert (guide_env["workspace"] / "browser_sessions" / "pooltest.json").exists()
+
+
+def test_failed_pooled_run_returns_lease(guide_env):
+    async def run(pool):
+        # Not a chat model: the run fails after the lease has been taken
+        result = await guide_env["app"].generate_guide(
+            QUESTION, browser_pool=pool, force_refresh=True, llm=object()
+        )
+        return result, pool.stats()
+
+    result, stats = asyncio.run(_with_pool(guide_env["workspace"], run))
+
+    assert not result["success"]
+    assert stats["idle"] == 1
+    assert stats["browsers"][0]["jobs_served"] == 1
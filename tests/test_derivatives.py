@@ -0,0 +1,72 @@
+"""
+Derivative cache: a cancelled first request doesn't strand the others
+waiting on the same render.
+"""
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.dataset import derivatives
+from src.dataset.derivatives import DerivativeCache
+
+
+def _screenshot(path: Path, width: int = 1600, height: int = 900) -> Path:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (240, 240, 240)).save(output, format="PNG")
+    path.write_bytes(output.getvalue())
+    return path
+
+
+def test_renders_and_serves_from_cache(tmp_path):
+    source = _screenshot(tmp_path / "shot.png")
+    cache = DerivativeCache(cache_dir=str(tmp_path / "_derivatives"))
+
+    async def run():
+        return await cache.get(source, "thumb"), await cache.get(source, "thumb")
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    with Image.open(first) as image:
+        assert image.format == "WEBP"
+        assert image.width == 320
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cancelled_render_does_not_strand_waiters(tmp_path, monkeypatch):
+    release = threading.Event()
+    render = derivatives.render_derivative
+
+    def slow_render(data, max_width, quality=75):
+        release.wait(5)
+        return render(data, max_width, quality)
+
+    monkeypatch.setattr(derivatives, "render_derivative", slow_render)
+    source = _screenshot(tmp_path / "shot.png")
+    executor = ThreadPoolExecutor(max_workers=1)
+    cache = DerivativeCache(cache_dir=str(tmp_path / "_derivatives"), executor=executor)
+
+    async def run():
+        first = asyncio.create_task(cache.get(source, "preview"))
+        await asyncio.sleep(0.1)
+        waiter = asyncio.create_task(cache.get(source, "preview"))
+        await asyncio.sleep(0.1)
+        first.cancel()
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(waiter, timeout=2)
+        finally:
+            release.set()
+        return len(cache._in_flight)
+
+    try:
+        assert asyncio.run(run()) == 0
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,56 @@
+"""
+Screenshot re-encoding, including full-page captures too tall for WebP.
+"""
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.capture.encoding import WEBP_MAX_DIMENSION, EncodingConfig, ScreenshotEncoder, encode_image
+from src.dataset.blob_store import sniff_extension
+
+
+def _png(width: int, height: int) -> bytes:
+    image = Image.new("RGB", (width, height), (245, 245, 245))
+    for y in range(0, height, 40):
+        image.paste((30, 30, 30), (10, y, width - 10, y + 12))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_encodes_to_webp():
+    encoded = encode_image(_png(800, 1200), "webp")
+
+    assert sniff_extension(encoded) == "webp"
+
+
+def test_too_tall_for_webp_keeps_original():
+    tall = _png(400, WEBP_MAX_DIMENSION + 617)
+
+    assert encode_image(tall, "webp") == tall
+
+
+def test_downscaled_below_the_limit_is_encoded():
+    # 1680x17000 scaled to 800 wide is ~8100px tall, which WebP can hold
+    encoded = encode_image(_png(1680, 17000), "webp", max_width=800)
+
+    with Image.open(io.BytesIO(encoded)) as image:
+        assert image.format == "WEBP"
+        assert image.width == 800
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_encode_many_survives_a_tall_frame(use_processes):
+    frames = [_png(800, 1200), _png(400, 17000), _png(800, 900)]
+    encoder = ScreenshotEncoder(EncodingConfig("webp"), max_workers=2, use_processes=use_processes)
+    try:
+        encoded = encoder.encode_many(frames)
+    finally:
+        encoder.shutdown()
+
+    assert [sniff_extension(data) for data in encoded] == ["webp", "png", "webp"]
+    assert encoded[1] == frames[1]
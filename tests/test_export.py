@@ -0,0 +1,44 @@
+"""
+Export selection: requested task names stay inside the dataset.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.dataset.export import select_task_dirs
+
+
+def _guide(task_dir: Path):
+    task_dir.mkdir(parents=True)
+    (task_dir / "metadata.json").write_text("{}")
+    (task_dir / "workflow.md").write_text("# Guide\n")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    base = tmp_path / "dataset"
+    _guide(base / "notion" / "add_a_page")
+    _guide(tmp_path / "evil")
+    return base
+
+
+def test_selects_requested_tasks(dataset):
+    selected = select_task_dirs(dataset, tasks=["notion/add_a_page", "Notion/add_a_page", "notion/missing"])
+
+    assert selected == [dataset / "notion" / "add_a_page"]
+
+
+@pytest.mark.parametrize("task", [
+    "x//{outside}",
+    "x/{outside}",
+    "../evil",
+    "notion/../../evil",
+    "notion/..",
+    "notion",
+])
+def test_rejects_tasks_outside_the_dataset(dataset, task):
+    outside = str(dataset.parent / "evil")
+
+    assert select_task_dirs(dataset, tasks=[task.format(outside=outside)]) == []
@@ -0,0 +1,60 @@
+"""
+Manual login detection in a real page: the DOM watcher resolves once the
+login form goes away and keeps waiting while the user is still typing.
+
+Needs a Chromium that Playwright can launch; skipped otherwise.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.browser.login import wait_for_login_completion
+from src.browser.probe import PageProbe
+
+LOGIN_PAGE = """
+<html><head><title>Acme</title></head>
+<body><form><input name="email"><input type="password"><button>Sign in</button></form></body></html>
+"""
+
+
+async def _with_login_page(run):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f"Chromium is not available: {e}")
+        try:
+            page = await browser.new_page()
+            await page.set_content(LOGIN_PAGE)
+            return await run(page)
+        finally:
+            await browser.close()
+
+
+def test_login_form_removed_completes_login():
+    async def run(page):
+        assert (await PageProbe().run(page)).is_login
+
+        async def log_in():
+            await asyncio.sleep(0.3)
+            await page.evaluate("() => { document.querySelector('form').replaceWith(document.createElement('main')); }")
+
+        asyncio.create_task(log_in())
+        # Cookie and navigation signals stay quiet, so only the DOM watcher can finish this
+        return await wait_for_login_completion(page, max_wait_time=5, cookie_check_interval=60)
+
+    assert asyncio.run(_with_login_page(run)) is True
+
+
+def test_typing_credentials_keeps_waiting():
+    async def run(page):
+        await page.fill('input[name="email"]', "someone@example.com")
+        await page.fill('input[type="password"]', "hunter2")
+        return await wait_for_login_completion(page, max_wait_time=1, cookie_check_interval=60)
+
+    assert asyncio.run(_with_login_page(run)) is False
@@ -0,0 +1,85 @@
+"""
+Overlay suppression in a real page: per-flush counts and overlays nested in added subtrees.
+
+Needs a Chromium that Playwright can launch; skipped otherwise.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.browser.overlay import install_overlay_suppression, suppress_overlays
+
+ADD_NESTED_OVERLAY = """
+() => {
+    const wrapper = document.createElement('section');
+    wrapper.innerHTML = '<div><p>content</p><div id="nested" style="position:fixed;z-index:2147483647"></div></div>';
+    document.body.appendChild(wrapper);
+}
+"""
+
+
+async def _with_page(run, content="<html><head></head><body><main>App</main></body></html>"):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f"Chromium is not available: {e}")
+        try:
+            page = await browser.new_page()
+            await page.set_content(content)
+            await install_overlay_suppression(page)
+            return await run(page)
+        finally:
+            await browser.close()
+
+
+def test_flush_counts_only_new_overlays():
+    async def run(page):
+        counts = [await suppress_overlays(page)]
+        await page.evaluate(ADD_NESTED_OVERLAY)
+        counts.append(await suppress_overlays(page))
+        counts.append(await suppress_overlays(page))
+        display = await page.evaluate("() => getComputedStyle(document.getElementById('nested')).display")
+        return counts, display
+
+    counts, display = asyncio.run(_with_page(run))
+
+    assert counts == [0, 1, 0]
+    assert display == "none"
+
+
+def test_app_content_is_left_alone():
+    async def run(page):
+        await page.evaluate("""
+            () => {
+                const list = document.createElement('ul');
+                list.innerHTML = '<li>one</li><li style="position:relative;z-index:10">two</li>';
+                document.querySelector('main').appendChild(list);
+            }
+        """)
+        hidden = await suppress_overlays(page)
+        visible = await page.evaluate("() => document.querySelectorAll('[data-navigator-hidden]').length")
+        return hidden, visible
+
+    assert asyncio.run(_with_page(run)) == (0, 0)
+
+
+def test_nested_overlay_present_at_install_is_hidden():
+    content = """
+        <html><head></head><body>
+            <main>App</main>
+            <div class="wrapper"><div><div id="consent" style="position:fixed;z-index:2147483647">Cookies?</div></div></div>
+        </body></html>
+    """
+
+    async def run(page):
+        display = await page.evaluate("() => getComputedStyle(document.getElementById('consent')).display")
+        # Hidden at install; the first flush reports it, later ones don't
+        return display, [await suppress_overlays(page), await suppress_overlays(page)]
+
+    assert asyncio.run(_with_page(run, content)) == ("none", [1, 0])
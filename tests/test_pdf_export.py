@@ -0,0 +1,85 @@
+"""
+PDF cache: shared renders survive a cancelled first request, and pruning
+keeps the most recently downloaded PDFs.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.dataset import pdf_export
+from src.dataset.pdf_export import PdfExporter
+
+
+def _workflow(tmp_path: Path, name: str) -> Path:
+    path = tmp_path / name / "workflow.md"
+    path.parent.mkdir()
+    path.write_text(f"# {name}\n")
+    return path
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    executor = ThreadPoolExecutor(max_workers=2)
+    exporter = PdfExporter(cache_dir=str(tmp_path / "_exports"), max_entries=2, executor=executor)
+    yield exporter
+    executor.shutdown(wait=True)
+
+
+def test_cancelled_render_does_not_strand_waiters(tmp_path, exporter, monkeypatch):
+    release = threading.Event()
+
+    def slow_render(paths, pdf_path, max_width):
+        release.wait(5)
+        Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(pdf_path).write_bytes(b"%PDF-1.4")
+
+    monkeypatch.setattr(pdf_export, "render_pdf", slow_render)
+    workflow = _workflow(tmp_path, "guide")
+
+    async def run():
+        first = asyncio.create_task(exporter.get_pdf([workflow]))
+        await asyncio.sleep(0.1)
+        waiter = asyncio.create_task(exporter.get_pdf([workflow]))
+        await asyncio.sleep(0.1)
+        first.cancel()
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(waiter, timeout=2)
+        finally:
+            release.set()
+        return exporter.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0
+
+
+def test_prune_keeps_recently_downloaded_pdfs(tmp_path, exporter, monkeypatch):
+    def fake_render(paths, pdf_path, max_width):
+        Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(pdf_path).write_bytes(b"%PDF-1.4")
+
+    monkeypatch.setattr(pdf_export, "render_pdf", fake_render)
+    workflows = [_workflow(tmp_path, name) for name in ("a", "b", "c")]
+
+    async def run():
+        a = await exporter.get_pdf([workflows[0]])
+        b = await exporter.get_pdf([workflows[1]])
+        for path, age in ((a, 300), (b, 200)):
+            past = time.time() - age
+            os.utime(path, (past, past))
+        # a was rendered first but downloaded again just now
+        assert await exporter.get_pdf([workflows[0]]) == a
+        c = await exporter.get_pdf([workflows[2]])
+        return a, b, c
+
+    a, b, c = asyncio.run(run())
+
+    assert a.exists() and c.exists()
+    assert not b.exists()
+    assert exporter.stats()["hits"] == 1
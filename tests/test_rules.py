@@ -0,0 +1,48 @@
+"""
+Local question parsing against a small apps.yaml.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.parsing import RuleBasedParser
+
+APPS = {
+    "notion": {"name": "Notion", "base_url": "https://www.notion.so", "requires_auth": True},
+    "linear": {"name": "Linear", "base_url": "https://linear.app", "requires_auth": True},
+    "github": {"name": "GitHub", "base_url": "https://github.com", "requires_auth": False},
+    "gcal": {"name": "Google Calendar", "base_url": "https://calendar.google.com", "aliases": ["calendar"]},
+}
+
+
+@pytest.fixture
+def parser(tmp_path):
+    apps_file = tmp_path / "apps.yaml"
+    with open(apps_file, 'w') as f:
+        yaml.safe_dump(APPS, f)
+    return RuleBasedParser(str(apps_file), str(tmp_path / "url_cache.json"))
+
+
+@pytest.mark.parametrize("question, app, task", [
+    ("How do I add a page in Notion?", "notion", "add a page"),
+    ("How can I add a page in notion.so?", "notion", "add a page"),
+    ("How can I add a page in www.notion.so?", "notion", "add a page"),
+    ("How do I create an issue on linear.app", "linear", "create an issue"),
+    ("how do i star a repo on github.com?", "github", "star a repo"),
+    ("How do I create an event in Google Calendar?", "gcal", "create an event"),
+])
+def test_parses_app_and_task(parser, question, app, task):
+    parsed = parser.parse(question)
+
+    assert parsed["app"] == app
+    assert parsed["task"] == task
+    assert parsed["url"] == APPS[app]["base_url"]
+    assert parsed["confidence"] == 1.0
+
+
+def test_unknown_or_ambiguous_app(parser):
+    assert parser.parse("How do I export a board in Trello?") is None
+    assert parser.parse("How do I link a Linear issue to a GitHub PR?") is None